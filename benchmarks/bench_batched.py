@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+"""Compare the per-object and batched renderers of show_activities
+
+E.g.
+    python benchmarks/bench_batched.py --sizes 1000 10000 100000
+"""
+import argparse
+import time
+
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+
+from lsst.timelines import makeTimeline, show_activities  # noqa: E402
+
+
+def timeRender(activities, batched):
+    """Return the time taken by show_activities, and to then draw the figure"""
+    fig = plt.figure(figsize=(10, 8))
+    t0 = time.perf_counter()
+    show_activities(activities, batched=batched, show_today=False)
+    t1 = time.perf_counter()
+    fig.canvas.draw()
+    t2 = time.perf_counter()
+    plt.close(fig)
+
+    return t1 - t0, t2 - t1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="Numbers of activities to draw")
+    parser.add_argument("--skip-unbatched", action="store_true",
+                        help="Only time the batched renderer (the per-object one is slow at 1e5)")
+    args = parser.parse_args()
+
+    print("Times in seconds for show_activities (build) and the subsequent canvas draw")
+    print(f"{'N':>8} {'per-object':>21} {'batched':>21} {'speedup':>8}")
+    print(f"{'':>8} {'build':>10} {'draw':>10} {'build':>10} {'draw':>10} {'build':>8}")
+    for n in args.sizes:
+        activities = makeTimeline(n)
+        batched = timeRender(activities, batched=True)
+        if args.skip_unbatched:
+            print(f"{n:8d} {'':>21} {batched[0]:10.2f} {batched[1]:10.2f}")
+        else:
+            slow = timeRender(activities, batched=False)
+            print(f"{n:8d} {slow[0]:10.2f} {slow[1]:10.2f} {batched[0]:10.2f} {batched[1]:10.2f}"
+                  f" {slow[0]/batched[0]:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
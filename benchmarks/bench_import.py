@@ -0,0 +1,65 @@
+#!/usr/bin/env python
+"""Check that importing lsst.timelines is fast and doesn't load matplotlib
+
+Each import is timed in a fresh interpreter, taking the best of --repeat
+runs; the time for numpy alone is shown for comparison, as the package
+can't import faster than that.  The exit status is 1 if the import takes
+longer than --budget seconds, or if it imported matplotlib (the plotting
+modules should only be loaded when first used)
+
+E.g.
+    python benchmarks/bench_import.py --budget 0.25
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+_script = """
+import json, sys, time
+t0 = time.perf_counter()
+import %s
+t1 = time.perf_counter()
+print(json.dumps(dict(seconds=t1 - t0, matplotlib=[m for m in sys.modules if m.startswith("matplotlib")])))
+"""
+
+
+def timeImport(module, repeat):
+    """Return the best of repeat times to import module in a new python, and
+    the matplotlib modules that the import loaded
+    """
+    times = []
+    for i in range(repeat):
+        out = subprocess.run([sys.executable, "-c", _script % module],
+                             capture_output=True, text=True, check=True).stdout
+        result = json.loads(out)
+        times.append(result["seconds"])
+
+    return min(times), result["matplotlib"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--budget", type=float, default=0.25,
+                        help="Largest acceptable time to import lsst.timelines, in seconds")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of times to import each module")
+    args = parser.parse_args()
+
+    ok = True
+    print(f"{'module':<16} {'seconds':>8}")
+    for module in ["numpy", "lsst.timelines"]:
+        t, matplotlibModules = timeImport(module, args.repeat)
+        print(f"{module:<16} {t:8.3f}")
+
+    if matplotlibModules:
+        print(f"Importing lsst.timelines loaded matplotlib ({', '.join(matplotlibModules[:3])}, ...)")
+        ok = False
+    if t > args.budget:
+        print(f"Importing lsst.timelines took {t:.3f}s; the budget is {args.budget:.3f}s")
+        ok = False
+
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
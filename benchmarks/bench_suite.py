@@ -0,0 +1,311 @@
+#!/usr/bin/env python
+"""Time reading, writing, extent computation and drawing of synthetic
+timelines of increasing size, saving the results as JSON
+
+Each case is timed on timelines from `lsst.timelines.makeTimeline` with
+each of the requested numbers of items (the lod_schedule cases use a
+year of exposures from `lsst.timelines.makeObservingSchedule` instead),
+taking the best of --repeat runs.
+Cases that would be very slow at large sizes (e.g. drawing one artist per
+item) are skipped above a per-case limit unless --no-limits is given.
+
+The results are written to --output (default:
+benchmarks/results/<date>-<git revision>.json) together with the versions
+of python, numpy and matplotlib, so that runs from different releases can
+be compared with --compare:
+
+E.g.
+    python benchmarks/bench_suite.py --sizes 100 1000 10000 100000 1000000
+    python benchmarks/bench_suite.py --compare benchmarks/results/old.json
+"""
+import argparse
+from datetime import datetime
+import gc
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: E402
+from matplotlib.figure import Figure  # noqa: E402
+
+from lsst.timelines import (makeTimeline, read_activities, write_activities, get_extent,  # noqa: E402
+                            show_activities, ActivityTable, read_activity_table,
+                            save_activity_table, load_activity_table, pack_rows, LevelOfDetail, write_svg,
+                            load_profile, Calendar, makeObservingSchedule, validate, merge_activities,
+                            make_tree, InteractiveTimeline)
+
+
+class Case:
+    """A benchmark; setup(n) prepares the data, and run(data) is timed
+
+    maxN: the largest size to run (unless --no-limits)
+    """
+
+    def __init__(self, name, setup, run, maxN=None, description=""):
+        self.name = name
+        self.setup = setup
+        self.run = run
+        self.maxN = maxN
+        self.description = description
+
+
+_cache = {}                             # the timeline being benchmarked; see _timeline
+
+
+def _timeline(n):
+    """Return the synthetic timeline of size n (and its table, and its CSV
+    and binary files), reusing those made by earlier cases
+    """
+    if n not in _cache:
+        _cleanup()                      # only keep one size, to save memory and disk
+
+        activities = makeTimeline(n)
+        table = ActivityTable.from_activities(activities)
+
+        tmpdir = tempfile.mkdtemp(prefix="bench_suite-")
+        csvFile, binFile = os.path.join(tmpdir, "timeline.csv"), os.path.join(tmpdir, "timeline.bin")
+        write_activities(activities, csvFile)
+        save_activity_table(table, binFile)
+
+        _cache[n] = dict(activities=activities, table=table, csv=csvFile, bin=binFile, tmpdir=tmpdir)
+    return _cache[n]
+
+
+def _cleanup():
+    for old in _cache.values():
+        shutil.rmtree(old["tmpdir"])
+    _cache.clear()
+
+
+def _draw(activities, **kwargs):
+    fig = Figure(figsize=(12, 8))
+    show_activities(activities, ax=fig.add_subplot(), show_today=False, **kwargs)
+    return fig
+
+
+def _tight_layout(n):
+    fig = _draw(_timeline(n)["table"])
+    fig.canvas.draw()                   # so that the text's extents are cached, as in the first tight_layout
+    return fig
+
+
+def _lod_zoom(n):
+    fig = _draw(_timeline(n)["table"], lod=LevelOfDetail(_timeline(n)["table"]))
+    xmin, xmax = fig.axes[0].get_xlim()
+    return fig.axes[0], (xmin + 0.4*(xmax - xmin), xmin + 0.5*(xmax - xmin))
+
+
+def _lod_schedule_zoom(n):
+    table = makeObservingSchedule(n)
+    fig = _draw(table, lod=LevelOfDetail(table))
+    xmin, xmax = fig.axes[0].get_xlim()
+    return fig.axes[0], (xmin + 0.4*(xmax - xmin), xmin + 0.41*(xmax - xmin))
+
+
+def _interactive(n):
+    """Draw a LevelOfDetail view of the timeline on an Agg canvas, and
+    return an InteractiveTimeline on it and 100 points on its entries
+    """
+    table = _timeline(n)["table"]
+    lod = LevelOfDetail(table)
+    fig = Figure(figsize=(12, 8))
+    FigureCanvasAgg(fig)
+    show_activities(table, ax=fig.add_subplot(), show_today=False, lod=lod)
+    it = InteractiveTimeline(table, fig.axes[0], layout=lod.layout)  # and draw the figure
+
+    item = np.flatnonzero(table.isItem)
+    item = item[np.linspace(0, len(item) - 1, 100).astype(int)]
+    return it, list(zip(0.5*(it._x0[item] + it._x1[item]), it._y0[item] + 0.5*it.height))
+
+
+def _hover(args):
+    it, points = args
+    for x, y in points:
+        it.hover(x, y)
+
+
+def _tree(n):
+    """Group the inner lists by the verb and noun of their first label
+    (e.g. "Install M1M3 #12"), as subsystem -> work package -> task
+    """
+    def path(aa):
+        label = next((a.descrip for a in aa if hasattr(a, "descrip")), "")
+        words = label.split(" #")[0].split(" ", 1)
+        return (words[-1], words[0])
+
+    return make_tree(_timeline(n)["activities"], path)
+
+
+def _summarise(root):
+    for node in root.walk():            # so that each run starts with no cached summaries
+        node.invalidate()
+    return root.summary
+
+
+def _tree_summarised(n):
+    root = _tree(n)
+    root.summary
+    return root
+
+
+def _tmpfile(n, suffix=".csv"):
+    return os.path.join(_timeline(n)["tmpdir"], "out" + suffix)
+
+
+def _savefig_svg(args):
+    table, fileName = args
+    _draw(table).savefig(fileName)
+
+
+cases = [
+    Case("write", lambda n: (_timeline(n)["activities"], _tmpfile(n)),
+         lambda args: write_activities(*args), description="write_activities to CSV"),
+    Case("read", lambda n: _timeline(n)["csv"], read_activities,
+         description="read_activities from CSV"),
+    Case("read_table", lambda n: _timeline(n)["csv"], read_activity_table,
+         description="read_activity_table from CSV"),
+    Case("load_binary", lambda n: _timeline(n)["bin"], lambda f: len(load_activity_table(f).labels[:]),
+         description="load_activity_table, decoding all the labels"),
+    Case("extent", lambda n: _timeline(n)["activities"], get_extent,
+         description="get_extent on a list of lists"),
+    Case("extent_table", lambda n: _timeline(n)["table"], lambda t: t.extent(),
+         description="ActivityTable.extent"),
+    Case("pack_rows", lambda n: _timeline(n)["table"], pack_rows,
+         description="pack_rows on an ActivityTable"),
+    Case("draw", lambda n: _timeline(n)["activities"], _draw, maxN=10_000,
+         description="show_activities, one artist per item"),
+    Case("draw_batched", lambda n: _timeline(n)["activities"], lambda a: _draw(a, batched=True),
+         maxN=100_000, description="show_activities(batched=True)"),
+    Case("draw_table", lambda n: _timeline(n)["table"], _draw, maxN=1_000_000,
+         description="show_activities on an ActivityTable"),
+    Case("tight_layout", _tight_layout, lambda fig: fig.tight_layout(), maxN=1_000_000,
+         description="Figure.tight_layout on an ActivityTable's plot"),
+    Case("lod_build", lambda n: _timeline(n)["table"], LevelOfDetail, maxN=1_000_000,
+         description="LevelOfDetail on an ActivityTable"),
+    Case("lod_zoom", _lod_zoom, lambda args: args[0].set_xlim(args[1]), maxN=1_000_000,
+         description="zooming into a tenth of a LevelOfDetail's plot (not rendering it)"),
+    Case("lod_schedule", makeObservingSchedule, LevelOfDetail,
+         description="LevelOfDetail on a year of exposures from makeObservingSchedule"),
+    Case("lod_schedule_zoom", _lod_schedule_zoom, lambda args: args[0].set_xlim(args[1]),
+         description="zooming into a few nights of a LevelOfDetail's year of exposures"),
+    Case("hover", _interactive, _hover,
+         description="hovering over 100 entries of an InteractiveTimeline (blitting the tooltips)"),
+    Case("svg_savefig", lambda n: (_timeline(n)["table"], _tmpfile(n, ".svg")), _savefig_svg, maxN=10_000,
+         description="show_activities on an ActivityTable, then savefig as SVG"),
+    Case("svg_direct", lambda n: (_timeline(n)["table"], _tmpfile(n, ".svg")),
+         lambda args: write_svg(*args, show_today=False), maxN=1_000_000,
+         description="write_svg on an ActivityTable"),
+    Case("load_profile", lambda n: _timeline(n)["table"],
+         lambda t: load_profile(t, binSize="day", by="color"),
+         description="load_profile of an ActivityTable by colour, in daily bins"),
+    Case("merge", lambda n: ([_timeline(n)["csv"]]*2, _tmpfile(n)),
+         lambda args: write_activities(merge_activities(args[0]), args[1]), maxN=100_000,
+         description="merge_activities of two copies of a CSV file, written with write_activities"),
+    Case("tree_summary", _tree, _summarise,
+         description="the (uncached) roll-up Summary of a tree from make_tree"),
+    Case("tree_draw", _tree_summarised, lambda root: _draw(root.to_activities(depth=1)),
+         description="show_activities of the top level of a tree whose summaries are cached"),
+    Case("validate", lambda n: _timeline(n)["table"], validate,
+         description="validate an ActivityTable, running all the checks"),
+    Case("convert_calendar", lambda n: _timeline(n)["table"],
+         lambda t: t.convert_calendar(Calendar("1111100", "2021-12-24/2022-01-02")),
+         description="ActivityTable.convert_calendar to working days"),
+]
+
+
+def runCase(case, n, repeat):
+    """Return the best of repeat times of case at size n, in seconds"""
+    data = case.setup(n)
+    times = []
+    for i in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        case.run(data)
+        times.append(time.perf_counter() - t0)
+
+    return min(times)
+
+
+def gitRevision():
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, old):
+    """Print the ratio of the times in results to those in old"""
+    print(f"\nRatio to {old['revision']} ({old['date']}); > 1 is slower")
+    sizes = sorted({int(n) for r in results["times"].values() for n in r})
+    print(f"{'case':<14}" + "".join(f"{n:>10}" for n in sizes))
+    for name, times in results["times"].items():
+        oldTimes = old["times"].get(name, {})
+        row = []
+        for n in sizes:
+            t, t_old = times.get(str(n)), oldTimes.get(str(n))
+            row.append(f"{t/t_old:10.2f}" if t and t_old else f"{'-':>10}")
+        print(f"{name:<14}" + "".join(row))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10_000, 100_000],
+                        help="Numbers of items in the timelines")
+    parser.add_argument("--cases", nargs="+", choices=[c.name for c in cases],
+                        help="Cases to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of times to run each case")
+    parser.add_argument("--no-limits", action="store_true", help="Run all cases at all sizes")
+    parser.add_argument("--output", help="File to write the results to")
+    parser.add_argument("--compare", help="Results of a previous run to compare with")
+    args = parser.parse_args()
+
+    selected = [c for c in cases if args.cases is None or c.name in args.cases]
+
+    results = dict(date=datetime.now().isoformat(timespec="seconds"), revision=gitRevision(),
+                   python=platform.python_version(), numpy=np.__version__,
+                   matplotlib=matplotlib.__version__, machine=platform.machine(),
+                   cases={c.name: c.description for c in selected}, times={c.name: {} for c in selected})
+
+    for n in args.sizes:                # the outer loop, so each timeline is only made once
+        for case in selected:
+            if case.maxN is not None and n > case.maxN and not args.no_limits:
+                continue
+
+            print(f"{case.name} {n} ...", end="", file=sys.stderr, flush=True)
+            t = runCase(case, n, args.repeat)
+            results["times"][case.name][str(n)] = t
+            print(f" {t:.4f}s", file=sys.stderr)
+    _cleanup()
+
+    print(f"Best of {args.repeat} times, in seconds")
+    print(f"{'case':<14}" + "".join(f"{n:>10}" for n in args.sizes))
+    for name, times in results["times"].items():
+        print(f"{name:<14}" + "".join(f"{times[str(n)]:10.4f}" if str(n) in times else f"{'-':>10}"
+                                      for n in args.sizes))
+
+    output = args.output
+    if output is None:
+        resultsDir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+        os.makedirs(resultsDir, exist_ok=True)
+        output = os.path.join(resultsDir, f"{results['date'][:10]}-{results['revision'] or 'unknown'}.json")
+    with open(output, "w") as fd:
+        json.dump(results, fd, indent=2)
+    print(f"Wrote {output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as fd:
+            compare(results, json.load(fd))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+#!/usr/bin/env python
+"""Render pages of a timeline; the same as timelines.py render"""
+import sys
+
+from lsst.timelines.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main(["render"] + sys.argv[1:]))
@@ -20,4 +20,52 @@
 # the GNU General Public License along with this program.  If not,
 # see <http://www.lsstcorp.org/LegalNotices/>.
 #
+import importlib
+
 from .activities import *
+from .table import *
+from .intervals import *
+from .binary import *
+from .stats import *
+from .layout import *
+from .labels import *
+from .synthetic import *
+from .cache import *
+from .analysis import *
+from .schedule import *
+from .snapshots import *
+from .validate import *
+from .merge import *
+from .hierarchy import *
+from .pages import *
+#
+# The modules that import matplotlib at import time are only imported when one
+# of their names is first used, so that reading, writing, and analysing
+# timelines doesn't pay for matplotlib (show_activities imports it when called)
+#
+_lazyNames = dict(
+    batching=["ArtistBatch"],
+    incremental=["TimelineFigure", "CachedReader"],
+    interactive=["InteractiveTimeline"],
+    lod=["LevelOfDetail"],
+    svg=["write_svg"],
+)
+_lazyModules = {name: module for module, names in _lazyNames.items() for name in names}
+
+__all__ = [name for module in ["activities", "table", "intervals", "binary", "stats", "layout", "labels",
+                               "synthetic", "cache", "analysis", "schedule", "snapshots", "validate", "merge",
+                               "hierarchy", "pages"]
+           for name in importlib.import_module(f".{module}", __name__).__all__] + list(_lazyModules)
+
+
+def __getattr__(name):
+    if name in _lazyModules:
+        value = getattr(importlib.import_module(f".{_lazyModules[name]}", __name__), name)
+        globals()[name] = value
+        return value
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazyModules))
@@ -6,12 +6,14 @@ import textwrap
 
 import numpy as np
 
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
+from .labels import get_label_wrapper, _axes_width, _labelPadding
+from .stats import RenderStats, _timer
 
-__all__ = ["get_data_dir", "show_activities", "read_activities", "write_activities",
+__all__ = ["get_data_dir", "get_extent", "show_activities",
+           "read_activities", "iter_activities", "write_activities",
+           "TimelineFormatError", "RenderContext",
            "Activity", "Functionality", "Milestone",
-           "AdvanceRow", "Color", "LengthArrow", "MarkerWidth"]
+           "AdvanceRow", "Calendar", "Color", "LengthArrow", "MarkerWidth"]
 
 
 class Activity:
@@ -22,23 +24,43 @@ class Activity:
     height = 0.3
     row = 0
 
-    def __init__(self, descrip, t0, duration, color=None, border=None, markerWidth=0, drow=0):
+    def __init__(self, descrip, t0, duration, color=None, border=None, markerWidth=0, drow=0, after=None,
+                 calendar=None):
         """An activity to be carried out
         descrip: string description; will be wrapped based on a guess on available width
-        t0: starting date as string (e.g. 1958-02-05)
-        duration: duration in days, or ending date in same format as t0
+        t0: starting date as string (e.g. 1958-02-05, or 1958-02-05T21:30:00
+            to give the time too), or as a datetime
+        duration: duration in days (which may be fractional, e.g. 20/1440
+            for 20 minutes) or as a timedelta, or ending date in same
+            format as t0
         color: color to use, or None to use current default
         border: border color to use, or None to use current default
         drow: offset Activity by drow when drawing
           (see also AdvanceRow in show_activities())
+        after: the Activities that must finish before this one starts, each
+          optionally as a tuple (activity, lag) where lag is the number of
+          days to wait after it finishes; used by `Schedule`
+        calendar: a `Calendar`; if given, a numerical duration is in its
+          working days
         """
         self.descrip = descrip
-
-        self.t0 = datetime.fromisoformat(t0)
-        try:
-            self.duration = timedelta(duration)
-        except TypeError:
-            self.duration = datetime.fromisoformat(duration) - self.t0
+        self.after = []
+        for predecessor in (after or []):
+            predecessor, lag = predecessor if isinstance(predecessor, tuple) else (predecessor, 0)
+            self.after.append((predecessor, lag if isinstance(lag, timedelta) else timedelta(lag)))
+
+        self.t0 = t0 if isinstance(t0, datetime) else datetime.fromisoformat(t0)
+        if isinstance(duration, timedelta):
+            self.duration = duration
+        elif isinstance(duration, datetime):
+            self.duration = duration - self.t0
+        elif calendar is not None and not isinstance(duration, str):
+            self.duration = calendar.end_dates(self.t0, duration).item() - self.t0
+        else:
+            try:
+                self.duration = timedelta(duration)
+            except TypeError:
+                self.duration = datetime.fromisoformat(duration) - self.t0
 
         self.drow = drow
         self._color = color if color else None
@@ -49,15 +71,29 @@ class Activity:
         return "Activity"
 
     def getData(self):
-        return [self.descrip, self.t0.strftime('%Y-%m-%d'), (self.t0 + self.duration).strftime('%Y-%m-%d'),
+        return [self.descrip, _isoformat(self.t0), _isoformat(self.t0 + self.duration),
                 self._color, self._border, self._markerWidth, self.drow,
                ]
 
-    def draw(self, totalDuration=0, startDate="1958-02-05", endDate="2099-12-31", **kwargs):
+    def draw(self, totalDuration=0, startDate="1958-02-05", endDate="2099-12-31", batch=None, ctx=None,
+             **kwargs):
+        """Draw the Activity, returning 1 if it was drawn and 0 if it's outside
+        [startDate, endDate]
+
+        If batch is an `ArtistBatch` the geometry is added to it rather than
+        being plotted immediately.  ctx is the `RenderContext` providing the
+        Axes, current row, and default style; if None, one is made from the
+        class defaults (see `RenderContext.from_defaults`)
+        """
+        if ctx is None:
+            ctx = RenderContext.from_defaults()
+
         kwargs = kwargs.copy()
         if "color" not in kwargs:
-            kwargs["color"] = self.color if self._color is None else self._color
+            kwargs["color"] = ctx.color if self._color is None else self._color
 
+        if isinstance(startDate, str):
+            startDate = datetime.fromisoformat(startDate)
         if isinstance(endDate, str):
             endDate = datetime.fromisoformat(endDate)
 
@@ -74,32 +110,40 @@ class Activity:
         elif t1 > endDate:
             t1 = endDate
 
-        y0 = self.height*(1.1*(self.row - self.drow))
-        x = t0 + (t1 - t0)*np.array([0, 1, 1, 0, 0])
-        y = y0 + self.height*np.array([0, 0, 1, 1, 0])
-        plt.fill(x, y, '-', alpha=0.5, **kwargs)
-
-        if not (self.border is None and self._border is None):
-            kwargs["color"] = self.border if self._border is None else self._border
-
-        plt.plot(x, y, '-', **kwargs)
-
-        textwidth = 0
-        if self.fontsize:
-            if totalDuration == 0:
-                fiddleFactor = 3
+        height = ctx.height
+        y0 = height*(1.1*(ctx.row - self.drow))
+        if batch is None:
+            x = t0 + (t1 - t0)*np.array([0, 1, 1, 0, 0])
+            y = y0 + height*np.array([0, 0, 1, 1, 0])
+            ctx.ax.fill(x, y, '-', alpha=0.5, **_cycling(kwargs))
+
+        border = None
+        if not (ctx.border is None and self._border is None):
+            border = ctx.border if self._border is None else self._border
+
+        if batch is None:
+            if border is not None:
+                kwargs["color"] = border
+            ctx.ax.plot(x, y, '-', **_cycling(kwargs))
+        else:
+            batch.add_bar(t0, t1, y0, height, kwargs["color"], border)
+
+        with _timer(ctx.stats, "wrap"):
+            if ctx.fontsize:
+                width = ctx.axes_width()  # in points
+                if totalDuration:
+                    width *= (t1 - t0)/totalDuration
+                label = get_label_wrapper().wrap(self.descrip, width - _labelPadding, ctx.fontsize)
             else:
-                width_pts = plt.gcf().get_size_inches()[0]*72
-                fiddleFactor = width_pts/totalDuration.days
+                label = textwrap.fill(self.descrip, width=10, break_long_words=False)
 
-            textwidth = int(fiddleFactor*self.duration.days/self.fontsize) + 1
-
-        if textwidth <= 0:
-            textwidth = 10
-        plt.text(t0 + 0.5*(t1 - t0), y0 + 0.5*self.height,
-                 textwrap.fill(self.descrip, width=textwidth, break_long_words=False),
-                 horizontalalignment='center', verticalalignment='center',
-                 fontsize=self.fontsize)
+        if batch is None:
+            ctx.ax.text(t0 + 0.5*(t1 - t0), y0 + 0.5*height, label,
+                        horizontalalignment='center', verticalalignment='center',
+                        fontsize=ctx.fontsize).set_in_layout(False)  # it's inside the bar, so inside the Axes
+        else:
+            batch.add_text(t0 + 0.5*(t1 - t0), y0 + 0.5*height, label,
+                           horizontalalignment='center', verticalalignment='center', fontsize=ctx.fontsize)
 
         return 1
 
@@ -107,8 +151,10 @@ class Activity:
 class Milestone(Activity):
     markerWidth = 2
 
-    def __init__(self, descrip, t0, color=None, border=None, align="right", valign="top", markerWidth=None, drow=0):
-        super().__init__(descrip, t0, 0.0, color=color, border=border, drow=drow, markerWidth=markerWidth)
+    def __init__(self, descrip, t0, color=None, border=None, align="right", valign="top", markerWidth=None,
+                 drow=0, after=None):
+        super().__init__(descrip, t0, 0.0, color=color, border=border, drow=drow, markerWidth=markerWidth,
+                         after=after)
         self.align = align
         self.valign = valign
 
@@ -116,13 +162,17 @@ class Milestone(Activity):
         return "Milestone"
 
     def getData(self):
-        return [self.descrip, self.t0.strftime('%Y-%m-%d'),
+        return [self.descrip, _isoformat(self.t0),
                 self._color, self._border, self.align, self.valign, self._markerWidth, self.drow]
 
-    def draw(self, totalDuration=0, startDate="1958-02-05", endDate="2099-12-31", **kwargs):
+    def draw(self, totalDuration=0, startDate="1958-02-05", endDate="2099-12-31", batch=None, ctx=None,
+             **kwargs):
+        if ctx is None:
+            ctx = RenderContext.from_defaults()
+
         kwargs = kwargs.copy()
         if "color" not in kwargs:
-            kwargs["color"] = self.color if self._color is None else self._color
+            kwargs["color"] = ctx.color if self._color is None else self._color
 
         if isinstance(startDate, str):
             startDate = datetime.fromisoformat(startDate)
@@ -138,18 +188,23 @@ class Milestone(Activity):
         if t0 > endDate:
             return 0
 
-        y0 = self.height*(1.1*(self.row - self.drow))
+        height = ctx.height
+        y0 = height*(1.1*(ctx.row - self.drow))
 
-        markerWidth = timedelta(self.markerWidth if self._markerWidth is None else self._markerWidth)
-        x = t0 + markerWidth*np.array([0, 1, 0, -1, 0])
-        y = y0 + self.height*np.array([0, 0.5, 1, 0.5, 0])
-        plt.fill(x, y, '-', alpha=1, **kwargs)
+        markerWidth = timedelta(ctx.markerWidth if self._markerWidth is None else self._markerWidth)
+        if batch is None:
+            x = t0 + markerWidth*np.array([0, 1, 0, -1, 0])
+            y = y0 + height*np.array([0, 0.5, 1, 0.5, 0])
+            ctx.ax.fill(x, y, '-', alpha=1, **_cycling(kwargs))
+        else:
+            batch.add_diamond(t0, markerWidth/timedelta(1), y0, height, kwargs["color"])
 
         horizontalalignment = "left" if self.align == "right" else "right"  # matplotlib is confusing
-        plt.text(t0 + markerWidth/2*(1 if self.align == "right" else -1),
-                 y0 + (0.9 if self.valign == "top" else 0.1)*self.height, self.descrip,
-                 horizontalalignment=horizontalalignment, verticalalignment='center',
-                 fontsize=self.fontsize, zorder=10)
+        (ctx.ax.text if batch is None else batch.add_text)(
+            t0 + markerWidth/2*(1 if self.align == "right" else -1),
+            y0 + (0.9 if self.valign == "top" else 0.1)*height, self.descrip,
+            horizontalalignment=horizontalalignment, verticalalignment='center',
+            fontsize=ctx.fontsize, zorder=10)
 
         return 1
 
@@ -170,28 +225,41 @@ class Functionality(Milestone):
         return "Functionality"
 
     def getData(self):
-        return [self.descrip, self.t0.strftime('%Y-%m-%d'), self.dy, self.lengthArrow,
+        return [self.descrip, _isoformat(self.t0), self.dy, self._lengthArrow,
                 self._color, self._border, self.drow]
 
     def draw(self, dy=0, *args, **kwargs):
+        if kwargs.get("ctx") is None:
+            kwargs["ctx"] = RenderContext.from_defaults()
+        ctx = kwargs["ctx"]
+
         if super().draw(*args, **kwargs) == 0:
             return 0
 
-        y0 = self.height*(1.1*(self.row - self.drow))
+        height = ctx.height
+        y0 = height*(1.1*(ctx.row - self.drow))
 
-        x0 = mdates.date2num(self.t0)
-        dx = self.lengthArrow if self._lengthArrow is None else self._lengthArrow
+        dx = ctx.lengthArrow if self._lengthArrow is None else self._lengthArrow
+        color = kwargs.get("color", ctx.color if self._color is None else self._color)
 
-        plt.arrow(x0, y0 + (0.5 + self.dy)*self.height, dx, 0, length_includes_head=True,
-                  head_length=0.15*dx, head_width=0.2*self.height,
-                  color=kwargs.get("color",
-                                   self.color if self._color is None else self._color))
+        batch = kwargs.get("batch")
+        if batch is None:
+            import matplotlib.dates as mdates
+
+            x0 = mdates.date2num(self.t0)
+            ctx.ax.arrow(x0, y0 + (0.5 + self.dy)*height, dx, 0, length_includes_head=True,
+                         head_length=0.15*dx, head_width=0.2*height, color=color)
+        else:
+            batch.add_arrow(self.t0, y0 + (0.5 + self.dy)*height, dx, 0.2*height, color)
 
         return 1
 
 class Manipulation:
     """Modify the state of the system, rather than describing an activity or milestone"""
-    pass
+
+    def apply(self, ctx):
+        """Apply the manipulation to a `RenderContext`"""
+        raise NotImplementedError(f"{type(self).__name__}.apply")
 
 class AdvanceRow(Manipulation):
     """A class used to advance the row counter"""
@@ -205,6 +273,9 @@ class AdvanceRow(Manipulation):
     def getData(self):
         return [self.drow]
 
+    def apply(self, ctx):
+        ctx.row -= self.drow
+
 class Color(Manipulation):
     """A class used to set the default Activity colour"""
     def __init__(self, color, border=None):
@@ -217,7 +288,13 @@ class Color(Manipulation):
     def getData(self):
         return [self.color, self.border if self.border else '']
 
+    def apply(self, ctx):
+        ctx.color = self.color
+        ctx.border = self.border
+
     def set_default_color(self):
+        """Set the class-wide default colour (n.b. `show_activities` uses
+        `apply` instead, and doesn't modify the class)"""
         Activity.color = self.color
         Activity.border = self.border
 
@@ -233,7 +310,11 @@ class MarkerWidth(Manipulation):
     def getData(self):
         return [self.markerWidth]
 
+    def apply(self, ctx):
+        ctx.markerWidth = self.markerWidth
+
     def set_default_markerWidth(self):
+        """Set the class-wide default markerWidth (c.f. `apply`)"""
         Milestone.markerWidth = self.markerWidth
 
 class LengthArrow(Manipulation):
@@ -248,21 +329,228 @@ class LengthArrow(Manipulation):
     def getData(self):
         return [self.lengthArrow]
 
+    def apply(self, ctx):
+        ctx.lengthArrow = self.lengthArrow
+
     def set_default_lengthArrow(self):
+        """Set the class-wide default lengthArrow (c.f. `apply`)"""
         Functionality.lengthArrow = self.lengthArrow
 
 
+class Calendar(Manipulation):
+    """A class used to set the working days of the Activities that follow
+    (e.g. those of a site, or of a colour); the numerical durations of
+    those Activities are in working days.  Put one at the start of a
+    timeline to make it the default
+
+    weekmask: the working days of the week, as for `numpy.busdaycalendar`
+      (e.g. "1111100" or "Mon Tue Wed Thu Fri")
+    holidays: the days that aren't worked, as a list of dates or a
+      space-separated string; a range of days (e.g. a shutdown) may be
+      written first/last, e.g. "2021-12-20/2022-01-02"
+
+    An Activity of n working days runs from the start of its first
+    working day (t0, or the next working day if t0 isn't one) to the end
+    of its nth; fractional days are allowed.  The methods work on arrays
+    of dates, so whole timelines are converted at once
+    """
+
+    def __init__(self, weekmask="1111100", holidays=()):
+        if isinstance(holidays, str):
+            holidays = holidays.split()
+
+        days = []
+        for h in holidays:
+            if isinstance(h, str) and "/" in h:
+                first, last = h.split("/")
+                days.append(np.arange(np.datetime64(first, "D"), np.datetime64(last, "D") + 1))
+            else:
+                days.append([np.datetime64(h, "D")])
+
+        self._busdaycal = np.busdaycalendar(weekmask=weekmask if weekmask else "1111100",
+                                            holidays=np.concatenate(days) if days else [])
+
+    def __str__(self):
+        return "Calendar"
+
+    def __eq__(self, other):
+        return isinstance(other, Calendar) and self.spec == other.spec
+
+    def __hash__(self):
+        return hash(self.spec)
+
+    @property
+    def weekmask(self):
+        return "".join("1" if d else "0" for d in self._busdaycal.weekmask)
+
+    @property
+    def holidays(self):
+        """The holidays, as a sorted array of datetime64[D]s"""
+        return self._busdaycal.holidays
+
+    @property
+    def spec(self):
+        """The weekmask and holidays as a string, with consecutive holidays
+        written as ranges; Calendar(*spec.split(" ", 1)) is equivalent
+        """
+        return " ".join(self.getData()).rstrip()
+
+    def getData(self):
+        holidays = self.holidays
+        breaks = np.flatnonzero(np.diff(holidays) != np.timedelta64(1, "D")) + 1
+        ranges = []
+        for run in np.split(holidays, breaks) if len(holidays) else []:
+            ranges.append(str(run[0]) if len(run) == 1 else f"{run[0]}/{run[-1]}")
+
+        return [self.weekmask, " ".join(ranges)]
+
+    def apply(self, ctx):
+        pass                            # the calendar doesn't affect drawing
+
+    def end_dates(self, t0, duration):
+        """Return the ends of Activities that start at t0 and last duration
+        working days, as datetime64[us]s
+
+        t0: datetime64s or datetimes (an array, or a scalar)
+        duration: the number of working days (an array, or a scalar)
+        """
+        t0 = np.asarray(t0, dtype="datetime64[us]")
+        duration = np.asarray(duration, dtype=float)
+
+        lastDay = np.ceil(duration) - 1  # number of working days before the last (perhaps partial) one
+        last = np.busday_offset(t0.astype("datetime64[D]"), np.maximum(lastDay, 0).astype(np.int64),
+                                roll="forward", busdaycal=self._busdaycal)
+        end = last.astype("datetime64[us]") + np.round((duration - lastDay)*86400e6).astype("timedelta64[us]")
+
+        return np.where(duration > 0, end, t0)
+
+    def durations(self, t0, t1):
+        """Return the number of working days between t0 and t1 (the inverse
+        of `end_dates`), as floats
+        """
+        t0 = np.asarray(t0, dtype="datetime64[us]")
+        t1 = np.asarray(t1, dtype="datetime64[us]")
+
+        lastDay = t1.astype("datetime64[D]")
+        fraction = (t1 - lastDay.astype("datetime64[us]"))/np.timedelta64(1, "D")
+        return (np.busday_count(t0.astype("datetime64[D]"), lastDay, busdaycal=self._busdaycal)
+                + np.where(np.is_busday(lastDay, busdaycal=self._busdaycal), fraction, 0))
+
+    def convert(self, t0, t1, calendar):
+        """Return the ends of Activities that start at t0 and take as many
+        working days in calendar as [t0, t1) does in this one
+        """
+        return calendar.end_dates(t0, self.durations(t0, t1))
+
+
+def _default_settings():
+    """The Color, MarkerWidth and LengthArrow in effect at the start of a
+    file"""
+    return dict(Color=Color(Activity.color, Activity.border),
+                MarkerWidth=MarkerWidth(Milestone.markerWidth),
+                LengthArrow=LengthArrow(Functionality.lengthArrow))
+
+
+class RenderContext:
+    """The state used while drawing a set of activities
+
+    show_activities creates one of these for each call and passes it down
+    to the `draw` methods, and `Manipulation`s modify it via their `apply`
+    methods; the class attributes of `Activity` and its subclasses are only
+    used as the initial defaults and are never modified.  This makes it
+    possible to draw several timelines at once (e.g. in threads, each with
+    its own `matplotlib.figure.Figure`)
+
+    ax: the matplotlib Axes to draw into
+    row: the row currently being drawn
+    height: height of each activity bar
+    fontsize: fontsize for labels
+    color, border: default colour and border of activities
+    markerWidth: default width of Milestones' markers, in days
+    lengthArrow: default length of Functionalities' arrows, in days
+    stats: a `RenderStats` to record timings in, or None
+    """
+
+    def __init__(self, ax, row=0, height=None, fontsize=None, color=None, border=None,
+                 markerWidth=None, lengthArrow=None, stats=None):
+        self.ax = ax
+        self.stats = stats
+        self.row = row
+        self.height = Activity.height if height is None else height
+        self.fontsize = Activity.fontsize if fontsize is None else fontsize
+        self.color = Activity.color if color is None else color
+        self.border = Activity.border if border is None else border
+        self.markerWidth = Milestone.markerWidth if markerWidth is None else markerWidth
+        self.lengthArrow = Functionality.lengthArrow if lengthArrow is None else lengthArrow
+        self._axesWidth = None
+
+    def axes_width(self):
+        """Return the width of the Axes, in points (measured once per
+        RenderContext, as the Axes doesn't change size while drawing)
+        """
+        if self._axesWidth is None:
+            self._axesWidth = _axes_width(self.ax)
+        return self._axesWidth
+
+    @classmethod
+    def from_defaults(cls, ax=None):
+        """Return a RenderContext drawing into ax (default: the current Axes),
+        initialised from the class attributes of Activity etc.
+
+        Used when an Activity is drawn directly, rather than by
+        `show_activities`
+        """
+        if ax is None:
+            import matplotlib.pyplot as plt
+            ax = plt.gca()
+
+        return cls(ax, row=Activity.row)
+
+
 def get_data_dir():
     return re.sub(r"/python/.*$", "", __file__)
 
 def show_activities(activities, height=0.1, fontsize=7, show_today=True,
-                    startDate="1958-02-05", endDate="2099-12-31"):
+                    startDate="1958-02-05", endDate="2099-12-31", batched=False, index=None, ax=None,
+                    stats=None, callback=None, profile=False, layout=None, lod=None):
     """Plot a set of activities
 
-    activities: list of list of Activities
+    activities: list of list of Activities, an `ActivityTable`, or a
+      `TimelineNode` (drawn as its current cut; see
+      `TimelineNode.to_activities`)
     height:  height of each activity bar
     fontsize: fontsize for labels (passed to plt.text)
     show_today: indicate today by a dashed vertical line
+    batched: draw all the bars, borders, diamonds and arrows as a few
+      matplotlib collections rather than one artist per item.  The result
+      looks the same, but is much faster for large numbers of activities.
+      An `ActivityTable` is always drawn this way
+    index: an `IntervalIndex` built over activities, used to find the
+      entries visible between startDate and endDate without looking at
+      the rest (the index's table is drawn, and activities is ignored)
+    ax: the matplotlib Axes to draw into (default: the current Axes).  All
+      the drawing state is held in a `RenderContext` rather than in the
+      classes, so different timelines may be drawn into different Axes (or
+      `matplotlib.figure.Figure`s) concurrently
+    stats: a `RenderStats` in which to record the time spent in each phase
+      of drawing, and the numbers of entries drawn and culled and of
+      artists created
+    callback: a function to call with the `RenderStats` when drawing is
+      complete (if stats is None, one is created)
+    profile: run the drawing under cProfile, saving a `pstats.Stats` in
+      the RenderStats's profile (if stats is None, one is created)
+
+    layout: a `RowLayout` returned by `pack_rows(activities)`, giving the
+      row of each entry; the inner lists, `AdvanceRow`s and drows are then
+      ignored when choosing rows.  It may be reused for any window
+    lod: True, or a `LevelOfDetail` built on activities, to draw windows
+      holding many entries as shaded coverage spans per row, and to redraw
+      in more detail whenever the x-limits change (e.g. when zooming in
+      interactively).  If True, a LevelOfDetail is built from activities
+      (and layout); build your own to reuse it for many plots
+
+    Returns the RenderStats if any of stats, callback, or profile were
+    specified, otherwise None
 
     In general each inner list of activities is drawn on its own row but you can
     modify this by using pseudo-activity `AdvanceRow`.  Also
@@ -285,9 +573,146 @@ def show_activities(activities, height=0.1, fontsize=7, show_today=True,
             ],
         ]
 """
-    Activity.height = height
-    Activity.fontsize = fontsize
+    if stats is None and (callback is not None or profile):
+        stats = RenderStats()
+
+    if ax is None:
+        import matplotlib.pyplot as plt  # here so that reading and writing timelines doesn't need matplotlib
+        ax = plt.gca()
+
+    if isinstance(startDate, str):
+        startDate = datetime.fromisoformat(startDate)
+    if isinstance(endDate, str):
+        endDate = datetime.fromisoformat(endDate)
+
+    if index is not None:
+        activities = index.table
+    else:
+        from .hierarchy import TimelineNode  # here to avoid circular imports
+
+        if isinstance(activities, TimelineNode):
+            activities = activities.to_activities()
+
+    if profile:
+        import cProfile
+        import pstats
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        _show_activities(activities, ax, height, fontsize, show_today, startDate, endDate, batched, index,
+                         stats, layout, lod)
+    finally:
+        if profile:
+            profiler.disable()
+            stats.profile = pstats.Stats(profiler)
+
+    if callback is not None:
+        callback(stats)
+
+    return stats
+
+
+def _show_activities(activities, ax, height, fontsize, show_today, startDate, endDate, batched, index,
+                     stats, layout, lod):
+    """The implementation of show_activities"""
+    from .table import ActivityTable  # here to avoid circular imports
+    from .batching import ArtistBatch   # here to load matplotlib only when drawing
+    from .lod import LevelOfDetail
+
+    if lod is not None and lod is not False:
+        if not isinstance(lod, LevelOfDetail):
+            lod = LevelOfDetail(activities, layout=layout)
+
+        with _timer(stats, "extent"):
+            xlim, ylim = lod.limits(height, startDate, endDate)
+        ax.xaxis_date()
+        ax.set_xlim(xlim)
+        ax.set_ylim(ylim)
+
+        nArtist = len(ax.get_children())
+        with _timer(stats, "draw"):
+            nDrawn = lod.attach(ax, height=height, fontsize=fontsize)
+
+        if stats is not None:
+            stats.nDrawn += nDrawn
+            stats.nCulled += len(lod.index) - nDrawn
+            stats.nArtist += len(ax.get_children()) - nArtist
+
+        _finish_plot(ax, startDate, show_today, stats)
+        return
+
+    if isinstance(activities, ActivityTable):
+        batch = ArtistBatch()
+        with _timer(stats, "draw"):
+            nDrawn = activities.draw(batch, height=height, fontsize=fontsize, startDate=startDate,
+                                     endDate=endDate, index=index, ax=ax, stats=stats, layout=layout)
+        with _timer(stats, "collections"):
+            artists = batch.finish(ax)
+
+        if stats is not None:
+            stats.nDrawn += nDrawn
+            stats.nCulled += int(activities.isItem.sum()) - nDrawn
+            stats.nArtist += len(artists)
+
+        _finish_plot(ax, startDate, show_today, stats)
+        return
+
+    with _timer(stats, "extent"):
+        dateMin, dateMax = get_extent(activities, startDate, endDate)
+    totalDuration = dateMax - dateMin  # used in line-wrapping the labels
+
+    batch = ArtistBatch() if batched else None
+    ctx = RenderContext(ax, row=0, height=height, fontsize=fontsize, stats=stats)
+    nArtist = len(ax.get_children())
+
+    if layout is not None:
+        nEntry = sum(len(aa) for aa in activities)
+        if len(layout) != nEntry:
+            raise ValueError(f"The layout has {len(layout)} entries, but there are {nEntry} activities")
+        rows = layout.rows.tolist()
+
+    nDrawn = nItem = 0
+    i = -1                              # index of the entry a, counting across all the inner lists
+    with _timer(stats, "draw"):
+        for aa in activities:
+            nActivity = 0
+            for a in aa:
+                i += 1
+                if isinstance(a, Manipulation):
+                    a.apply(ctx)
+                    continue
+
+                if layout is not None:
+                    ctx.row = a.drow - rows[i]  # the draw methods use row - drow
+
+                nActivity += a.draw(totalDuration=totalDuration, startDate=startDate, endDate=endDate,
+                                    batch=batch, ctx=ctx)
+                nItem += 1
+
+            if nActivity > 0:
+                ctx.row -= 1
+            nDrawn += nActivity
+
+    if batch is not None:
+        with _timer(stats, "collections"):
+            batch.finish(ax)
+
+    if stats is not None:
+        stats.nDrawn += nDrawn
+        stats.nCulled += nItem - nDrawn
+        stats.nArtist += len(ax.get_children()) - nArtist
+
+    _finish_plot(ax, startDate, show_today, stats)
+
 
+def get_extent(activities, startDate="1958-02-05", endDate="2099-12-31"):
+    """Return the (start, end) of the part of a list of lists of activities
+    that lies within [startDate, endDate], as datetimes; (None, None) if
+    none of it does
+
+    See also `ActivityTable.extent`
+    """
     if isinstance(startDate, str):
         startDate = datetime.fromisoformat(startDate)
     if isinstance(endDate, str):
@@ -318,89 +743,177 @@ def show_activities(activities, height=0.1, fontsize=7, show_today=True,
             if dateMax is None or t1 > dateMax:
                 dateMax = t1
 
-    totalDuration = dateMax - dateMin  # used in line-wrapping the labels
-
-    Activity.row = 0
-    for aa in activities:
-        nActivity = 0
-        for a in aa:
-            if isinstance(a, Manipulation):
-                if isinstance(a, Color):
-                    a.set_default_color()
-                elif isinstance(a, AdvanceRow):
-                    Activity.row -= a.drow
-                elif isinstance(a, MarkerWidth):
-                    a.set_default_markerWidth()
-                elif isinstance(a, LengthArrow):
-                    a.set_default_lengthArrow()
-                else:
-                    raise NotImplemented(a)
-
-                continue
-
-            nActivity += a.draw(totalDuration=totalDuration, startDate=startDate, endDate=endDate)
-
-        if nActivity > 0:
-            Activity.row -= 1
-
-    if show_today and datetime.now() > startDate:
-        plt.axvline(datetime.now(), ls='--', color='black', alpha=0.5, zorder=-1)
-    plt.grid(axis='x')
-
-    plt.yticks(ticks=[], labels=[])
-    plt.gcf().autofmt_xdate()
-    plt.gca().fmt_xdata = mdates.DateFormatter('%Y-%m-%d %H:%M:%S.02 ');
+    return dateMin, dateMax
 
-    plt.tight_layout()
-
-
-def read_activities(fileName):
-    activities = []
+
+def _cycling(kwargs):
+    """Return kwargs without a color of None, so that plt.fill (which
+    doesn't cycle if passed color=None) and plt.plot use the next colour in
+    the cycle
+    """
+    return {k: v for k, v in kwargs.items() if not (k == "color" and v is None)}
+
+
+def _finish_plot(ax, startDate, show_today, stats=None):
+    """Add the date grid (and maybe today's date) to the plot, and tidy it
+    up"""
+    import matplotlib.dates as mdates
+
+    with _timer(stats, "finish"):
+        if show_today and datetime.now() > startDate:
+            ax.axvline(datetime.now(), ls='--', color='black', alpha=0.5, zorder=-1)
+        ax.grid(axis='x')
+
+        ax.set_yticks([])
+        ax.figure.autofmt_xdate()
+        ax.fmt_xdata = mdates.DateFormatter('%Y-%m-%d %H:%M:%S.02 ')
+
+    with _timer(stats, "tight_layout"):
+        ax.figure.tight_layout()
+
+
+class TimelineFormatError(RuntimeError):
+    """An error in a timeline file, reported with its file name and line"""
+
+    def __init__(self, fileName, lineno, message):
+        self.fileName = fileName
+        self.lineno = lineno
+        self.message = message
+        super().__init__(f"{fileName}:{lineno}: {message}")
+
+
+# The number of fields expected after the type for each type of CSV row
+_csvFields = dict(Activity=["descrip", "t0", "duration", "color", "border", "markerWidth", "drow"],
+                  AdvanceRow=["drow"],
+                  Calendar=["weekmask", "holidays"],
+                  Color=["color", "border"],
+                  Functionality=["descrip", "t0", "dy", "lengthArrow", "color", "border", "drow"],
+                  LengthArrow=["lengthArrow"],
+                  MarkerWidth=["markerWidth"],
+                  Milestone=["descrip", "t0", "color", "border", "align", "valign", "markerWidth", "drow"],
+                  )
+
+
+def _isoformat(date):
+    """Format a datetime for a CSV file: as a date if it's at midnight, else
+    as a date and time
+    """
+    return date.strftime("%Y-%m-%d") if date.time() == datetime.min.time() else date.isoformat()
+
+
+def _check_fields(what, args):
+    """Check that a CSV row's type is known and that it has the right number
+    of fields, returning the fields as a dict; raises ValueError if not
+    """
+    if what not in _csvFields:
+        raise ValueError(f"Unknown type of entry {what!r}; expected one of {', '.join(_csvFields)}")
+
+    names = _csvFields[what]
+    if len(args) != len(names):
+        raise ValueError(f"Expected {len(names)} fields after {what} ({', '.join(names)}); saw {len(args)}")
+
+    return dict(zip(names, args))
+
+
+def _number(value, name, convert=float, required=False):
+    """Convert a CSV field to a number; an empty field is None unless the
+    field is required
+    """
+    if value == "":
+        if required:
+            raise ValueError(f"Missing value for {name}")
+        return None
+    try:
+        value = convert(value)
+    except ValueError:
+        raise ValueError(f"Invalid {name} {value!r}") from None
+
+    if convert == float and value.is_integer():
+        value = int(value)
+    return value
+
+
+def _make_activity(what, args, calendar=None):
+    """Return the Activity or Manipulation described by a row of CSV
+
+    calendar: the `Calendar` in effect, if any
+    """
+    fields = _check_fields(what, args)
+    for name in ["drow", "dy", "markerWidth", "lengthArrow"]:
+        if name in fields:
+            required = name in ("drow", "dy") or what in ("MarkerWidth", "LengthArrow")
+            fields[name] = _number(fields[name], name, int if name == "drow" else float, required)
+    for name in ["color", "border"]:
+        if fields.get(name) == "":
+            fields[name] = None
+
+    try:
+        if what == "Activity":
+            duration = fields["duration"]
+            try:
+                fields["duration"] = float(duration)  # a number of (working) days
+            except ValueError:
+                pass                    # an end date
+            else:
+                if not np.isfinite(fields["duration"]):
+                    raise ValueError(f"Invalid duration {duration!r}")
+            return Activity(calendar=calendar, **fields)
+        elif what == "AdvanceRow":
+            return AdvanceRow(**fields)
+        elif what == "Calendar":
+            return Calendar(**fields)
+        elif what == "Color":
+            return Color(**fields)
+        elif what == "Functionality":
+            return Functionality(**fields)
+        elif what == "LengthArrow":
+            return LengthArrow(**fields)
+        elif what == "MarkerWidth":
+            return MarkerWidth(**fields)
+        elif what == "Milestone":
+            return Milestone(**fields)
+    except ValueError as e:             # e.g. from fromisoformat
+        raise ValueError(f"Invalid {what}: {e}") from None
+
+
+def iter_activities(fileName):
+    """Read a set of activities written by `write_activities`, yielding one
+    list of activities (a block of lines terminated by a blank line) at a
+    time
+
+    Errors are reported as `TimelineFormatError`, giving the line number
+    """
     with open(fileName) as fd:
         csvin = csv.reader(fd)
 
         activitySet = []
-        activities.append(activitySet)
-
+        calendar = None
         for args in csvin:
             if len(args) == 0:
+                yield activitySet
                 activitySet = []
-                activities.append(activitySet)
                 continue
 
             what = args.pop(0)
+            try:
+                a = _make_activity(what, args, calendar)
+            except ValueError as e:
+                raise TimelineFormatError(fileName, csvin.line_num, str(e)) from None
 
-            if what == "Activity":
-                descrip, t0, duration, color, border, markerWidth, drow = args
-                drow = int(drow)
-                a = Activity(descrip, t0, duration, color, border, markerWidth=markerWidth, drow=drow)
-            elif what == "AdvanceRow":
-                drow = int(args[0])
-                a = AdvanceRow(drow)
-            elif what == "Color":
-                color, border = args
-                a = Color(color, border)
-            elif what == "Functionality":
-                descrip, t0, dy, lengthArrow, color, border, drow = args
-                drow = int(drow)
-                a = Functionality(descrip, t0, dy, lengthArrow, color, border, drow=drow)
-            elif what == "LengthArrow":
-                lengthArrow = int(args[0])
-                a = LengthArrow(lengthArrow)
-            elif what == "MarkerWidth":
-                markerWidth = int(args[0])
-                a = MarkerWidth(markerWidth)
-            elif what == "Milestone":
-                descrip, t0, color, border, align, valign, markerWidth, drow = args
-                drow = int(drow)
-                a = Milestone(descrip, t0, color, border, drow=drow,
-                              align=align, valign=valign, markerWidth=markerWidth)
-            else:
-                raise RuntimeError(what)
-
+            if isinstance(a, Calendar):
+                calendar = a
             activitySet.append(a)
 
-    return activities
+        yield activitySet
+
+
+def read_activities(fileName):
+    """Read a set of activities written by `write_activities`
+
+    Returns a list of lists of activities; see also `iter_activities` and,
+    for large files, `read_activity_table`
+    """
+    return list(iter_activities(fileName))
 
 
 def write_activities(activities, fileName=None):
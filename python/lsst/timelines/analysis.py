@@ -0,0 +1,222 @@
+import numpy as np
+
+from .table import ActivityTable
+
+__all__ = ["LoadProfile", "load_profile"]
+
+_maxCells = 2**27                       # the largest number of (category, bin)s in a profile
+
+
+class LoadProfile:
+    """The number of Activities in progress, and the time spent on them, in
+    each of a set of bins of time; see `load_profile`
+
+    edges: the nBin + 1 edges of the bins, as datetime64s; bin i is
+      [edges[i], edges[i + 1])
+    categories: the nCategory categories (e.g. colours) that the Activities
+      were divided into
+    counts: int array (nCategory, nBin) of the number of Activities that
+      are in progress at some time in each bin
+    peak: int array (nCategory, nBin) of the largest number of Activities
+      in progress at the same time in each bin
+    busy: float array (nCategory, nBin) of the total time spent on
+      Activities in each bin, in days (e.g. two overlapping Activities
+      that span a 7-day bin give 14)
+    """
+
+    def __init__(self, edges, categories, counts, peak, busy, by=None):
+        self.edges = edges
+        self.categories = categories
+        self.counts = counts
+        self.peak = peak
+        self.busy = busy
+        self.by = by
+
+    def __len__(self):
+        return len(self.edges) - 1
+
+    def __str__(self):
+        return "LoadProfile(%d bins from %s to %s, %d categories)" % (
+            len(self), self.edges[0], self.edges[-1], len(self.categories))
+
+    @property
+    def total(self):
+        """The total time spent on each category, in days, as a dict"""
+        return dict(zip(self.categories, self.busy.sum(axis=1).tolist()))
+
+    def plot(self, ax=None, what="counts", alpha=0.3, colors=None):
+        """Plot the profile as stacked steps beneath the bars drawn by
+        `show_activities`, with its own y-axis on the right
+
+        ax: the Axes containing the timeline (default: the current Axes)
+        what: the quantity to plot: "counts", "peak", or "busy"
+        colors: the colour of each category (default: the categories
+          themselves if they're colours, else matplotlib's colour cycle)
+
+        Returns the Axes of the profile (a twin of ax)
+        """
+        import matplotlib.dates as mdates
+        import matplotlib.pyplot as plt
+
+        if what not in ("counts", "peak", "busy"):
+            raise ValueError(f"Unknown quantity {what!r}; expected \"counts\", \"peak\", or \"busy\"")
+        if ax is None:
+            ax = plt.gca()
+        if colors is None and self.by in ("color", "border"):
+            colors = ["C0" if c is None else c for c in self.categories]
+
+        xlim = ax.get_xlim()
+        twin = ax.twinx()
+        ax.set_zorder(twin.get_zorder() + 1)   # draw the timeline on top of the profile
+        ax.patch.set_visible(False)
+
+        x = mdates.date2num(self.edges)
+        base = np.zeros(len(self))
+        for i, (category, values) in enumerate(zip(self.categories, getattr(self, what))):
+            twin.stairs(base + values, x, baseline=base.copy(), fill=True, alpha=alpha, linewidth=0,
+                        color=None if colors is None else colors[i],
+                        label=None if self.by is None else str(category))
+            base += values
+
+        twin.set_ylim(0, 1.05*base.max() if len(base) and base.max() > 0 else 1)
+        twin.set_ylabel(dict(counts="Activities in progress", peak="Most concurrent Activities",
+                             busy="Days of work")[what])
+        ax.set_xlim(xlim)
+
+        return twin
+
+
+def load_profile(timeline, startDate=None, endDate=None, binSize="day", by=None):
+    """Count the Activities in progress in each bin of time, and the time
+    spent on them, optionally divided into categories
+
+    timeline: an `ActivityTable`, or a list of lists of Activities (e.g.
+      from `read_activities`)
+    startDate, endDate: the range to cover (default: all the Activities)
+    binSize: "day", "week", "month", "quarter", "year", or a number of days;
+      days, months, quarters, and years are aligned to calendar boundaries
+      (weeks start on Mondays)
+    by: None to count all the Activities together; "color" or "border" to
+      count each colour (or border colour) separately; or "list" to count
+      each inner list of activities separately
+
+    Only Activities are counted (Milestones and Functionalities take no
+    time).  Each Activity is the half-open interval [t0, t0 + duration), so
+    an Activity that ends on the day that another starts doesn't overlap
+    it.
+
+    The profile is computed with vectorised event sweeps: each Activity's
+    start and end are events, the counts in each bin are cumulative sums of
+    the events bucketed by bin, and the peaks are the maxima of the running
+    sum of the sorted events.  The cost is O(N log N) in the number of
+    Activities, plus O(nBin) per category.
+
+    Returns a `LoadProfile`
+    """
+    table = timeline if isinstance(timeline, ActivityTable) else ActivityTable.from_activities(timeline)
+
+    isActivity = (table.kind == ActivityTable.ACTIVITY) & (table.t1 > table.t0)
+    ind = np.flatnonzero(isActivity)
+    t0, t1 = table.t0[ind], table.t1[ind]
+    #
+    # The categories
+    #
+    if by is None:
+        categories, code = [None], np.zeros(len(ind), dtype=np.int64)
+    elif by in ("color", "border"):
+        values = table.styles()[0 if by == "color" else 1][ind]
+        codes = {}
+        code = np.array([codes.setdefault(v, len(codes)) for v in values], dtype=np.int64)
+        categories = list(codes)
+    elif by == "list":
+        categories, code = np.unique(table.group[ind], return_inverse=True)
+        categories = categories.tolist()
+    else:
+        raise ValueError(f"Unknown category {by!r}; expected None, \"color\", \"border\", or \"list\"")
+    nCategory = len(categories)
+    #
+    # The bins
+    #
+    if startDate is None:
+        startDate = t0.min() if len(ind) else np.datetime64("today")
+    if endDate is None:
+        endDate = t1.max() if len(ind) else startDate
+    edges = _bin_edges(np.datetime64(startDate, "us"), np.datetime64(endDate, "us"), binSize)
+    nBin = len(edges) - 1
+    if nCategory*nBin > _maxCells:
+        raise ValueError(f"A profile of {nCategory} categories by {nBin} bins is too large; "
+                         "use a larger binSize, a shorter range, or fewer categories")
+    #
+    # Bucket each event by the first edge that it precedes, and accumulate
+    # along the edges to find e.g. the number of starts before each edge.
+    # Times are in days since edges[0]
+    #
+    day = np.timedelta64(1, "D")
+    x0, x1, e = (t0 - edges[0])/day, (t1 - edges[0])/day, (edges - edges[0])/day
+
+    def accumulate(bucket, weights=None):
+        counts = np.bincount(code*(nBin + 2) + bucket, weights=weights, minlength=nCategory*(nBin + 2))
+        return np.cumsum(counts.reshape(nCategory, nBin + 2), axis=1)[:, :nBin + 1]
+
+    startBucket = np.searchsorted(e, x0, side="right")  # t0 < edges[k] for k >= startBucket
+    endBucket = np.searchsorted(e, x1, side="left")     # t1 <= edges[k] for k >= endBucket
+    nStarted, nEnded = accumulate(startBucket), accumulate(endBucket)
+
+    counts = nStarted[:, 1:] - nEnded[:, :-1]
+    worked = (nStarted*e - accumulate(startBucket, x0)) - (nEnded*e - accumulate(endBucket, x1))
+    busy = np.diff(worked, axis=1)      # worked is the time spent before each edge
+    #
+    # The peaks: the number in progress at the start of each bin, or the
+    # running sum of the sorted events in the bin if that's larger.  Each
+    # category's events sum to 0, so the running sum restarts at each
+    # category; only the sum after the last of the events at a time counts
+    #
+    nOpen = accumulate(np.searchsorted(e, x0, side="left")) - nEnded  # t0 <= edges[k] < t1
+    peak = nOpen[:, :-1].astype(np.int64)
+
+    delta = np.r_[np.ones(len(x0), dtype=np.int64), -np.ones(len(x1), dtype=np.int64)]
+    x, eventCode = np.r_[x0, x1], np.r_[code, code]
+    order = np.lexsort((x, eventCode))
+    x, eventCode = x[order], eventCode[order]
+    running = np.cumsum(delta[order])
+
+    last = np.r_[(x[1:] != x[:-1]) | (eventCode[1:] != eventCode[:-1]), True]
+    eventBin = np.searchsorted(e, x, side="right") - 1
+    last &= (eventBin >= 0) & (eventBin < nBin)
+    np.maximum.at(peak, (eventCode[last], eventBin[last]), running[last])
+
+    return LoadProfile(edges, categories, counts.astype(np.int64), peak, busy, by)
+
+
+def _bin_edges(startDate, endDate, binSize):
+    """Return the edges of the bins of binSize covering [startDate, endDate]
+    as datetime64[us]s; see `load_profile`
+    """
+    months = dict(month=1, quarter=3, year=12)
+    if binSize in months:
+        step = months[binSize]
+        first = startDate.astype("M8[M]").astype(np.int64)
+        first -= first % step
+        last = endDate.astype("M8[M]").astype(np.int64) + 1
+        n = max(1, -(-(last - first)//step))
+        return (first + step*np.arange(n + 1)).astype("M8[M]").astype("M8[us]")
+
+    if binSize == "day":
+        first, step = startDate.astype("M8[D]"), np.timedelta64(1, "D")
+    elif binSize == "week":             # 1970-01-01 was a Thursday
+        first = startDate.astype("M8[D]")
+        first -= (first.astype(np.int64) + 3) % 7
+        step = np.timedelta64(7, "D")
+    elif isinstance(binSize, str):
+        raise ValueError(f"Unknown binSize {binSize!r}; expected "
+                         "\"day\", \"week\", \"month\", \"quarter\", \"year\", or a number of days")
+    else:
+        if binSize <= 0:
+            raise ValueError(f"binSize must be positive, not {binSize}")
+        first, step = startDate, np.timedelta64(int(round(binSize*86400e6)), "us")
+
+    first = first.astype("M8[us]")
+    n = max(1, int(np.ceil((endDate - first)/step)))
+    if first + n*step <= endDate:       # endDate is included in the last bin
+        n += 1
+    return first + step*np.arange(n + 1)
@@ -0,0 +1,263 @@
+import itertools
+
+import numpy as np
+
+import matplotlib as mpl
+import matplotlib.collections as mcollections
+import matplotlib.dates as mdates
+import matplotlib.pyplot as plt
+
+__all__ = ["ArtistBatch"]
+
+
+class ArtistBatch:
+    """Collect the geometry generated by `Activity.draw` and friends, and add
+    it to an Axes as a handful of collections rather than one artist per item
+
+    All bars are gathered into a single `PolyCollection`, all their borders
+    into a single `LineCollection`, and all milestone diamonds and
+    functionality arrows into their own shared `PolyCollection`s.  Labels
+    are still `Text` objects (matplotlib has no text collection) but are
+    created in the same pass, and are excluded from `tight_layout`'s
+    bounding-box calculation as they lie within the Axes.
+
+    Items may be added one at a time (`add_bar` etc.) or as arrays
+    (`add_bars` etc.); dates are kept as `datetime`s or `datetime64`s until
+    `finish` and converted in one vectorised call.
+
+    Colours that are None are replaced as they're added, just as
+    `plt.fill` and `plt.plot` would replace them if the items were drawn
+    one at a time in the same order: bars and diamonds take successive
+    colours from one cycle, bars' outlines from another, and arrows are
+    drawn in the default patch colour (as is a `FancyArrow`).  So adding
+    items in the order that they appear in the timeline gives the same
+    colours as drawing them one per artist; see also `resolve_colors`.
+    """
+
+    def __init__(self):
+        self._bars = []                 # (t0, t1, y0, height, color, border)
+        self._diamonds = []             # (t0, markerWidth, y0, height, color)
+        self._arrows = []               # (t0, y, dx, headWidth, color)
+        self._texts = []                # (t, y, text, kwargs)
+
+        self._barChunks = []            # as above, but each field is an array
+        self._diamondChunks = []
+        self._arrowChunks = []
+
+        cycle = mpl.rcParams["axes.prop_cycle"].by_key().get("color", ["C0"])
+        self._fillColors = itertools.cycle(cycle)  # mimic the cycling of plt.fill
+        self._lineColors = itertools.cycle(cycle)  # and plt.plot
+
+    def __len__(self):
+        return (len(self._bars) + len(self._diamonds) + len(self._arrows)
+                + sum(len(c[0]) for c in self._barChunks + self._diamondChunks + self._arrowChunks))
+
+    def add_bar(self, t0, t1, y0, height, color, border):
+        """Add an Activity's bar spanning [t0, t1] at y0
+
+        border: colour of the outline, or None to use color
+        """
+        color, border = self._resolve_bar(color, border)
+        self._bars.append((t0, t1, y0, height, color, border))
+
+    def add_bars(self, t0, t1, y0, height, colors, borders):
+        """Add many bars at once; the arguments are as for `add_bar` but are
+        arrays (height may be a scalar)
+        """
+        colors, borders = zip(*[self._resolve_bar(c, b) for c, b in zip(colors, borders)]) if len(colors) \
+            else ([], [])
+        self._barChunks.append((t0, t1, y0, height, colors, borders))
+
+    def add_diamond(self, t0, markerWidth, y0, height, color):
+        """Add a Milestone's diamond centred at t0; markerWidth is in days"""
+        self._diamonds.append((t0, markerWidth, y0, height, self._resolve(color, self._fillColors)))
+
+    def add_diamonds(self, t0, markerWidth, y0, height, colors):
+        """Add many diamonds at once; c.f. `add_diamond`"""
+        self._diamondChunks.append((t0, markerWidth, y0, height,
+                                    [self._resolve(c, self._fillColors) for c in colors]))
+
+    def add_arrow(self, t0, y, dx, headWidth, color):
+        """Add a Functionality's arrow starting at (t0, y), dx days long"""
+        self._arrows.append((t0, y, dx, headWidth, _arrow_color(color)))
+
+    def add_arrows(self, t0, y, dx, headWidth, colors):
+        """Add many arrows at once; c.f. `add_arrow`"""
+        self._arrowChunks.append((t0, y, dx, headWidth, [_arrow_color(c) for c in colors]))
+
+    def resolve_colors(self, colors, borders, isBar):
+        """Replace the colours that are None with those that bars (where
+        isBar is true) and diamonds would be given if they were added in
+        the order of the arrays, advancing the cycles
+
+        Used when the bars and diamonds are added in separate calls (e.g. by
+        `ActivityTable.draw`).  Returns new arrays of colours and borders
+        """
+        colors, borders = np.array(colors, dtype=object), np.array(borders, dtype=object)
+        for i in np.flatnonzero(colors == None).tolist():  # noqa: E711
+            if isBar[i]:
+                colors[i], borders[i] = self._resolve_bar(colors[i], borders[i])
+            else:
+                colors[i] = next(self._fillColors)
+
+        return colors, borders
+
+    def add_text(self, t, y, text, **kwargs):
+        """Add a label at (t, y); kwargs are passed to `Axes.text`"""
+        self._texts.append((t, y, text, kwargs))
+
+    def add_texts(self, t, y, texts, **kwargs):
+        """Add many labels at once; c.f. `add_text`"""
+        for args in zip(t, y, texts):
+            self._texts.append(args + (kwargs,))
+
+    def finish(self, ax=None, autoscale=True):
+        """Add all the collected artists to ax (default: current Axes)
+
+        autoscale: update ax's data limits and rescale its view to include
+          the artists
+
+        Returns the list of artists that were created
+        """
+        if ax is None:
+            ax = plt.gca()
+
+        ax.xaxis_date()
+        artists = []
+
+        bars = _concatenate(self._bars, self._barChunks, "MMffOO")
+        if bars is not None:
+            t0, t1, y0, height, color, border = bars
+            x0, x1 = _date2num(t0), _date2num(t1)
+
+            verts = np.empty((len(x0), 5, 2))
+            verts[:, :, 0] = x0[:, None] + (x1 - x0)[:, None]*np.array([0, 1, 1, 0, 0])
+            verts[:, :, 1] = y0[:, None] + height[:, None]*np.array([0, 0, 1, 1, 0])
+
+            fillColors = list(color)
+            lineColors = [c if b is None else b for c, b in zip(color, border)]
+
+            artists.append(mcollections.PolyCollection(verts, facecolors=fillColors, edgecolors=fillColors,
+                                                       linewidths=mpl.rcParams["patch.linewidth"],
+                                                       alpha=0.5))
+            artists.append(mcollections.LineCollection(verts, colors=lineColors,
+                                                       linewidths=mpl.rcParams["lines.linewidth"]))
+
+        diamonds = _concatenate(self._diamonds, self._diamondChunks, "MfffO")
+        if diamonds is not None:
+            t0, markerWidth, y0, height, color = diamonds
+            x0 = _date2num(t0)
+
+            verts = np.empty((len(x0), 5, 2))
+            verts[:, :, 0] = x0[:, None] + markerWidth[:, None]*np.array([0, 1, 0, -1, 0])
+            verts[:, :, 1] = y0[:, None] + height[:, None]*np.array([0, 0.5, 1, 0.5, 0])
+
+            artists.append(mcollections.PolyCollection(verts, facecolors=color, edgecolors=color,
+                                                       linewidths=mpl.rcParams["patch.linewidth"],
+                                                       alpha=1))
+
+        arrows = _concatenate(self._arrows, self._arrowChunks, "MfffO")
+        if arrows is not None:
+            t0, y, dx, headWidth, color = arrows
+            verts = _arrow_verts(_date2num(t0), y, dx, headWidth)
+
+            artists.append(mcollections.PolyCollection(verts, facecolors=color, edgecolors=color,
+                                                       linewidths=mpl.rcParams["patch.linewidth"]))
+
+        for a in artists:
+            ax.add_collection(a, autolim=autoscale)
+        if autoscale:
+            ax.autoscale_view()
+
+        if self._texts:
+            x = _date2num([t for t, y, s, kw in self._texts])
+            for xx, (t, y, s, kwargs) in zip(x, self._texts):
+                text = ax.text(xx, y, s, **kwargs)
+                text.set_in_layout(False)
+                artists.append(text)
+
+        return artists
+
+    @staticmethod
+    def _resolve(color, cycle):
+        return next(cycle) if color is None else color
+
+    def _resolve_bar(self, color, border):
+        """The fill and border colours of a bar; a border of None means "the
+        fill colour", unless that's None too, when plt.plot cycles
+        """
+        if color is None:
+            color = next(self._fillColors)
+            if border is None:
+                border = next(self._lineColors)
+
+        return color, border
+
+
+def _arrow_color(color):
+    return mpl.rcParams["patch.facecolor"] if color is None else color
+
+
+def _concatenate(items, chunks, kinds):
+    """Merge the items added one at a time with those added as arrays
+
+    kinds gives the type of each field: "M" (dates), "f" (floats) or "O"
+    (objects, e.g. colours).  Returns a tuple of arrays, or None if there
+    are no items
+    """
+    if items:
+        chunks = chunks + [tuple(zip(*items))]
+    if not chunks:
+        return None
+
+    dtypes = dict(M="datetime64[us]", f=float)
+    lengths = [len(c[0]) for c in chunks]
+
+    fields = []
+    for kind, values in zip(kinds, zip(*chunks)):
+        if kind == "O":                 # a list, as numpy would interpret e.g. (r, g, b) colours
+            fields.append(list(itertools.chain.from_iterable(values)))
+            continue
+
+        parts = []
+        for v, n in zip(values, lengths):
+            if np.ndim(v) == 0:
+                v = np.full(n, v)
+            parts.append(np.asarray(v, dtype=dtypes[kind]))
+        fields.append(np.concatenate(parts))
+
+    return tuple(fields)
+
+
+def _date2num(dates):
+    """Convert a sequence of datetimes to matplotlib dates in one call"""
+    return mdates.date2num(np.array(dates, dtype="datetime64[us]"))
+
+
+def _arrow_verts(x, y, dx, headWidth, width=0.001):
+    """Return the vertices of horizontal arrows as drawn by `plt.arrow`
+
+    The arrows start at (x, y) and are dx long, with the head included in
+    that length and a head length of 0.15*|dx| (as used by Functionality).
+    The result has shape (len(x), 7, 2) and matches `FancyArrow`'s shape="full"
+    """
+    length = np.abs(dx)
+    hl = 0.15*length
+    hw = headWidth
+
+    # a horizontal arrow with its tip at (0, 0), pointing to +x
+    halfArrow = np.empty((len(x), 5, 2))
+    halfArrow[:, 0] = 0.0
+    halfArrow[:, 1, 0], halfArrow[:, 1, 1] = -hl, -hw/2
+    halfArrow[:, 2, 0], halfArrow[:, 2, 1] = -hl, -width/2
+    halfArrow[:, 3, 0], halfArrow[:, 3, 1] = -length, -width/2
+    halfArrow[:, 4, 0], halfArrow[:, 4, 1] = -length, 0
+
+    verts = np.concatenate([halfArrow[:, :-1], halfArrow[:, -2::-1]*[1, -1]], axis=1)
+
+    direction = np.where(dx < 0, -1.0, 1.0)     # a left-pointing arrow is rotated by pi
+    verts *= direction[:, None, None]
+    verts[:, :, 0] += (x + dx)[:, None]
+    verts[:, :, 1] += y[:, None]
+
+    return verts
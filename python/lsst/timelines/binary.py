@@ -0,0 +1,108 @@
+import json
+import struct
+
+import numpy as np
+
+from .table import ActivityTable, StringTable
+
+__all__ = ["save_activity_table", "load_activity_table"]
+
+_MAGIC = b"TIMELINE"
+_VERSION = 1
+_ALIGN = 64                             # alignment of each column in the file, in bytes
+
+
+def save_activity_table(activities, fileName):
+    """Write a timeline to fileName in a compact binary format
+
+    activities: an `ActivityTable`, or a list of lists of Activities
+
+    The file consists of a short preamble, a JSON header (the number of
+    groups, the category table, and the dtype, offset and length of each
+    column), and then each column as a fixed-width little-endian array
+    aligned to a 64-byte boundary.  The labels are stored as a string
+    table: the UTF-8 bytes of all the labels, plus arrays of their offsets
+    and lengths.  See `load_activity_table`
+    """
+    if not isinstance(activities, ActivityTable):
+        activities = ActivityTable.from_activities(activities)
+    table = activities
+
+    labels = table.labels
+    if not isinstance(labels, StringTable):
+        labels = StringTable.from_strings(labels)
+
+    arrays = {}
+    for name, dtype in ActivityTable.columnTypes.items():
+        if name != "labels":
+            arrays[name] = np.asarray(getattr(table, name)).astype(np.dtype(dtype).newbyteorder("<"))
+    arrays["labels.start"] = labels.start.astype("<i8")
+    arrays["labels.length"] = labels.length.astype("<i4")
+    arrays["labels.data"] = np.asarray(labels.data, dtype=np.uint8)
+
+    categories = [list(c) if isinstance(c, tuple) else c for c in table.categories]  # JSON has no tuples
+    header = dict(nGroup=table.nGroup, nEntry=len(table), categories=categories, columns={})
+    #
+    # Lay out the columns; offsets are relative to the (aligned) end of the
+    # header, so they don't depend on its length
+    #
+    offset = 0
+    for name, arr in arrays.items():
+        header["columns"][name] = dict(dtype=arr.dtype.str, offset=offset, count=len(arr))
+        offset += _padded(arr.nbytes)
+
+    headerBytes = json.dumps(header).encode()
+    dataStart = _padded(len(_MAGIC) + 8 + len(headerBytes))
+
+    with open(fileName, "wb") as fd:
+        fd.write(_MAGIC)
+        fd.write(struct.pack("<II", _VERSION, len(headerBytes)))
+        fd.write(headerBytes)
+        fd.write(b"\0"*(dataStart - fd.tell()))
+
+        for name, arr in arrays.items():
+            fd.write(arr.tobytes())
+            fd.write(b"\0"*(_padded(arr.nbytes) - arr.nbytes))
+
+
+def load_activity_table(fileName, mmap=True):
+    """Read a timeline written by `save_activity_table`
+
+    If mmap is True, the columns are `numpy.memmap` views of the file:
+    nothing is copied, labels are only decoded when they're used, and
+    several processes reading the same file share the same pages.
+    Otherwise the file is read into memory
+
+    Returns an `ActivityTable`
+    """
+    if mmap:
+        buf = np.memmap(fileName, dtype=np.uint8, mode="r")
+    else:
+        buf = np.fromfile(fileName, dtype=np.uint8)
+
+    preamble = len(_MAGIC) + 8
+    if len(buf) < preamble or buf[:len(_MAGIC)].tobytes() != _MAGIC:
+        raise RuntimeError(f"{fileName} is not a binary timeline file")
+
+    version, headerLength = struct.unpack("<II", buf[len(_MAGIC):preamble].tobytes())
+    if version != _VERSION:
+        raise RuntimeError(f"{fileName} has format version {version}; I can only read {_VERSION}")
+
+    header = json.loads(buf[preamble:preamble + headerLength].tobytes())
+    dataStart = _padded(preamble + headerLength)
+
+    arrays = {}
+    for name, desc in header["columns"].items():
+        dtype = np.dtype(desc["dtype"])
+        start = dataStart + desc["offset"]
+        arrays[name] = buf[start:start + desc["count"]*dtype.itemsize].view(dtype)
+
+    labels = StringTable(arrays.pop("labels.data"), arrays.pop("labels.start"), arrays.pop("labels.length"))
+    categories = [tuple(c) if isinstance(c, list) else c for c in header["categories"]]
+
+    return ActivityTable(header["nGroup"], categories, labels=labels, **arrays)
+
+
+def _padded(nbytes):
+    """Round nbytes up to a multiple of _ALIGN"""
+    return (nbytes + _ALIGN - 1)//_ALIGN*_ALIGN
@@ -0,0 +1,205 @@
+from datetime import date
+import hashlib
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from .table import ActivityTable, StringTable
+
+__all__ = ["RenderCache", "hash_timeline"]
+
+_cacheVersion = 1                       # change to invalidate all cached renders
+
+
+def hash_timeline(timeline):
+    """Return a hex digest of a timeline's content
+
+    timeline: an `ActivityTable`, or a list of lists of Activities
+
+    The digest depends only on the parsed entries, so e.g. reformatting
+    or commenting a CSV file doesn't change it, and a timeline hashes the
+    same whether it was read from CSV, loaded from a binary file, or
+    converted from Activities
+    """
+    table = timeline if isinstance(timeline, ActivityTable) else ActivityTable.from_activities(timeline)
+    #
+    # The codes of the interned strings depend on how the table was made, so
+    # renumber them in order of the strings' values
+    #
+    categorical = ("color", "border", "align", "valign")
+    used = np.unique(np.concatenate([getattr(table, name) for name in categorical] + [[-1]]))
+    names = [repr(table.categories[i]) for i in used[used >= 0]]
+    rank = np.full(len(table.categories) + 1, -1, dtype="<i4")  # rank[-1] is for code -1 (None)
+    rank[used[used >= 0]] = np.argsort(np.argsort(names, kind="stable"))
+
+    h = hashlib.blake2b(digest_size=20)
+    h.update(repr((table.nGroup, sorted(names))).encode())
+    for name in table.columnTypes:
+        if name == "line":              # where the entries were in the file doesn't matter
+            continue
+        elif name in categorical:
+            h.update(rank[getattr(table, name)].tobytes())
+        elif name == "labels":
+            labels = table.labels
+            if not isinstance(labels, StringTable):
+                labels = StringTable.from_strings(labels)
+            h.update(labels.length.astype("<i4").tobytes())
+            h.update(np.asarray(labels.data, dtype=np.uint8).tobytes())
+        else:
+            column = getattr(table, name)
+            h.update(column.astype(column.dtype.newbyteorder("<")).tobytes())
+
+    return h.hexdigest()
+
+
+class RenderCache:
+    """An on-disk cache of rendered timelines, keyed by a hash of the
+    timeline and the options used to render it
+
+    directory: where to keep the files (default: $TIMELINES_CACHE, or
+      ~/.cache/lsst-timelines)
+    maxBytes: the largest total size of the cached files; when it's
+      exceeded the least recently used are deleted
+
+    Files are written to a temporary name and then renamed into place, so
+    several processes (e.g. parallel CI jobs) may share a cache
+    """
+
+    def __init__(self, directory=None, maxBytes=500*2**20):
+        if directory is None:
+            directory = _default_directory()
+        self.directory = directory
+        self.maxBytes = maxBytes
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, timeline, **options):
+        """Return the key for timeline (an `ActivityTable`, list of lists, or
+        the value of `hash_timeline`) rendered with options
+
+        options: everything that affects the output (e.g. the window,
+          figsize, and file format).  If show_today is true, today's date
+          is included too.  The versions of matplotlib and of the cache's
+          format, and matplotlib's rcParams, are always included
+        """
+        import matplotlib as mpl
+
+        if not isinstance(timeline, str):
+            timeline = hash_timeline(timeline)
+
+        if options.get("show_today"):
+            options["today"] = date.today()
+
+        h = hashlib.blake2b(digest_size=20)
+        h.update(repr((_cacheVersion, mpl.__version__, timeline, sorted(options.items()))).encode())
+        h.update(repr(sorted(mpl.rcParams.items())).encode())
+
+        return h.hexdigest()
+
+    def fetch(self, key, fileName):
+        """Copy the file cached under key to fileName
+
+        Returns True if it was found, else False
+        """
+        cached = self.lookup(key)
+        if cached is None:
+            return False
+
+        try:
+            shutil.copyfile(cached, fileName)
+        except FileNotFoundError:       # evicted by another process
+            self.hits -= 1
+            self.misses += 1
+            return False
+
+        return True
+
+    def lookup(self, key):
+        """Return the name of the file cached under key (to be read in place),
+        or None if there isn't one
+        """
+        cached = self._path(key)
+        try:
+            os.utime(cached)            # mark it as recently used
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return cached
+
+    def store(self, key, fileName):
+        """Add a copy of fileName to the cache under key, evicting old files
+        if the cache is then too large
+        """
+        fd, tmpName = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        os.close(fd)
+        try:
+            shutil.copyfile(fileName, tmpName)
+            os.replace(tmpName, self._path(key))
+        except BaseException:
+            os.unlink(tmpName)
+            raise
+
+        self.evict()
+
+    def evict(self, maxBytes=None):
+        """Delete the least recently used files until the cache holds no
+        more than maxBytes (default: self.maxBytes)
+
+        Returns the number of files deleted
+        """
+        if maxBytes is None:
+            maxBytes = self.maxBytes
+
+        return _evict(self.directory, maxBytes)
+
+    def clear(self):
+        """Delete all the cached files"""
+        return self.evict(0)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+
+def _evict(directory, maxBytes):
+    """Delete the least recently modified files in directory (except those
+    whose names start with ".") until they total no more than maxBytes
+
+    Returns the number of files deleted
+    """
+    entries = []
+    total = 0
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.name.startswith(".") or not entry.is_file():
+                continue
+            try:
+                st = entry.stat()
+            except FileNotFoundError:   # deleted by another process
+                continue
+            entries.append((st.st_mtime, st.st_size, entry.path))
+            total += st.st_size
+
+    nDeleted = 0
+    for mtime, size, path in sorted(entries):
+        if total <= maxBytes:
+            break
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        nDeleted += 1
+
+    return nDeleted
+
+
+def _default_directory():
+    """The directory for caches: $TIMELINES_CACHE or ~/.cache/lsst-timelines"""
+    default = os.path.join(os.path.expanduser("~"), ".cache", "lsst-timelines")
+    return os.environ.get("TIMELINES_CACHE", default)
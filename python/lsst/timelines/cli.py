@@ -0,0 +1,343 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import csv
+from datetime import datetime
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from .activities import TimelineFormatError, write_activities, _isoformat
+from .cache import RenderCache, hash_timeline
+from .merge import merge_activities
+from .pages import PageResult, render_pages, _Worker, _add_arguments, _check_arguments, _make_pages, \
+    _read_timeline
+from .snapshots import SnapshotCache, read_snapshots
+from .validate import validate, _checks
+
+__all__ = ["main"]
+
+
+def main(argv=None):
+    """The timelines command; see timelines.py -h"""
+    parser = argparse.ArgumentParser(prog="timelines", description="Tools for timelines")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    render = subparsers.add_parser("render", help="Render timelines to files",
+                                   formatter_class=argparse.RawDescriptionHelpFormatter,
+                                   description="""Render CSV (or binary) timelines to PNG, PDF, SVG etc.
+
+Each timeline is written to OUTDIR/<prefix>.<format>, where the prefix
+defaults to the timeline's name.  With --period there's a page per period,
+OUTDIR/<prefix>-<start of period>.<format>, and each --subsystem adds pages
+for just its colours, OUTDIR/<prefix>-<subsystem>[-<start of period>].<format>
+
+Renders are cached, keyed by a hash of the parsed timeline and the rendering
+options, so a page that hasn't changed is copied from the cache instead of
+being drawn again (N.b. with today's date marked, the renders expire daily).
+
+E.g.
+    timelines.py render plans/*.csv --format png pdf --start 2021-01-01 --outdir figures -j 8
+    timelines.py render plan.csv --period quarter --start 2021-01-01 --end 2022-12-31 \\
+                        --format png pdf --subsystem CCS=red --subsystem TS=cyan -j 8
+""")
+    _add_arguments(render)
+    render.add_argument("--cache-dir", help="Directory for the cache (default: $TIMELINES_CACHE, "
+                        "or ~/.cache/lsst-timelines)")
+    render.add_argument("--cache-size", type=float, default=500,
+                        help="Largest size of the cache, in MB; the least recently used renders are evicted")
+    render.add_argument("--no-cache", dest="cache", action="store_false", help="Don't use the cache")
+    render.set_defaults(func=_render)
+
+    slips = subparsers.add_parser("slips", help="Show what slipped between snapshots of a plan",
+                                  formatter_class=argparse.RawDescriptionHelpFormatter,
+                                  description="""Compare dated snapshots of a plan (CSV or binary timelines)
+
+Entries are matched by their kind and label.  The newest snapshot is compared
+with the previous one (or with the last one on or before --since), and the
+entries that moved, were added, or were removed are written as CSV.  The
+snapshots' dates are taken from their file names (e.g. plans-2021-03-20.csv)
+or else from when they were modified.  Parsed snapshots are cached, so only
+new files are parsed when the command is rerun.
+
+E.g.
+    timelines.py slips data/plans-*.csv --since 2021-02-01 --plot slips.png
+""")
+    slips.add_argument("snapshots", nargs="+", help="CSV or binary timeline files")
+    slips.add_argument("--since", help="Compare with the last snapshot on or before this date (ISO format); "
+                       "default: the previous snapshot")
+    slips.add_argument("--all", dest="unchanged", action="store_true",
+                       help="Include the entries that didn't change")
+    slips.add_argument("--output", help="File for the table of slips (default: standard output)")
+    slips.add_argument("--plot", help="File for a plot of the history of the entries that slipped most")
+    slips.add_argument("--plot-count", type=int, default=10, help="Number of entries to plot")
+    slips.add_argument("--cache-dir", help="Directory for the parsed snapshots (default: the snapshots "
+                       "subdirectory of $TIMELINES_CACHE, or of ~/.cache/lsst-timelines)")
+    slips.add_argument("--no-cache", dest="cache", action="store_false", help="Don't use the cache")
+    slips.add_argument("-j", "--processes", type=int, default=1, help="Number of processes")
+    slips.set_defaults(func=_slips)
+
+    check = subparsers.add_parser("validate", help="Check timelines for problems",
+                                  formatter_class=argparse.RawDescriptionHelpFormatter,
+                                  description="""Check CSV (or binary) timelines for problems
+
+Each problem is reported with its file and line number, e.g.
+    plans.csv:12: warning: 'Test M1M3' overlaps 'Ship M1M3' (line 9) on the same row [overlap]
+
+The checks are:
+    negative-duration  Activities that end before they start (error)
+    overlap            Activities that overlap an earlier Activity on the same row (warning)
+    duplicate-label    entries with the same kind and label as an earlier one (warning)
+    unknown-color      colours that matplotlib doesn't recognise (error)
+
+The exit status is 1 if there are errors (or, with --strict, warnings), so
+the command can be used as a pre-commit check.
+
+E.g.
+    timelines.py validate data/*.csv --ignore duplicate-label
+""")
+    check.add_argument("timelines", nargs="+", help="CSV or binary timeline files")
+    check.add_argument("--checks", nargs="+", choices=list(_checks), help="The checks to run (default: all)")
+    check.add_argument("--ignore", nargs="+", choices=list(_checks), default=[], help="Checks not to run")
+    check.add_argument("--strict", action="store_true", help="Fail if there are warnings, as well as errors")
+    check.set_defaults(func=_validate)
+
+    merge = subparsers.add_parser("merge", help="Merge timelines into one",
+                                  formatter_class=argparse.RawDescriptionHelpFormatter,
+                                  description="""Merge CSV timelines (e.g. one per team) into one CSV timeline
+
+The files are streamed, a block of lines (an inner list of activities) at a
+time, and merged in order of each block's earliest date (or, with --by group,
+taking the first block of each file, then the second, ...).  Entries may be
+filtered as they're read; blocks with no entries left are dropped.
+
+E.g.
+    timelines.py merge teams/*.csv --start 2021-06-01 --kind Milestone -o milestones.csv
+""")
+    merge.add_argument("timelines", nargs="+", help="CSV timeline files")
+    merge.add_argument("-o", "--output", help="File for the merged timeline (default: standard output)")
+    merge.add_argument("--by", choices=["date", "group"], default="date", help="How to order the blocks")
+    merge.add_argument("--start", help="Only keep entries that end on or after this date (ISO format)")
+    merge.add_argument("--end", help="Only keep entries that start on or before this date (ISO format)")
+    merge.add_argument("--kind", nargs="+", choices=["Activity", "Milestone", "Functionality"],
+                       help="Only keep these kinds of entry")
+    merge.add_argument("--color", nargs="+", help="Only keep entries drawn in these colours")
+    merge.add_argument("--label", help="Only keep entries whose labels match this regular expression")
+    merge.set_defaults(func=_merge)
+
+    args = parser.parse_args(argv)
+    if args.command == "render":
+        _check_arguments(render, args)
+    return args.func(args)
+
+
+def _render(args):
+    """Implement timelines render"""
+    cache = RenderCache(args.cache_dir, int(args.cache_size*2**20)) if args.cache else None
+    os.makedirs(args.outdir, exist_ok=True)
+
+    t0 = time.perf_counter()
+    nFailed = 0
+    jobs = []                           # (table, [(page, key), ...]) to render
+    for fileName in args.timelines:
+        try:
+            table = _read_timeline(fileName)
+        except (OSError, TimelineFormatError) as e:
+            print(f"{fileName}: FAILED: {e}")
+            nFailed += 1
+            continue
+
+        digest = hash_timeline(table) if cache else None
+
+        pages = []
+        for page in _make_pages(fileName, args):
+            key = cache.key(digest, **_page_options(page)) if cache else None
+            if cache and cache.fetch(key, page.fileName):
+                print(f"{page.fileName}: cached")
+                continue
+            pages.append((page, key))
+
+        if pages:
+            jobs.append((table, pages))
+
+    nRendered = 0
+    for results, keys in _render_jobs(jobs, args.processes):
+        for result, key in zip(results, keys):
+            print(result)
+            if result.error is not None:
+                nFailed += 1
+                continue
+
+            nRendered += 1
+            if cache:
+                cache.store(key, result.page.fileName)
+
+    summary = f"Rendered {nRendered} files"
+    if cache:
+        summary += f"; copied {cache.hits} unchanged files from the cache"
+    if nFailed:
+        summary += f"; {nFailed} failed"
+    print(f"{summary} in {time.perf_counter() - t0:.1f}s")
+
+    return 1 if nFailed else 0
+
+
+def _slips(args):
+    """Implement timelines slips"""
+    cache = SnapshotCache(args.cache_dir) if args.cache else False
+
+    try:
+        snapshots = read_snapshots(args.snapshots, processes=args.processes, cache=cache)
+    except (OSError, TimelineFormatError) as e:
+        print(f"FAILED: {e}", file=sys.stderr)
+        return 1
+
+    if len(snapshots) < 2:
+        print("Please specify at least two snapshots", file=sys.stderr)
+        return 1
+
+    try:
+        old = snapshots.index(args.since) if args.since else len(snapshots) - 2
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    slips = snapshots.slip_table(old, -1, unchanged=args.unchanged)
+
+    fd = open(args.output, "w", newline="") if args.output else sys.stdout
+    try:
+        csvout = csv.writer(fd)
+        csvout.writerow(slips.dtype.names)
+        for row in slips.tolist():      # dates become datetimes, and NaT None
+            csvout.writerow([_csv_value(v) for v in row])
+    finally:
+        if fd is not sys.stdout:
+            fd.close()
+
+    counts = [f"{(slips['status'] == status).sum()} {status}" for status in ("moved", "added", "removed")]
+    print(f"{snapshots.names[old]} ({snapshots.dates[old]}) -> "
+          f"{snapshots.names[-1]} ({snapshots.dates[-1]}): {', '.join(counts)}", file=sys.stderr)
+
+    if args.plot:
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=(12, 6))
+        snapshots.plot(n=args.plot_count, ax=fig.add_subplot())
+        fig.autofmt_xdate()
+        fig.tight_layout()
+        fig.savefig(args.plot)
+
+    return 0
+
+
+def _merge(args):
+    """Implement timelines merge
+
+    merge_activities reads the files as the output is written, so errors
+    in them are only found part way through; the output is written to a
+    temporary file that replaces args.output when it's complete, so that a
+    failed merge doesn't leave a truncated file behind
+    """
+    merged = merge_activities(args.timelines, by=args.by, startDate=args.start, endDate=args.end,
+                              kinds=args.kind, colors=args.color, label=args.label)
+    tmpName = None
+    try:
+        if args.output is None:
+            write_activities(merged)
+        else:
+            fd, tmpName = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(args.output)), prefix=".tmp-",
+                                           suffix=".csv")
+            os.close(fd)
+            write_activities(merged, tmpName)
+            os.replace(tmpName, args.output)
+            tmpName = None
+    except (OSError, TimelineFormatError, ValueError) as e:
+        print(f"FAILED: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if tmpName is not None:
+            os.unlink(tmpName)
+
+    return 0
+
+
+def _validate(args):
+    """Implement timelines validate"""
+    checks = [check for check in (args.checks or _checks) if check not in args.ignore]
+
+    nFailed = 0
+    counts = dict(error=0, warning=0)
+    for fileName in args.timelines:
+        try:
+            findings = validate(fileName, checks)
+        except (OSError, TimelineFormatError) as e:
+            print(f"{fileName}: FAILED: {e}")
+            nFailed += 1
+            continue
+
+        for finding in findings:
+            print(finding)
+            counts[finding.severity] += 1
+
+    summary = f"Checked {len(args.timelines)} timelines: {counts['error']} errors, " \
+        f"{counts['warning']} warnings"
+    if nFailed:
+        summary += f"; {nFailed} couldn't be read"
+    print(summary, file=sys.stderr)
+
+    return 1 if nFailed or counts["error"] or (args.strict and counts["warning"]) else 0
+
+
+def _csv_value(value):
+    """Format a field of a slip table for CSV"""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return ""
+    if isinstance(value, datetime):
+        return _isoformat(value)
+    return value
+
+
+def _render_jobs(jobs, nProcess):
+    """Render each timeline's pages, in a pool of nProcess processes if
+    nProcess > 1 (which share a single timeline's pages, else render a
+    timeline each)
+
+    Yields the `PageResult`s and cache keys for each timeline, in the order
+    they're completed
+    """
+    if len(jobs) == 1 and nProcess > 1:  # render the pages in parallel
+        table, pages = jobs[0]
+        yield render_pages(table, [page for page, key in pages], nProcess), [key for page, key in pages]
+        return
+
+    if nProcess <= 1 or len(jobs) <= 1:
+        for table, pages in jobs:
+            yield _render_pages(table, [page for page, key in pages]), [key for page, key in pages]
+        return
+
+    with ProcessPoolExecutor(min(nProcess, len(jobs))) as pool:
+        futures = {pool.submit(_render_pages, table, [page for page, key in pages]): pages
+                   for table, pages in jobs}
+        for future in as_completed(futures):
+            pages = futures[future]
+            try:
+                results = future.result()
+            except Exception as e:      # e.g. a worker died
+                results = [PageResult(page, error=f"{type(e).__name__}: {e}") for page, key in pages]
+            yield results, [key for page, key in pages]
+
+
+def _page_options(page):
+    """Return everything about page that affects its rendering, for
+    `RenderCache.key`
+    """
+    options = {name: getattr(page, name) for name in ["startDate", "endDate", "colors", "groups", "title",
+                                                      "figsize", "height", "fontsize", "show_today"]}
+    options["format"] = os.path.splitext(page.fileName)[1]
+    return options
+
+
+def _render_pages(table, pages):
+    worker = _Worker(table)
+    return [worker.render(page) for page in pages]
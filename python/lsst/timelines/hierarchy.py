@@ -0,0 +1,285 @@
+from datetime import timedelta
+
+from .activities import Activity, Milestone, Functionality, Color, _default_settings
+
+__all__ = ["Summary", "TimelineNode", "make_tree"]
+
+
+class Summary:
+    """The roll-up of the entries beneath a `TimelineNode`
+
+    t0, t1: the earliest start and latest end of the entries, as datetimes
+      (None if there are no entries)
+    nActivity, nMilestone, nFunctionality: the number of each kind of entry
+    work: the total duration of the Activities, as a timedelta
+    """
+
+    def __init__(self, t0=None, t1=None, nActivity=0, nMilestone=0, nFunctionality=0, work=timedelta(0)):
+        self.t0 = t0
+        self.t1 = t1
+        self.nActivity = nActivity
+        self.nMilestone = nMilestone
+        self.nFunctionality = nFunctionality
+        self.work = work
+
+    def __str__(self):
+        return "Summary(%s to %s, %d activities, %d milestones, %d functionalities)" % (
+            self.t0, self.t1, self.nActivity, self.nMilestone, self.nFunctionality)
+
+    @property
+    def nEntry(self):
+        return self.nActivity + self.nMilestone + self.nFunctionality
+
+    @classmethod
+    def of_activities(cls, activities):
+        """Summarise a list of Activities (etc.; Manipulations are ignored)"""
+        summary = cls()
+        for a in activities:
+            if not isinstance(a, Activity):
+                continue
+            if isinstance(a, Functionality):
+                summary.nFunctionality += 1
+            elif isinstance(a, Milestone):
+                summary.nMilestone += 1
+            else:
+                summary.nActivity += 1
+                summary.work += a.duration
+
+            t1 = a.t0 + a.duration
+            summary.t0 = a.t0 if summary.t0 is None else min(summary.t0, a.t0)
+            summary.t1 = t1 if summary.t1 is None else max(summary.t1, t1)
+
+        return summary
+
+    @classmethod
+    def combine(cls, summaries):
+        """Combine the summaries of several nodes"""
+        summary = cls()
+        for s in summaries:
+            if s.t0 is not None:
+                summary.t0 = s.t0 if summary.t0 is None else min(summary.t0, s.t0)
+                summary.t1 = s.t1 if summary.t1 is None else max(summary.t1, s.t1)
+            summary.nActivity += s.nActivity
+            summary.nMilestone += s.nMilestone
+            summary.nFunctionality += s.nFunctionality
+            summary.work += s.work
+
+        return summary
+
+
+class TimelineNode:
+    """A node of a hierarchical timeline, e.g. subsystem -> work package ->
+    task
+
+    name: the node's name, used to label its summary bar
+    children: the node's child TimelineNodes
+    activities: a leaf's list of activities (an inner list, as passed to
+      `show_activities`); None for other nodes
+    color: the colour of the node's summary bar (default: the next colour
+      in matplotlib's cycle)
+    collapsed: draw the node as a single summary bar, even when its
+      children would otherwise be drawn
+
+    Each node's `Summary` (its earliest and latest dates, and the numbers of
+    Activities, Milestones and Functionalities beneath it) is computed when
+    first needed from those of its children, and cached.  After changing a
+    leaf's activities (e.g. an Activity's dates), call its `invalidate`,
+    which clears the cached summaries of the leaf and its ancestors only;
+    re-summarising then costs O(depth x number of children), not a scan of
+    every leaf.
+
+    `to_activities` (and `show_activities`, which accepts a TimelineNode)
+    draws a cut through the tree: the children of each node are drawn in
+    turn, down to the leaves (whose activities are drawn as they are) or to
+    collapsed nodes and those at the requested depth (which are drawn as
+    summary bars).  So an executive-level view of a plan with 10^5 tasks
+    draws only a few dozen bars, and once the summaries are cached needn't
+    look at the leaves at all
+    """
+
+    def __init__(self, name, children=(), activities=None, color=None, collapsed=False):
+        self.name = name
+        self.color = color
+        self.collapsed = collapsed
+        self.activities = activities
+        self.settings = None            # Manipulations in effect before a leaf's activities; see make_tree
+        self.parent = None
+        self.children = []
+        self._summary = None
+
+        for child in children:
+            self.add(child)
+
+    def __str__(self):
+        return f"TimelineNode({self.name!r}, {len(self.children)} children)"
+
+    def __iter__(self):
+        return iter(self.children)
+
+    def __len__(self):
+        return len(self.children)
+
+    @property
+    def isLeaf(self):
+        return not self.children
+
+    @property
+    def depth(self):
+        """The number of ancestors of this node"""
+        depth, node = 0, self.parent
+        while node is not None:
+            depth, node = depth + 1, node.parent
+        return depth
+
+    def add(self, child):
+        """Add a child node, returning it"""
+        if child.parent is not None:
+            child.parent.remove(child)
+        child.parent = self
+        self.children.append(child)
+        self.invalidate()
+
+        return child
+
+    def remove(self, child):
+        """Remove a child node"""
+        self.children.remove(child)
+        child.parent = None
+        self.invalidate()
+
+    def invalidate(self):
+        """Forget the cached summaries of this node and its ancestors; call
+        this after changing a leaf's activities
+        """
+        node = self
+        while node is not None and node._summary is not None:
+            node._summary = None        # an ancestor's summary is only cached if this node's is
+            node = node.parent
+
+    @property
+    def summary(self):
+        """The node's `Summary` (computed when first needed, then cached)"""
+        if self._summary is None:
+            if self.children:
+                self._summary = Summary.combine(child.summary for child in self.children)
+            else:
+                self._summary = Summary.of_activities(self.activities or [])
+
+        return self._summary
+
+    def walk(self):
+        """Yield this node and all its descendants, depth first"""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
+
+    def leaves(self):
+        """Yield the leaves beneath this node"""
+        return (node for node in self.walk() if node.isLeaf)
+
+    def cut(self, depth=None):
+        """Return the nodes drawn by `to_activities`: the leaves beneath this
+        node, except that collapsed nodes and (if depth isn't None) nodes
+        depth levels below this one stand in for their descendants
+        """
+        nodes = []
+        stack = [(self, 0)]
+        while stack:
+            node, level = stack.pop()
+            if node.isLeaf or node.collapsed or (depth is not None and level >= depth):
+                nodes.append(node)
+            else:
+                stack.extend((child, level + 1) for child in reversed(node.children))
+
+        return nodes
+
+    def label(self):
+        """The label of the node's summary bar"""
+        summary = self.summary
+        counts = [f"{summary.nActivity} activit{'ies' if summary.nActivity > 1 else 'y'}"] \
+            if summary.nActivity else []
+        if summary.nMilestone:
+            counts.append(f"{summary.nMilestone} milestone{'s' if summary.nMilestone > 1 else ''}")
+        return f"{self.name} ({', '.join(counts)})" if counts else self.name
+
+    def to_activities(self, depth=None):
+        """Return a list of lists of activities showing the cut through the
+        tree given by depth (see `cut`), for `show_activities` or
+        `write_activities`
+
+        Each node in the cut is drawn on its own row(s): a leaf as its
+        activities, preceded by the `Color` etc. that were in effect before
+        them (see `make_tree`), and any other node as a summary bar from its
+        earliest to its latest date (or a Milestone, if it contains no
+        Activities).  Nodes with no entries are omitted
+        """
+        current = _default_settings()   # the settings in effect in the output
+
+        activities = []
+        for node in self.cut(depth):
+            settings = _default_settings()
+            if node.isLeaf and not node.collapsed:
+                if not node.activities:
+                    continue
+                settings.update((str(setting), setting) for setting in node.settings or [])
+                entries = list(node.activities)
+            else:
+                summary = node.summary
+                if summary.t0 is None:
+                    continue
+                settings["Color"] = Color(node.color)
+                if summary.nActivity:
+                    entries = [Activity(node.label(), summary.t0, summary.t1)]
+                else:
+                    entries = [Milestone(node.label(), summary.t0)]
+
+            activities.append([setting for name, setting in settings.items()
+                               if setting.getData() != current[name].getData()] + entries)
+            for a in entries:           # a leaf may change the settings
+                if str(a) in settings:
+                    settings[str(a)] = a
+            current = settings
+
+        return activities
+
+
+def make_tree(activities, path, name="All"):
+    """Build a tree of `TimelineNode`s from a list of lists of activities
+
+    activities: a list of lists of activities (e.g. from `read_activities`)
+    path: a function that returns the names of the nodes that an inner
+      list belongs under, outermost first, e.g.
+      lambda aa: ("Camera", "Cryostat"); lists with the same names share
+      those nodes
+    name: the name of the root node
+
+    Each inner list becomes a leaf (named after its first entry), in order,
+    and remembers the `Color`, `MarkerWidth` and `LengthArrow` in effect
+    before it, so that it's drawn in the same way whichever other lists are
+    drawn.  Returns the root node
+    """
+    root = TimelineNode(name)
+    nodes = {(): root}
+
+    settings = _default_settings()
+    for aa in activities:
+        leafSettings = list(settings.values())
+        for a in aa:
+            if str(a) in settings:
+                settings[str(a)] = a
+
+        names = tuple(path(aa))
+        parent = root
+        for i in range(len(names)):
+            node = nodes.get(names[:i + 1])
+            if node is None:
+                node = nodes[names[:i + 1]] = parent.add(TimelineNode(names[i]))
+            parent = node
+
+        leaf = TimelineNode(next((a.descrip for a in aa if isinstance(a, Activity)), ""), activities=aa)
+        leaf.settings = leafSettings
+        parent.add(leaf)
+
+    return root
@@ -0,0 +1,428 @@
+import copy
+import csv
+from datetime import datetime
+import os
+import warnings
+
+import numpy as np
+
+import matplotlib.dates as mdates
+import matplotlib.lines as mlines
+import matplotlib.patches as mpatches
+import matplotlib.pyplot as plt
+
+from .activities import Calendar, RenderContext, Manipulation, TimelineFormatError, get_extent
+from .activities import _finish_plot, _make_activity
+from .batching import ArtistBatch, _arrow_color, _arrow_verts
+from .table import ActivityTable
+
+__all__ = ["TimelineFigure", "CachedReader"]
+
+
+class TimelineFigure:
+    """A timeline drawn into an Axes that can be updated in place
+
+    Each Activity, Milestone and Functionality is drawn as its own set of
+    artists, and the figure remembers which artists belong to which entry
+    and the geometry, colours and label they were drawn with.  `update`
+    works out that geometry for a new version of the timeline (which is
+    fast, as nothing is drawn), and then only adds, removes, or modifies
+    the artists of entries that changed.
+
+    Entries are identified by their type and description (and, if there
+    are several with the same ones, by their order), so moving or editing
+    an entry updates its artists while inserting a new row only moves the
+    artists below it.
+
+    `watch` re-reads a CSV file whenever it changes, reparsing only the
+    blocks that were edited (see `CachedReader`).
+
+    E.g. in a notebook:
+        tf = TimelineFigure(ax=plt.figure().gca(), startDate="2021-03-15")
+        tf.watch("plan.csv")
+
+    Entries whose colour is None take the next colour in matplotlib's
+    cycle, as they do in `show_activities`, so inserting such an entry
+    also updates the colours of those that follow it
+    """
+
+    def __init__(self, activities=None, ax=None, height=0.1, fontsize=7, show_today=True,
+                 startDate="1958-02-05", endDate="2099-12-31"):
+        """activities: the initial timeline (a list of lists, or an
+          `ActivityTable`), or None
+        ax: the Axes to draw into (default: the current Axes)
+        The other arguments are as for `show_activities`
+        """
+        self.ax = plt.gca() if ax is None else ax
+        self.height = height
+        self.fontsize = fontsize
+        self.show_today = show_today
+        self.startDate = datetime.fromisoformat(startDate) if isinstance(startDate, str) else startDate
+        self.endDate = datetime.fromisoformat(endDate) if isinstance(endDate, str) else endDate
+
+        self._entries = {}              # identity: (spec, artists, (xmin, xmax, ymin, ymax))
+        self._axesWidth = None          # width of the Axes when first drawn; see _specs
+        self._finished = False
+        self._reader = None
+        self._timer = None
+
+        if activities is not None:
+            self.update(activities)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def update(self, activities):
+        """Update the figure to show a new version of the timeline
+
+        activities: a list of lists of Activities, or an `ActivityTable`
+
+        Returns a dict giving the number of entries whose artists were
+        "added", "removed", "updated", and left "unchanged"
+        """
+        specs = self._specs(activities)
+        counts = dict(added=0, removed=0, updated=0, unchanged=0)
+
+        for ident in [i for i in self._entries if i not in specs]:
+            for artist in self._entries.pop(ident)[1]:
+                artist.remove()
+            counts["removed"] += 1
+
+        for ident, spec in specs.items():
+            old = self._entries.get(ident)
+            if old is None:
+                self._entries[ident] = (spec, self._make_artists(spec), _limits(spec))
+                counts["added"] += 1
+            elif old[0] == spec:
+                counts["unchanged"] += 1
+            else:
+                artists = old[1]
+                if not _update_artists(artists, old[0], spec):
+                    for artist in artists:
+                        artist.remove()
+                    artists = self._make_artists(spec)
+                self._entries[ident] = (spec, artists, _limits(spec))
+                counts["updated"] += 1
+
+        if counts["added"] + counts["removed"] + counts["updated"] > 0 and self._entries:
+            #
+            # Set the data limits from the entries' extents; Axes.relim
+            # would recalculate them from every artist's path
+            #
+            limits = np.array([e[2] for e in self._entries.values()])
+            self.ax.dataLim.set_points(np.array([[limits[:, 0].min(), limits[:, 2].min()],
+                                                 [limits[:, 1].max(), limits[:, 3].max()]]))
+            self.ax.autoscale_view()
+
+        if not self._finished and self._entries:
+            _finish_plot(self.ax, self.startDate, self.show_today)
+            self._finished = True
+
+        self.ax.figure.canvas.draw_idle()
+        return counts
+
+    def watch(self, fileName, interval=1000):
+        """Show the timeline in fileName, and check every interval
+        milliseconds whether it's changed, updating the figure if so
+
+        The checking is done by a timer on the figure's canvas, so it only
+        runs when there's an event loop (e.g. an interactive backend or
+        notebook); otherwise call `poll` yourself.
+        """
+        self._reader = CachedReader(fileName)
+        self.update(self._reader.read())
+
+        self.stop()
+        self._timer = self.ax.figure.canvas.new_timer(interval=interval)
+        self._timer.add_callback(self.poll)
+        self._timer.start()
+
+    def poll(self):
+        """If the file being watched has changed, update the figure
+
+        Returns the counts from `update` if it was called, else None.
+        Errors in the file are reported as warnings, and the figure is
+        left unchanged
+        """
+        if self._reader is None or not self._reader.changed():
+            return None
+
+        try:
+            activities = self._reader.read()
+        except (OSError, TimelineFormatError) as e:  # e.g. the file's being written
+            warnings.warn(f"Not updating timeline: {e}")
+            return None
+
+        return self.update(activities)
+
+    def stop(self):
+        """Stop watching the file (if any)"""
+        if self._timer is not None:
+            self._timer.stop()
+            self._timer = None
+
+    def _specs(self, activities):
+        """Return a dict mapping the identity of each visible entry to a
+        description of what's drawn for it: a tuple of calls to the
+        `ArtistBatch` methods, as made by the entries' draw methods
+        """
+        if isinstance(activities, ActivityTable):
+            activities = activities.to_activities()
+
+        specs = {}
+        dateMin, dateMax = get_extent(activities, self.startDate, self.endDate)
+        if dateMin is None:
+            return specs
+
+        ctx = RenderContext(self.ax, row=0, height=self.height, fontsize=self.fontsize)
+        #
+        # The labels are wrapped to fit the Axes as it was before the first
+        # tight_layout, so that they don't all change on the second update
+        #
+        if self._axesWidth is None:
+            self._axesWidth = ctx.axes_width()
+        ctx._axesWidth = self._axesWidth
+
+        recorder = _Recorder()
+        occurrences = {}
+        for aa in activities:
+            nActivity = 0
+            for a in aa:
+                if isinstance(a, Manipulation):
+                    a.apply(ctx)
+                    continue
+
+                recorder.calls = []
+                drawn = a.draw(totalDuration=dateMax - dateMin, startDate=self.startDate,
+                               endDate=self.endDate, batch=recorder, ctx=ctx)
+                nActivity += drawn
+
+                key = (str(a), a.descrip)
+                n = occurrences.get(key, 0)
+                occurrences[key] = n + 1
+                if drawn:
+                    specs[key + (n,)] = tuple(recorder.calls)
+
+            if nActivity > 0:
+                ctx.row -= 1
+
+        return specs
+
+    def _make_artists(self, spec):
+        artists = []
+        for call in spec:
+            artists += _ARTIST_MAKERS[call[0]](self.ax, *call[1:])
+        return artists
+
+
+class _Recorder(ArtistBatch):
+    """Record the calls that a draw method makes to an `ArtistBatch`, with
+    colours of None resolved as the batch would resolve them
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def add_bar(self, t0, t1, y0, height, color, border):
+        color, border = self._resolve_bar(color, border)
+        self.calls.append(("bar", t0, t1, y0, height, color, border))
+
+    def add_diamond(self, t0, markerWidth, y0, height, color):
+        color = self._resolve(color, self._fillColors)
+        self.calls.append(("diamond", t0, markerWidth, y0, height, color))
+
+    def add_arrow(self, t0, y, dx, headWidth, color):
+        self.calls.append(("arrow", t0, y, dx, headWidth, _arrow_color(color)))
+
+    def add_text(self, t, y, text, **kwargs):
+        self.calls.append(("text", t, y, text, tuple(sorted(kwargs.items()))))
+
+
+def _limits(spec):
+    """Return the (xmin, xmax, ymin, ymax) of the shapes in spec, ignoring
+    the text (as would `Axes.relim`)
+    """
+    xy = []
+    for call in spec:
+        what, args = call[0], call[1:]
+        if what == "bar":
+            xy.append(_bar_geometry(*args[:4]))
+        elif what == "diamond":
+            xy.append(_diamond_geometry(*args[:4]))
+        elif what == "arrow":
+            xy.append(_arrow_geometry(*args[:4]))
+
+    if not xy:
+        return (np.inf, -np.inf, np.inf, -np.inf)
+    xy = np.concatenate(xy)
+    return (xy[:, 0].min(), xy[:, 0].max(), xy[:, 1].min(), xy[:, 1].max())
+
+
+def _bar_geometry(t0, t1, y0, height):
+    x0, x1 = mdates.date2num(t0), mdates.date2num(t1)
+    return np.array([[x0, y0], [x1, y0], [x1, y0 + height], [x0, y0 + height], [x0, y0]])
+
+
+def _diamond_geometry(t0, markerWidth, y0, height):
+    x0 = mdates.date2num(t0)
+    return np.column_stack([x0 + markerWidth*np.array([0, 1, 0, -1, 0]),
+                            y0 + height*np.array([0, 0.5, 1, 0.5, 0])])
+
+
+def _arrow_geometry(t0, y, dx, headWidth):
+    return _arrow_verts(np.array([mdates.date2num(t0)]), np.array([y]), np.array([dx]), headWidth)[0]
+
+
+def _make_bar(ax, t0, t1, y0, height, color, border):
+    xy = _bar_geometry(t0, t1, y0, height)
+    fill = ax.add_patch(mpatches.Polygon(xy, closed=True, color=color, alpha=0.5))
+    line = ax.add_line(mlines.Line2D(xy[:, 0], xy[:, 1], color=color if border is None else border))
+    return [fill, line]
+
+
+def _make_diamond(ax, t0, markerWidth, y0, height, color):
+    return [ax.add_patch(mpatches.Polygon(_diamond_geometry(t0, markerWidth, y0, height), closed=True,
+                                          color=color, alpha=1))]
+
+
+def _make_arrow(ax, t0, y, dx, headWidth, color):
+    return [ax.add_patch(mpatches.Polygon(_arrow_geometry(t0, y, dx, headWidth), closed=True,
+                                          color=color))]
+
+
+def _make_text(ax, t, y, text, kwargs):
+    artist = ax.text(mdates.date2num(t), y, text, **dict(kwargs))
+    artist.set_in_layout(False)
+    return [artist]
+
+
+_ARTIST_MAKERS = dict(bar=_make_bar, diamond=_make_diamond, arrow=_make_arrow, text=_make_text)
+
+
+def _update_artists(artists, oldSpec, spec):
+    """Modify artists (made from oldSpec) to match spec; return False if
+    that's not possible as they're made up of different calls
+    """
+    if [c[0] for c in oldSpec] != [c[0] for c in spec]:
+        return False
+
+    artists = iter(artists)
+    for old, call in zip(oldSpec, spec):
+        what, args = call[0], call[1:]
+        if what == "bar":
+            t0, t1, y0, height, color, border = args
+            xy = _bar_geometry(t0, t1, y0, height)
+            fill, line = next(artists), next(artists)
+            fill.set_xy(xy)
+            fill.set_color(color)
+            line.set_data(xy[:, 0], xy[:, 1])
+            line.set_color(color if border is None else border)
+        elif what == "text":
+            t, y, text, kwargs = args
+            artist = next(artists)
+            artist.set_position((mdates.date2num(t), y))
+            artist.set_text(text)
+            if kwargs != old[4]:
+                artist.update(dict(kwargs))
+        else:
+            artist = next(artists)
+            geometry = _diamond_geometry if what == "diamond" else _arrow_geometry
+            artist.set_xy(geometry(*args[:-1]))
+            artist.set_color(args[-1])
+
+    return True
+
+
+class CachedReader:
+    """Read a timeline CSV file (as written by `write_activities`), only
+    parsing the blocks (the lines between blank lines) that have changed
+    since the last read
+
+    nParsed is the number of blocks parsed by the last call to `read`
+
+    Each call to `read` returns new Activity objects (copies of those that
+    were parsed), so the results may be modified (e.g. by a `Schedule`)
+    without changing the blocks that are cached, or other reads' results
+    """
+
+    def __init__(self, fileName):
+        self.fileName = fileName
+        self.nParsed = 0
+        self._blocks = {}               # the text of a block: its activities
+        self._stat = None
+
+    def changed(self):
+        """Return True if the file's changed since it was last read"""
+        return self._stat != _stat(self.fileName)
+
+    def read(self):
+        """Return the file's contents as a list of lists of activities, like
+        `read_activities`
+        """
+        stat = _stat(self.fileName)
+        with open(self.fileName) as fd:
+            csvin = csv.reader(fd)
+
+            blocks = []                 # (rows, their line numbers)
+            rows, lines = [], []
+            for args in csvin:
+                if len(args) == 0:
+                    blocks.append((tuple(rows), lines))
+                    rows, lines = [], []
+                else:
+                    rows.append(tuple(args))
+                    lines.append(csvin.line_num)
+            blocks.append((tuple(rows), lines))
+
+        cache = {}
+        self.nParsed = 0
+        activities = []
+        calendar = None                 # the Calendar in effect at the start of the block
+        for rows, lines in blocks:
+            key = (calendar, rows)      # the block's durations depend on the calendar
+            activitySet = cache.get(key)
+            if activitySet is None:
+                activitySet = self._blocks.get(key)
+            if activitySet is None:
+                activitySet = self._parse(rows, lines, calendar)
+                self.nParsed += 1
+            cache[key] = activitySet
+            activities.append([_copy(a) for a in activitySet])
+
+            for a in activitySet:
+                if isinstance(a, Calendar):
+                    calendar = a
+
+        self._blocks = cache
+        self._stat = stat
+        return activities
+
+    def _parse(self, rows, lines, calendar):
+        activitySet = []
+        for args, line in zip(rows, lines):
+            try:
+                a = _make_activity(args[0], list(args[1:]), calendar)
+            except ValueError as e:
+                raise TimelineFormatError(self.fileName, line, str(e)) from None
+
+            if isinstance(a, Calendar):
+                calendar = a
+            activitySet.append(a)
+
+        return activitySet
+
+
+def _copy(a):
+    """Return a copy of an entry, so that modifying it doesn't modify the
+    cached one
+    """
+    a = copy.copy(a)
+    if hasattr(a, "after"):
+        a.after = list(a.after)
+    return a
+
+
+def _stat(fileName):
+    st = os.stat(fileName)
+    return (st.st_mtime_ns, st.st_size)
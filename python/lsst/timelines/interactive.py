@@ -0,0 +1,311 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import matplotlib.collections as mcollections
+import matplotlib.dates as mdates
+import matplotlib.lines as mlines
+import matplotlib.patches as mpatches
+import matplotlib.pyplot as plt
+
+from .activities import _isoformat
+from .intervals import IntervalIndex
+from .table import ActivityTable
+
+__all__ = ["InteractiveTimeline"]
+
+
+class InteractiveTimeline:
+    """Today's date, hover tooltips, and selection highlights for a timeline
+    drawn by `show_activities`, updated without redrawing the timeline
+
+    The timeline is drawn as usual (with show_today=False); the
+    InteractiveTimeline then adds a today line, a tooltip and outline for
+    the entry under the pointer, and outlines of the entries selected by
+    clicking on them (clicking on nothing clears the selection).  These
+    are animated artists, which matplotlib leaves out of a normal draw:
+    after each draw the rendered timeline is copied as a background, and
+    moving the today line or the pointer restores the background and
+    draws just the animated artists over it ("blitting").  So a frame
+    costs the same for a plan of 10 entries or 10^6, and nothing is drawn
+    at all if the pointer stays over the same entry.
+
+    The entry under the pointer is found with an `IntervalIndex`, which
+    returns the few entries in progress at the pointer's date; only those
+    are checked against its row.
+
+    E.g. on a wall display:
+        table = read_activity_table("plan.csv")
+        show_activities(table, ax=ax, show_today=False)
+        it = InteractiveTimeline(table, ax)
+        it.follow_today()
+
+    N.b. the rows must be those that the timeline was drawn with, so pass
+    the same height, layout (e.g. a `LevelOfDetail`'s layout), startDate
+    and endDate as were passed to `show_activities`; only the lists with
+    entries in the window are given rows.  If the canvas can't blit (e.g. a
+    notebook's inline backend), each update redraws the figure instead
+    """
+
+    def __init__(self, activities, ax=None, height=0.1, layout=None, startDate=None, endDate=None, index=None,
+                 today=True, fontsize=7, pickRadius=3, onSelect=None):
+        """activities: the timeline, as drawn (an `ActivityTable` or a list
+          of lists of Activities)
+        ax: the Axes that it was drawn into (default: the current Axes)
+        height, layout, startDate, endDate: as passed to `show_activities`
+          (None: no limit)
+        index: an `IntervalIndex` built on activities (default: build one)
+        today: the date of the today line (True: now; None: no line)
+        fontsize: the size of the tooltips' text
+        pickRadius: how close (in pixels) the pointer must be to an entry
+        onSelect: a function called with the (sorted) indices into the
+          table of the selected entries whenever the selection changes
+        """
+        if isinstance(activities, ActivityTable):
+            table = activities
+        else:
+            table = ActivityTable.from_activities(activities)
+        self.table = table
+        self.ax = plt.gca() if ax is None else ax
+        self.height = height
+        self.index = IntervalIndex(table) if index is None else index
+        self.pickRadius = pickRadius
+        self.onSelect = onSelect
+
+        self.hovered = None             # the index of the entry under the pointer
+        self.selected = []              # the indices of the selected entries
+        self._background = None         # the figure as drawn, without the animated artists
+        self._timer = None
+        #
+        # The geometry of every entry in the window, as in ActivityTable.draw
+        #
+        self._visible = table.visible(startDate, endDate)
+        if layout is None:
+            rows = table.rows(self._visible) - table.drow
+        else:
+            if len(layout) != len(table):
+                raise ValueError(f"The layout has {len(layout)} entries, but the table has {len(table)}")
+            rows = -layout.rows
+        self._y0 = height*(1.1*rows)
+        t0, t1 = table.clipped(startDate, endDate)
+        self._x0 = mdates.date2num(t0)
+        self._x1 = mdates.date2num(t1)
+        self._isBar = table.kind == ActivityTable.ACTIVITY
+        self._markerWidth = table.styles()[2]
+        isPoint = table.isItem & ~self._isBar
+        self._maxMarkerWidth = float(self._markerWidth[isPoint].max()) if isPoint.any() else 0.0
+        #
+        # The animated artists
+        # (added with add_artist, so as not to change the Axes' data limits)
+        #
+        self._blit = self.canvas.supports_blit
+        self._todayLine = self.ax.add_artist(mlines.Line2D([0, 0], [0, 1], ls='--', color='black', alpha=0.5,
+                                                           transform=self.ax.get_xaxis_transform(),
+                                                           animated=self._blit, visible=False))
+        self._outline = self.ax.add_artist(mpatches.Polygon(np.zeros((4, 2)), closed=True, fill=False, lw=2,
+                                                            ec="black", animated=self._blit, visible=False))
+        self._selection = self.ax.add_collection(
+            mcollections.PolyCollection([], facecolors="none", edgecolors="red", linewidths=2,
+                                        animated=self._blit), autolim=False)
+        self._tooltip = self.ax.annotate("", (0, 0), xytext=(8, 8), textcoords="offset points",
+                                         fontsize=fontsize, zorder=20, animated=self._blit, visible=False,
+                                         bbox=dict(boxstyle="round", fc="white", ec="gray", alpha=0.9))
+        self._animated = [self._todayLine, self._selection, self._outline, self._tooltip]
+        for artist in self._animated:
+            artist.set_in_layout(False)
+
+        if today is not None:
+            self._move_today(None if today is True else today)
+
+        self._cids = [self.canvas.mpl_connect("draw_event", self._on_draw),
+                      self.canvas.mpl_connect("motion_notify_event", self._on_move),
+                      self.canvas.mpl_connect("axes_leave_event", self._on_leave),
+                      self.canvas.mpl_connect("button_press_event", self._on_click)]
+        self.canvas.draw_idle()         # which caches the background
+
+    @property
+    def canvas(self):
+        return self.ax.figure.canvas
+
+    def entry_at(self, x, y):
+        """Return the index into the table of the entry drawn at (x, y) (in
+        data coordinates), or None
+
+        Milestones and Functionalities are preferred to the Activities
+        they're drawn over, and later entries to earlier ones
+        """
+        inverse = self.ax.transData.inverted()
+        (xa, ya), (xb, yb) = inverse.transform([(0, 0), (self.pickRadius, self.pickRadius)])
+        dx, dy = abs(xb - xa), abs(yb - ya)
+
+        pad = timedelta(days=max(dx, self._maxMarkerWidth))
+        date = mdates.num2date(x).replace(tzinfo=None)
+        cand = self.index.overlapping(date - pad, date + pad)
+        cand = cand[self._visible[cand]]
+        if len(cand) == 0:
+            return None
+
+        y0, isBar = self._y0[cand], self._isBar[cand]
+        halfWidth = np.where(isBar, dx, np.maximum(self._markerWidth[cand], dx))
+        hit = (y >= y0 - dy) & (y <= y0 + self.height + dy) & \
+            (x >= self._x0[cand] - halfWidth) & (x <= self._x1[cand] + halfWidth)
+        cand, isBar = cand[hit], isBar[hit]
+        if len(cand) == 0:
+            return None
+
+        return int(cand[np.lexsort((cand, ~isBar))[-1]])
+
+    def describe(self, i):
+        """Return the tooltip of entry i"""
+        t0 = _isoformat(self.table.t0[i].item())
+        if self._isBar[i]:
+            when = f"{t0} to {_isoformat(self.table.t1[i].item())}"
+        else:
+            when = t0
+        return f"{self.table.labels[i]}\n{ActivityTable.kindNames[self.table.kind[i]]}: {when}"
+
+    def hover(self, x, y):
+        """Show the tooltip of the entry at (x, y) (in data coordinates; None
+        to hide it), and return its index (or None)
+
+        Nothing is redrawn unless the entry has changed
+        """
+        i = None if x is None or y is None else self.entry_at(x, y)
+        if i == self.hovered:
+            return i
+        self.hovered = i
+
+        if i is None:
+            self._outline.set_visible(False)
+            self._tooltip.set_visible(False)
+        else:
+            self._outline.set_xy(self._outline_of(i))
+            self._outline.set_visible(True)
+
+            xy = (0.5*(self._x0[i] + self._x1[i]), self._y0[i] + self.height)
+            right = self.ax.transAxes.inverted().transform(self.ax.transData.transform(xy))[0] > 0.5
+            self._tooltip.set_text(self.describe(i))
+            self._tooltip.xy = xy
+            self._tooltip.set_position((-8 if right else 8, 8))
+            self._tooltip.set_horizontalalignment("right" if right else "left")
+            self._tooltip.set_visible(True)
+
+        self._update()
+        return i
+
+    def select(self, indices):
+        """Select the entries with these indices into the table (replacing
+        the current selection)
+        """
+        self.selected = sorted(set(int(i) for i in indices))
+        self._selection.set_verts([self._outline_of(i) for i in self.selected])
+        self._update()
+
+        if self.onSelect is not None:
+            self.onSelect(self.selected)
+
+    def toggle(self, i):
+        """Add entry i to the selection, or remove it if it's selected"""
+        if i in self.selected:
+            self.select([j for j in self.selected if j != i])
+        else:
+            self.select(self.selected + [i])
+
+    def set_today(self, date=None):
+        """Move the today line to date (a datetime or ISO string; default:
+        now)
+        """
+        self._move_today(date)
+        self._update()
+
+    def follow_today(self, interval=60000):
+        """Move the today line to the current time every interval
+        milliseconds
+
+        The moving is done by a timer on the figure's canvas, so it only
+        runs when there's an event loop (see `TimelineFigure.watch`)
+        """
+        self.stop()
+        self._timer = self.canvas.new_timer(interval=interval)
+        self._timer.add_callback(self.set_today)
+        self._timer.start()
+
+    def stop(self):
+        """Stop moving the today line"""
+        if self._timer is not None:
+            self._timer.stop()
+            self._timer = None
+
+    def disconnect(self):
+        """Stop responding to the pointer and clock, and remove the
+        animated artists
+        """
+        self.stop()
+        for cid in self._cids:
+            self.canvas.mpl_disconnect(cid)
+        self._cids = []
+        for artist in self._animated:
+            artist.remove()
+        self._animated = []
+        self._background = None
+        self.canvas.draw_idle()
+
+    def _outline_of(self, i):
+        """The vertices of the outline of entry i's bar or diamond"""
+        x0, x1, y0, h = self._x0[i], self._x1[i], self._y0[i], self.height
+        if self._isBar[i]:
+            return [(x0, y0), (x1, y0), (x1, y0 + h), (x0, y0 + h)]
+
+        w = self._markerWidth[i]
+        return [(x0, y0), (x0 + w, y0 + 0.5*h), (x0, y0 + h), (x0 - w, y0 + 0.5*h)]
+
+    def _move_today(self, date):
+        if date is None:
+            date = datetime.now()
+        elif isinstance(date, str):
+            date = datetime.fromisoformat(date)
+        x = mdates.date2num(date)
+        self._todayLine.set_xdata([x, x])
+        self._todayLine.set_visible(True)
+
+    def _draw_animated(self):
+        for artist in self._animated:
+            self.ax.draw_artist(artist)
+
+    def _update(self):
+        """Draw the animated artists over the cached background"""
+        if not self._blit or self._background is None:  # the draw_event will cache the background
+            self.canvas.draw_idle()
+            return
+
+        self.canvas.restore_region(self._background)
+        self._draw_animated()
+        self.canvas.blit(self.ax.figure.bbox)
+        self.canvas.flush_events()
+
+    def _on_draw(self, event):
+        if not self._blit:
+            return
+        self._background = self.canvas.copy_from_bbox(self.ax.figure.bbox)
+        self._draw_animated()
+
+    def _on_move(self, event):
+        if event.inaxes is self.ax:
+            self.hover(event.xdata, event.ydata)
+        else:
+            self.hover(None, None)
+
+    def _on_leave(self, event):
+        self.hover(None, None)
+
+    def _on_click(self, event):
+        if event.inaxes is not self.ax or event.button != 1 or \
+           getattr(self.canvas.toolbar, "mode", ""):  # zooming or panning
+            return
+
+        i = self.entry_at(event.xdata, event.ydata)
+        if i is None:
+            if self.selected:
+                self.select([])
+        else:
+            self.toggle(i)
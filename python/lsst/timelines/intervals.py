@@ -0,0 +1,131 @@
+import numpy as np
+
+from .table import ActivityTable
+
+__all__ = ["IntervalIndex"]
+
+_minTime = int(np.iinfo(np.int64).min) + 1  # the smallest time (min is NaT)
+
+
+class IntervalIndex:
+    """An index for fast date-window queries on a timeline
+
+    The index is built once (in O(N log N)) over the Activities, Milestones
+    and Functionalities of an `ActivityTable`, after which
+       overlapping(a, b)   returns the entries that overlap [a, b]
+       active(d)           returns the entries in progress on date d
+       extent(a, b)        returns the part of [a, b] that's occupied
+       count(a, b)         returns the number of entries overlapping [a, b]
+    take O(log N + k) (where k is the number of entries returned) and
+    O(log N) for count and extent.
+
+    Pass the index to `show_activities` to only touch the visible entries
+    when drawing narrow windows from a large timeline.
+
+    The entries are divided into classes by duration (0, then [1, 2),
+    [2, 4), [4, 8), ... microseconds), and each class is sorted by start
+    date.  An entry of a class whose longest entry lasts L overlaps [a, b]
+    only if it starts in [a - L, b], which is a slice of the class, and
+    all but the entries in [a - L, a - L/2) of that slice do overlap; so a
+    query costs O(log N) per class, plus a few more entries than it
+    returns.  Unlike a tree, this doesn't depend on how much the entries
+    overlap, so e.g. millions of disjoint exposures from an observing
+    schedule are indexed as quickly as a plan's long, overlapping
+    Activities.  There are also copies of the start and end dates in
+    sorted order, for `count` and `extent`.  Intervals are closed, matching
+    the culling in `Activity.draw`.
+    """
+
+    def __init__(self, table):
+        """table: an `ActivityTable` (or a list of lists of Activities, which
+        will be converted)
+        """
+        if not isinstance(table, ActivityTable):
+            table = ActivityTable.from_activities(table)
+        self.table = table
+
+        ind = np.flatnonzero(table.isItem)
+        t0 = table.t0[ind].astype(np.int64)
+        t1 = table.t1[ind].astype(np.int64)
+
+        self._starts = np.sort(t0)
+        self._ends = np.sort(t1)
+        #
+        # Sort the entries by duration class and then start, and find where
+        # each class begins and its longest duration
+        #
+        duration = np.maximum(t1 - t0, 0)
+        lengthClass = np.zeros(len(ind), dtype=np.int64)
+        positive = duration > 0
+        lengthClass[positive] = 1 + np.frexp(duration[positive].astype(float))[1]
+
+        order = np.lexsort((t0, lengthClass))
+        self._t0, self._t1, self._ind = t0[order], t1[order], ind[order]
+
+        lengthClass = lengthClass[order]
+        first = np.flatnonzero(np.r_[True, lengthClass[1:] != lengthClass[:-1]]) if len(ind) else []
+        bounds = np.r_[first, len(ind)].astype(np.int64)
+        longest = np.maximum.reduceat(duration[order], first) if len(ind) else []
+        self._classes = list(zip(bounds[:-1].tolist(), bounds[1:].tolist(), np.asarray(longest).tolist()))
+
+    def __len__(self):
+        return len(self._starts)
+
+    def overlapping(self, startDate=None, endDate=None):
+        """Return the (sorted) indices into the table of the entries that
+        overlap [startDate, endDate]; None means unbounded
+        """
+        a, b = _as_us(startDate, -1), _as_us(endDate, 1)
+
+        found = []
+        for lo, hi, longest in self._classes:
+            starts = self._t0[lo:hi]
+            i = lo + np.searchsorted(starts, max(int(a) - longest, _minTime), side="left")
+            j = lo + np.searchsorted(starts, b, side="right")
+            found.append(self._ind[i:j][self._t1[i:j] >= a])
+
+        if not found:
+            return np.empty(0, dtype=np.int64)
+
+        return np.sort(np.concatenate(found))
+
+    def active(self, date):
+        """Return the indices of the entries in progress on date"""
+        return self.overlapping(date, date)
+
+    def count(self, startDate=None, endDate=None):
+        """Return the number of entries that overlap [startDate, endDate]"""
+        a, b = _as_us(startDate, -1), _as_us(endDate, 1)
+        return int(np.searchsorted(self._starts, b, side="right")
+                   - np.searchsorted(self._ends, a, side="left"))
+
+    def extent(self, startDate=None, endDate=None):
+        """Return the (start, end) of the part of the timeline that overlaps
+        [startDate, endDate], clipped to the window, as datetime64s;
+        (None, None) if nothing overlaps
+        """
+        a, b = _as_us(startDate, -1), _as_us(endDate, 1)
+        if self.count(startDate, endDate) == 0:
+            return None, None
+
+        if startDate is not None and self.count(startDate, startDate) > 0:  # something's in progress at a
+            lo = a
+        else:
+            lo = self._starts[np.searchsorted(self._starts, a, side="right")]
+
+        if endDate is not None and self.count(endDate, endDate) > 0:
+            hi = b
+        else:
+            hi = self._ends[np.searchsorted(self._ends, b, side="left") - 1]
+
+        return np.datetime64(int(lo), "us"), np.datetime64(int(hi), "us")
+
+
+def _as_us(date, unbounded):
+    """Convert date to microseconds since the epoch; if it's None return the
+    smallest (unbounded < 0) or largest possible value
+    """
+    if date is None:
+        return _minTime if unbounded < 0 else np.iinfo(np.int64).max
+
+    return np.datetime64(date, "us").astype(np.int64)
@@ -0,0 +1,200 @@
+from collections import OrderedDict
+import functools
+import threading
+
+__all__ = ["FontMetrics", "LabelWrapper", "get_font_metrics", "get_label_wrapper"]
+#
+# matplotlib is imported within the functions that use it, so that importing
+# lsst.timelines (which needs _labelPadding etc.) doesn't load it
+#
+
+
+class FontMetrics:
+    """The widths of the characters of a font at a given size
+
+    Each character's advance is measured (with FreeType, via matplotlib)
+    the first time it's seen and then remembered, so measuring a string
+    costs a dict lookup per character.  Kerning is ignored, so widths are
+    slightly overestimated
+    """
+
+    def __init__(self, fileName, size):
+        self.fileName = fileName
+        self.size = size
+        self._widths = {}
+        self._words = {}
+        self._maxWords = 100000
+        self._lock = threading.Lock()   # matplotlib's FT2Font objects are shared
+
+    def char_width(self, c):
+        """Return the advance of character c, in points"""
+        width = self._widths.get(c)
+        if width is None:
+            import matplotlib.font_manager as font_manager
+
+            with self._lock:
+                font = font_manager.get_font(self.fileName)
+                font.set_size(self.size, 72)
+                width = font.load_char(ord(c), flags=_no_hinting()).linearHoriAdvance/65536
+            self._widths[c] = width
+
+        return width
+
+    def width(self, text):
+        """Return the width of a single line of text, in points"""
+        widths = self._widths
+        try:
+            return sum([widths[c] for c in text])
+        except KeyError:
+            return sum([self.char_width(c) for c in text])
+
+    def word_widths(self, words):
+        """Return the widths of a list of words, in points
+
+        The widths of words are remembered (up to a limit), as the same
+        words recur in many labels
+        """
+        cache = self._words
+        result = []
+        for word in words:
+            width = cache.get(word)
+            if width is None:
+                width = self.width(word)
+                if len(cache) < self._maxWords:
+                    cache[word] = width
+            result.append(width)
+
+        return result
+
+
+def get_font_metrics(fontsize, family=None):
+    """Return the `FontMetrics` for the font used by matplotlib for text of
+    the given size and family (default: rcParams["font.family"])
+
+    The metrics are shared by all callers asking for the same font and size
+    """
+    return _font_metrics(float(fontsize), _family(family))
+
+
+def _family(family):
+    """Return family as a (hashable) tuple of names, defaulting to
+    rcParams["font.family"]
+    """
+    if family is None:
+        import matplotlib as mpl
+
+        family = mpl.rcParams["font.family"]
+    return (family,) if isinstance(family, str) else tuple(family)
+
+
+@functools.lru_cache(maxsize=64)
+def _font_metrics(fontsize, family):
+    import matplotlib.font_manager as font_manager
+
+    fileName = font_manager.findfont(font_manager.FontProperties(family=list(family), size=fontsize))
+    return _font_metrics_for_file(fileName, fontsize)
+
+
+@functools.lru_cache(maxsize=64)
+def _font_metrics_for_file(fileName, size):
+    return FontMetrics(fileName, size)
+
+
+@functools.lru_cache(maxsize=1)
+def _no_hinting():
+    """Return FreeType's LOAD_NO_HINTING flag"""
+    from matplotlib import ft2font
+
+    try:
+        return ft2font.LoadFlags.NO_HINTING
+    except AttributeError:              # matplotlib < 3.10
+        return ft2font.LOAD_NO_HINTING
+
+
+class LabelWrapper:
+    """Wrap labels to fit a given width, using measured font metrics
+
+    Words are added to a line while the line's width is no more than the
+    available width; a word that is too long on its own is put on a line
+    by itself (as textwrap's break_long_words=False).  The results are
+    cached, keyed by the label, the width (rounded to the nearest point)
+    and the font, with the least recently used entries dropped when there
+    are more than maxsize.  Redrawing the same timeline at the same size
+    thus does no text layout.
+
+    The methods are thread-safe
+    """
+
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._cache)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.hits = self.misses = 0
+
+    def wrap(self, text, width, fontsize, family=None):
+        """Return text with newlines inserted so that each line fits in width
+        (in points) when drawn with the given fontsize and family
+        """
+        family = _family(family)
+        width = round(width)
+        key = (text, width, fontsize, family)
+        with self._lock:
+            wrapped = self._cache.get(key)
+            if wrapped is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return wrapped
+
+        wrapped = _wrap(text, width, get_font_metrics(fontsize, family))
+
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = wrapped
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+        return wrapped
+
+
+def _wrap(text, width, metrics):
+    """Greedily wrap text's words into lines no wider than width"""
+    words = text.split()
+    if not words:
+        return ""
+
+    space = metrics.char_width(" ")
+    lines = []
+    line, lineWidth = [], 0.0
+    for word, wordWidth in zip(words, metrics.word_widths(words)):
+        if line and lineWidth + space + wordWidth > width:
+            lines.append(" ".join(line))
+            line, lineWidth = [], 0.0
+
+        lineWidth += (space if line else 0.0) + wordWidth
+        line.append(word)
+    lines.append(" ".join(line))
+
+    return "\n".join(lines)
+
+
+_labelWrapper = LabelWrapper()
+_labelPadding = 2                       # space to leave around a label within its bar, in points
+
+
+def _axes_width(ax):
+    """Return the width of ax in points"""
+    return ax.get_position().width*ax.figure.get_figwidth()*72
+
+
+def get_label_wrapper():
+    """Return the `LabelWrapper` (and its cache) used by `show_activities`"""
+    return _labelWrapper
@@ -0,0 +1,146 @@
+import heapq
+
+import numpy as np
+
+from .table import ActivityTable
+
+__all__ = ["RowLayout", "pack_rows"]
+
+
+class RowLayout:
+    """An assignment of the entries of a timeline to rows, as returned by
+    `pack_rows`
+
+    rows: the row of each entry (0 is the top row); -1 for `Manipulation`s
+    nRow: the number of rows used
+    groupBy: how the entries were grouped (see `pack_rows`)
+    groupRows: the first row of each group; group i occupies rows
+      groupRows[i] to groupRows[i + 1] - 1
+
+    Pass it to `show_activities` (or `ActivityTable.draw`) to draw the
+    entries on these rows instead of those given by their inner lists,
+    `AdvanceRow`s, and drows.  A layout depends only on the timeline, not
+    on the window being drawn, so it can be reused for any number of
+    renders
+    """
+
+    def __init__(self, rows, groupRows, groupBy=None):
+        self.rows = rows
+        self.groupRows = groupRows
+        self.groupBy = groupBy
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def nRow(self):
+        return int(self.groupRows[-1])
+
+
+def pack_rows(activities, groupBy=None, gap=0):
+    """Assign the Activities, Milestones and Functionalities of a timeline to
+    the smallest number of rows in which no two entries overlap
+
+    activities: an `ActivityTable`, or a list of lists of Activities
+    groupBy: None to pack all the entries together; "list" to pack each
+      inner list on its own set of rows, in order; or "color" to pack
+      the entries of each colour together, in order of first appearance
+    gap: extra space to leave between entries on the same row, in days
+
+    Milestones occupy the width of their marker, and Functionalities that
+    of their marker and arrow (as set by `MarkerWidth` and `LengthArrow`);
+    labels that extend beyond these are not taken into account.  Entries
+    that just touch (e.g. one Activity starting on the day the previous one
+    ends) may share a row.
+
+    The entries are swept in order of start date, keeping a heap of the
+    rows in use ordered by when they become free and a heap of free rows;
+    each entry goes on the lowest-numbered free row.  This uses the
+    minimum possible number of rows in O(N log N) time.
+
+    Returns a `RowLayout`
+    """
+    table = activities if isinstance(activities, ActivityTable) else ActivityTable.from_activities(activities)
+
+    colors, borders, markerWidths, lengthArrows = table.styles()
+    ind = np.flatnonzero(table.isItem)
+    kind = table.kind[ind]
+    #
+    # The extent of each entry, in microseconds
+    #
+    day = 86400e6
+    start = table.t0[ind].astype(np.int64)
+    end = table.t1[ind].astype(np.int64)
+
+    isMarker = kind != ActivityTable.ACTIVITY    # Milestones and Functionalities are drawn as diamonds
+    halfWidth = (markerWidths[ind]*day).astype(np.int64)
+    start[isMarker] -= halfWidth[isMarker]
+    end[isMarker] += halfWidth[isMarker]
+
+    isFunctionality = kind == ActivityTable.FUNCTIONALITY
+    arrow = (np.maximum(lengthArrows[ind], 0)*day).astype(np.int64)
+    end[isFunctionality] = np.maximum(end, start + halfWidth + arrow)[isFunctionality]
+
+    end += int(gap*day)
+    #
+    # The group that each entry belongs to
+    #
+    if groupBy is None:
+        group = np.zeros(len(ind), dtype=np.int64)
+    elif groupBy == "list":
+        group = np.unique(table.group[ind], return_inverse=True)[1]
+    elif groupBy == "color":
+        codes = {}
+        group = np.array([codes.setdefault(c, len(codes)) for c in colors[ind]], dtype=np.int64)
+    else:
+        raise ValueError(f"Unknown groupBy {groupBy!r}; expected None, \"list\", or \"color\"")
+
+    order = np.lexsort((end, start, group))
+    rows, nRows = _sweep(start[order].tolist(), end[order].tolist(), group[order].tolist())
+
+    groupRows = np.zeros(len(nRows) + 1, dtype=np.int64)
+    np.cumsum(nRows, out=groupRows[1:])
+
+    entryRows = np.full(len(table), -1, dtype=np.int64)
+    sortedGroups = group[order]
+    entryRows[ind[order]] = np.asarray(rows, dtype=np.int64) + groupRows[sortedGroups]
+
+    return RowLayout(entryRows, groupRows, groupBy)
+
+
+def _sweep(starts, ends, groups):
+    """Assign intervals, sorted by group and then start, to rows
+
+    Returns the row of each interval within its group, and the number of
+    rows used by each group
+    """
+    rows = []
+    nRows = []
+
+    busy = []                           # (end, row) of the rows in use
+    free = []                           # rows that are no longer in use
+    nRow = 0
+    currentGroup = None
+    for start, end, group in zip(starts, ends, groups):
+        if group != currentGroup:
+            if currentGroup is not None:
+                nRows.append(nRow)
+            busy, free, nRow = [], [], 0
+            currentGroup = group
+
+        while busy and busy[0][0] <= start:
+            heapq.heappush(free, heapq.heappop(busy)[1])
+
+        if free:
+            row = heapq.heappop(free)
+        else:
+            row = nRow
+            nRow += 1
+
+        heapq.heappush(busy, (end, row))
+        rows.append(row)
+
+    if currentGroup is not None:
+        nRows.append(nRow)
+
+    return rows, nRows
@@ -0,0 +1,269 @@
+import numpy as np
+
+import matplotlib.collections as mcollections
+import matplotlib.colors as mcolors
+import matplotlib.dates as mdates
+
+from .batching import ArtistBatch
+from .intervals import IntervalIndex
+from .labels import get_font_metrics, _axes_width, _labelPadding
+from .layout import RowLayout
+from .table import ActivityTable
+
+__all__ = ["LevelOfDetail"]
+
+
+class LevelOfDetail:
+    """Precomputed summaries of a timeline for drawing it at any zoom
+
+    When a window contains more than maxItems entries, each row is drawn
+    as a set of coverage spans rather than individual entries.  Entries
+    separated by less than the span level's resolution are merged into one
+    span, shaded by the fraction of it that's covered.  Only the labels
+    that fit within their bars are drawn.  When the window is small enough
+    to hold at most maxItems entries, they are drawn in full (as by
+    `show_activities`).
+
+    The spans for resolutions of 1, 2, 4, ... days are computed once, when
+    the LevelOfDetail is created, as is an `IntervalIndex`, so choosing
+    what to draw for a new window is cheap.  If the entries are closer
+    together than a day on average (e.g. the exposures of a nightly
+    observing schedule) the resolutions start at a power-of-2 fraction of
+    a day instead, about their mean separation (e.g. 1/4096 day, 21s, for
+    10^6 entries in a year).  A level is only kept if it has at most half
+    as many spans as the previous level kept, so all the levels together
+    hold fewer than twice as many spans as there are entries.
+
+    `attach` redraws the timeline whenever the limits of an Axes change,
+    e.g. when zooming or panning interactively.  N.b. the rows are fixed
+    (given by layout, or by the inner lists, `AdvanceRow`s and drows of the
+    whole timeline) so that they don't move while zooming
+    """
+
+    def __init__(self, activities, layout=None, maxItems=1000, maxLabels=200):
+        """activities: an `ActivityTable` or list of lists of Activities
+        layout: a `RowLayout` (e.g. from `pack_rows`) giving each entry's
+          row
+        maxItems: the largest number of entries to draw individually
+        maxLabels: the largest number of labels to draw on a summarised view
+          (the widest are chosen); rendering text dominates the time taken
+          to redraw
+        """
+        if isinstance(activities, ActivityTable):
+            table = activities
+        else:
+            table = ActivityTable.from_activities(activities)
+        self.table = table
+        self.maxItems = maxItems
+        self.maxLabels = maxLabels
+        self.index = IntervalIndex(table)
+
+        if layout is None:              # fix the rows as they are when the entire timeline is drawn
+            rows = table.drow - table.rows()
+            rows[~table.isItem] = -1
+            layout = RowLayout(rows, np.array([0, rows.max() + 1 if len(rows) else 0]))
+        self.layout = layout
+
+        self._item = np.flatnonzero(table.isItem)
+        self._x0 = mdates.date2num(table.t0[self._item])
+        self._x1 = mdates.date2num(table.t1[self._item])
+        self._row = layout.rows[self._item]
+        self._color = table.styles()[0][self._item]
+
+        self.resolutions = []           # the resolution of each level of spans, in days
+        self._spans = []                # (row, x0, x1, coverage, color) for each level
+        if len(self._item):
+            order = np.lexsort((self._x0, self._row))
+            length = self._x1[order] - self._x0[order]
+            spans = (self._row[order], self._x0[order], self._x1[order], length, length, self._color[order])
+
+            span = max(self._x1.max() - self._x0.min(), 1)
+            resolution = 2.0**np.floor(np.log2(min(1, span/len(self._item))))
+            while True:                 # each level is merged from the one before, so it's cheaper
+                spans = self._merge(spans, resolution)
+                row, x0, x1, covered, longest, color = spans
+                if not self._spans or len(row) <= len(self._spans[-1][0])//2:
+                    coverage = np.clip(covered/np.maximum(x1 - x0, resolution), 0, 1)
+                    self.resolutions.append(resolution)
+                    self._spans.append((row, x0, x1, coverage, color))
+                if resolution > span/100:
+                    break
+                resolution *= 2
+
+        self._artists = []
+        self._cids = []                 # callbacks connected by attach
+        self._drawing = False
+
+    def level(self, daysPerPixel):
+        """Return the index of the coarsest level whose resolution is no
+        more than daysPerPixel
+        """
+        return max(0, int(np.searchsorted(self.resolutions, daysPerPixel, side="right")) - 1)
+
+    def spans(self, level):
+        """Return the spans of a level as (row, x0, x1, coverage, color),
+        where x0 and x1 are matplotlib dates and coverage is the fraction
+        of each span that's occupied
+        """
+        return self._spans[level]
+
+    def draw(self, ax, height=0.1, fontsize=7, startDate=None, endDate=None):
+        """Draw the part of the timeline in [startDate, endDate] (default:
+        the Axes' current x-limits) into ax, replacing anything drawn by a
+        previous call
+
+        Returns the number of entries drawn or, if the window holds more
+        than maxItems entries, the number of coverage spans
+        """
+        for artist in self._artists:
+            artist.remove()
+        self._artists = []
+
+        if startDate is None or endDate is None:
+            xmin, xmax = ax.get_xlim()
+            startDate = mdates.num2date(xmin).replace(tzinfo=None) if startDate is None else startDate
+            endDate = mdates.num2date(xmax).replace(tzinfo=None) if endDate is None else endDate
+
+        if self.index.count(startDate, endDate) <= self.maxItems:
+            batch = ArtistBatch()
+            nDrawn = self.table.draw(batch, height=height, fontsize=fontsize, startDate=startDate,
+                                     endDate=endDate, index=self.index, ax=ax, layout=self.layout)
+            self._artists = batch.finish(ax, autoscale=False)  # the limits are set by the caller
+        else:
+            self._artists, nDrawn = self._draw_spans(ax, height, fontsize, startDate, endDate)
+
+        return nDrawn
+
+    def attach(self, ax, height=0.1, fontsize=7):
+        """Draw into ax, and redraw at the appropriate level of detail
+        whenever its limits change (the y-limits determine whether there's
+        room for labels)
+
+        Returns the number of entries (or spans) drawn in the initial window;
+        see `draw`
+        """
+        def redraw(ax):
+            if self._drawing:           # we're already in a callback
+                return 0
+            self._drawing = True
+            try:
+                nDrawn = self.draw(ax, height=height, fontsize=fontsize)
+            finally:
+                self._drawing = False
+
+            return nDrawn
+
+        self._cids = [ax.callbacks.connect(name, redraw) for name in ("xlim_changed", "ylim_changed")]
+        return redraw(ax)
+
+    def detach(self, ax):
+        """Stop redrawing ax when its limits change"""
+        for cid in self._cids:
+            ax.callbacks.disconnect(cid)
+        self._cids = []
+
+    def limits(self, height=0.1, startDate=None, endDate=None):
+        """Return the x- and y-limits covering the part of the timeline in
+        [startDate, endDate], as (xmin, xmax), (ymin, ymax)
+
+        The y-limits include all the rows, so they don't change with the
+        window
+        """
+        t0, t1 = self.index.extent(startDate, endDate)
+        if t0 is None:
+            return (0, 1), (0, 1)
+        x0, x1 = mdates.date2num(t0), mdates.date2num(t1)
+        y0 = -1.1*height*self._row.max()
+        y1 = -1.1*height*self._row.min() + height
+
+        dx, dy = 0.05*(x1 - x0), 0.05*(y1 - y0)
+        return (x0 - dx, x1 + dx), (y0 - dy, y1 + dy)
+
+    def _merge(self, spans, resolution):
+        """Merge each row's spans that are within resolution days of each
+        other
+
+        spans: (row, x0, x1, covered, longest, color), sorted by row and x0;
+          covered is the total length of the entries in each span, and
+          longest the length of the longest, whose colour is color (the
+          entries themselves are spans of one entry)
+        """
+        row, x0, x1, covered, longest, color = spans
+        #
+        # The latest end of all the previous spans in the same row; the
+        # offset makes np.maximum.accumulate restart with each row
+        #
+        offset = (row - row[0])*(x1.max() - x0.min() + 2*resolution + 1)
+        runningEnd = np.maximum.accumulate(x1 + offset) - offset
+
+        newSpan = np.ones(len(row), dtype=bool)
+        newSpan[1:] = (row[1:] != row[:-1]) | (x0[1:] > runningEnd[:-1] + resolution)
+        start = np.flatnonzero(newSpan)
+        spanId = np.cumsum(newSpan) - 1
+        #
+        # Colour each span like its longest entry (the last, if there's a tie)
+        #
+        spanLongest = np.maximum.reduceat(longest, start)
+        isLongest = np.flatnonzero(longest == spanLongest[spanId])
+        isLast = np.r_[spanId[isLongest][1:] != spanId[isLongest][:-1], True]
+
+        return (row[start], x0[start], np.maximum.reduceat(x1, start), np.add.reduceat(covered, start),
+                spanLongest, color[isLongest[isLast]])
+
+    def _draw_spans(self, ax, height, fontsize, startDate, endDate):
+        """Draw the coverage spans in the window, returning the artists and
+        the number of spans
+        """
+        xmin = mdates.date2num(np.datetime64(startDate, "us"))
+        xmax = mdates.date2num(np.datetime64(endDate, "us"))
+        widthPts = _axes_width(ax)
+        daysPerPixel = (xmax - xmin)/(widthPts*ax.figure.dpi/72)
+
+        ymin, ymax = sorted(ax.get_ylim())
+        rowMin, rowMax = -ymax/(1.1*height) - 1, -ymin/(1.1*height)  # the range of rows that are visible
+
+        row, x0, x1, coverage, color = self.spans(self.level(daysPerPixel))
+        ok = (x1 >= xmin) & (x0 <= xmax) & (row >= rowMin) & (row <= rowMax)
+        row, x0, x1, coverage, color = row[ok], x0[ok], x1[ok], coverage[ok], color[ok]
+        x1 = np.maximum(x1, x0 + daysPerPixel)  # at least a pixel wide
+
+        y0 = -1.1*height*row
+        verts = np.empty((len(row), 4, 2))
+        verts[:, :, 0] = np.column_stack([x0, x1, x1, x0])
+        verts[:, :, 1] = y0[:, None] + height*np.array([0, 0, 1, 1])
+
+        rgba = mcolors.to_rgba_array(["C0" if c is None else c for c in color])
+        rgba[:, 3] = 0.2 + 0.6*coverage  # density shading
+
+        artists = [mcollections.PolyCollection(verts, facecolors=rgba, edgecolors="none")]
+        ax.add_collection(artists[0], autolim=False)
+        #
+        # Label the entries that are wide enough, if the rows are tall enough
+        #
+        rowHeight = height/(ymax - ymin)*ax.get_position().height*ax.figure.get_figheight()*72  # points
+        if fontsize and rowHeight >= fontsize:
+            ind = self.index.overlapping(startDate, endDate)
+            rows = self.layout.rows[ind]
+            bar = ind[(self.table.kind[ind] == ActivityTable.ACTIVITY) & (rows >= rowMin) & (rows <= rowMax)]
+            x0 = np.maximum(mdates.date2num(self.table.t0[bar]), xmin)
+            x1 = np.minimum(mdates.date2num(self.table.t1[bar]), xmax)
+            available = (x1 - x0)/(xmax - xmin)*widthPts - _labelPadding
+
+            wide = np.flatnonzero(available > 3*fontsize)  # else not even a few letters would fit
+            wide = wide[np.argsort(-available[wide], kind="stable")]
+            metrics = get_font_metrics(fontsize)
+            nLabel = 0
+            for i in wide:
+                label = self.table.labels[bar[i]]
+                if metrics.width(label) > available[i]:
+                    continue
+                text = ax.text(0.5*(x0[i] + x1[i]), -1.1*height*self.layout.rows[bar[i]] + 0.5*height, label,
+                               horizontalalignment="center", verticalalignment="center", fontsize=fontsize)
+                text.set_in_layout(False)
+                artists.append(text)
+
+                nLabel += 1
+                if nLabel >= self.maxLabels:
+                    break
+
+        return artists, len(row)
@@ -0,0 +1,107 @@
+from datetime import datetime
+import heapq
+import re
+
+from .activities import iter_activities, _default_settings
+
+__all__ = ["merge_activities"]
+
+_kinds = ("Activity", "Milestone", "Functionality")
+
+
+def merge_activities(fileNames, by="date", startDate=None, endDate=None, kinds=None, colors=None,
+                     label=None):
+    """Merge several timeline files into one, yielding one list of
+    activities at a time (so the result can be passed straight to
+    `write_activities`)
+
+    fileNames: CSV files, as written by `write_activities`
+    by: "date" to order the inner lists by their earliest start date, or
+      "group" to take the first list of each file, then the second, and
+      so on
+    startDate, endDate: only keep entries that overlap [startDate, endDate]
+      (ISO strings or datetimes; None means unbounded)
+    kinds: only keep these kinds of entry ("Activity", "Milestone",
+      "Functionality"; default: all)
+    colors: only keep entries drawn in one of these colours (e.g. a team's),
+      taking `Color` entries into account
+    label: only keep entries whose labels match this regular expression
+      (using re.search)
+
+    The files are read one inner list at a time with `iter_activities` and
+    merged with a heap (`heapq.merge`), so only one list from each file is
+    held in memory.  As with `heapq.merge`, the output is in date order if
+    each file's lists are.  Ties are broken by the order of fileNames.
+
+    Lists with no entries left after filtering are dropped.  A file's
+    `Color`, `MarkerWidth` and `LengthArrow` settings apply to all of its
+    subsequent entries, so when lists from different files are interleaved
+    each list is preceded by the settings that were in effect in its own
+    file, where they differ from those in the output.  `AdvanceRow`s and
+    `Calendar`s are copied as they are (Activities are written with their
+    end dates, so Calendars don't change their durations).
+
+    E.g.
+        merged = merge_activities(glob.glob("teams/*.csv"),
+                                  startDate="2021-06-01", kinds=["Milestone"])
+        write_activities(merged, "milestones.csv")
+    """
+    if by not in ("date", "group"):
+        raise ValueError(f"Unknown order {by!r}; expected \"date\" or \"group\"")
+    for kind in kinds or []:
+        if kind not in _kinds:
+            raise ValueError(f"Unknown kind {kind!r}; expected one of {', '.join(_kinds)}")
+
+    filters = dict(startDate=_as_datetime(startDate), endDate=_as_datetime(endDate),
+                   kinds=None if kinds is None else set(kinds),
+                   colors=None if colors is None else set(colors),
+                   label=None if label is None else re.compile(label))
+
+    streams = [_filtered_lists(fileName, by, **filters) for fileName in fileNames]
+
+    current = _default_settings()       # the settings in effect in the output
+    for key, aa, before, after in heapq.merge(*streams, key=lambda item: item[0]):
+        prefix = [setting for name, setting in before.items()
+                  if setting.getData() != current[name].getData()]
+        current = after
+
+        yield prefix + aa
+
+
+def _filtered_lists(fileName, by, startDate, endDate, kinds, colors, label):
+    """Yield (key, activities, settings before, settings after) for each of
+    the inner lists of fileName that have entries left after filtering
+
+    The settings are dicts of the `Color`, `MarkerWidth` and `LengthArrow`
+    in effect
+    """
+    settings = _default_settings()
+    for i, aa in enumerate(iter_activities(fileName)):
+        before = dict(settings)
+        kept = []
+        t0 = None
+        for a in aa:
+            if str(a) in settings:
+                settings[str(a)] = a
+            elif str(a) in _kinds:
+                if kinds is not None and str(a) not in kinds:
+                    continue
+                if startDate is not None and a.t0 + a.duration < startDate:
+                    continue
+                if endDate is not None and a.t0 > endDate:
+                    continue
+                if colors is not None and (settings["Color"].color if a._color is None else a._color) \
+                   not in colors:
+                    continue
+                if label is not None and not label.search(a.descrip):
+                    continue
+
+                t0 = a.t0 if t0 is None else min(t0, a.t0)
+            kept.append(a)
+
+        if t0 is not None:
+            yield (t0 if by == "date" else i), kept, before, dict(settings)
+
+
+def _as_datetime(date):
+    return datetime.fromisoformat(date) if isinstance(date, str) else date
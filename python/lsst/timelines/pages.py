@@ -0,0 +1,337 @@
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from .activities import show_activities
+from .binary import save_activity_table, load_activity_table, _MAGIC
+from .intervals import IntervalIndex
+from .table import ActivityTable, read_activity_table
+
+__all__ = ["Page", "PageResult", "render_pages", "periodic_pages"]
+
+
+class Page:
+    """A description of one output of `render_pages`
+
+    fileName: the file to write; the format is taken from the suffix
+      (e.g. .png or .pdf)
+    startDate, endDate: the window to draw (None: unbounded)
+    colors: only draw entries with one of these colours (e.g. the colours
+      used for a subsystem)
+    groups: only draw entries in these inner lists (indices into the
+      timeline's list of lists)
+    title: a title for the plot
+    figsize, height, fontsize, show_today: passed to `Figure` and
+      `show_activities`
+    """
+
+    def __init__(self, fileName, startDate=None, endDate=None, colors=None, groups=None, title=None,
+                 figsize=(12, 6), height=0.1, fontsize=7, show_today=True):
+        self.fileName = fileName
+        self.startDate = startDate
+        self.endDate = endDate
+        self.colors = colors
+        self.groups = groups
+        self.title = title
+        self.figsize = figsize
+        self.height = height
+        self.fontsize = fontsize
+        self.show_today = show_today
+
+    def __repr__(self):
+        return f"Page({self.fileName!r}, {self.startDate!r}, {self.endDate!r})"
+
+    @property
+    def isFiltered(self):
+        return self.colors is not None or self.groups is not None
+
+    def select(self, table):
+        """Return the part of table that this Page draws
+
+        All the `Manipulation`s are kept, so the rows and styles of the
+        selected entries are unchanged (but rows with nothing to draw are
+        omitted)
+        """
+        keep = table.isItem
+        if self.colors is not None:
+            colors = set(self.colors)
+            keep &= np.array([c in colors for c in table.styles()[0]], dtype=bool)
+        if self.groups is not None:
+            keep &= np.isin(table.group, self.groups)
+
+        return table.take(~table.isItem | keep)
+
+
+class PageResult:
+    """The outcome of rendering a `Page`
+
+    page: the Page
+    nEntry: the number of entries in the page's window
+    seconds: the time taken to draw and write the page
+    error: a description of the problem if rendering failed, else None
+    """
+
+    def __init__(self, page, nEntry=0, seconds=0.0, error=None):
+        self.page = page
+        self.nEntry = nEntry
+        self.seconds = seconds
+        self.error = error
+
+    def __str__(self):
+        if self.error is not None:
+            return f"{self.page.fileName}: FAILED: {self.error}"
+        return f"{self.page.fileName}: {self.nEntry} entries, {self.seconds:.2f}s"
+
+
+def render_pages(timeline, pages, nProcess=None, progress=None):
+    """Render a set of Pages from a single timeline, using a pool of processes
+
+    timeline: an `ActivityTable`, a list of lists of Activities, or the name
+      of a CSV file (as written by `write_activities`) or binary file (as
+      written by `save_activity_table`)
+    pages: a sequence of `Page`s
+    nProcess: the number of worker processes (default: the number of CPUs);
+      0 or 1 renders in this process
+    progress: a function called with each `PageResult` as it's completed
+
+    The timeline is only read or converted once.  The workers share it via
+    a memory-mapped binary file (written to a temporary directory unless
+    timeline is already one), so starting a worker costs the same for any
+    size of timeline.  Pages that fail are reported in their PageResult
+    rather than stopping the others.
+
+    Returns a list of `PageResult`s, in the same order as pages
+    """
+    pages = list(pages)
+    if nProcess is None:
+        nProcess = os.cpu_count() or 1
+    nProcess = min(nProcess, len(pages))
+
+    if nProcess <= 1:
+        if isinstance(timeline, str):
+            timeline = _read_timeline(timeline)
+        worker = _Worker(timeline)
+
+        results = []
+        for page in pages:
+            results.append(worker.render(page))
+            if progress:
+                progress(results[-1])
+        return results
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        if isinstance(timeline, str) and _is_binary(timeline):
+            fileName = timeline
+        else:
+            if isinstance(timeline, str):
+                timeline = _read_timeline(timeline)
+            fileName = os.path.join(tmpdir, "timeline.bin")
+            save_activity_table(timeline, fileName)
+
+        results = [None]*len(pages)
+        with ProcessPoolExecutor(nProcess, initializer=_init_worker, initargs=(fileName,)) as pool:
+            futures = {pool.submit(_render_in_worker, page): i for i, page in enumerate(pages)}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                except Exception as e:  # e.g. a worker died
+                    results[i] = PageResult(pages[i], error=f"{type(e).__name__}: {e}")
+                if progress:
+                    progress(results[i])
+
+    return results
+
+
+def periodic_pages(startDate, endDate, period="month", fileNameFormat="timeline-{start:%Y-%m-%d}.png",
+                   **kwargs):
+    """Return a list of Pages covering [startDate, endDate] in steps of period
+
+    period: "month", "quarter", or "year"; the windows are aligned to
+      calendar boundaries, so the first and last may extend beyond the
+      requested range.  Each window runs up to the start of the next, so
+      an entry that spans a boundary is drawn on both Pages and nothing
+      on the last day of a window is lost
+    fileNameFormat: format for the Pages' file names; start and end (the
+      first and last days of the window, as datetimes) and i (the index of
+      the page) are available
+    kwargs: passed to the Pages (e.g. colors, figsize)
+    """
+    months = dict(month=1, quarter=3, year=12)
+    if period not in months:
+        raise ValueError(f"Unknown period {period!r}; expected one of {', '.join(months)}")
+    step = months[period]
+
+    startDate, endDate = _as_datetime(startDate), _as_datetime(endDate)
+    month = (startDate.year*12 + startDate.month - 1)//step*step
+
+    pages = []
+    while True:
+        start = datetime(month//12, month%12 + 1, 1)
+        if start > endDate:
+            break
+        month += step
+        stop = datetime(month//12, month%12 + 1, 1)         # the start of the next window
+        end = datetime.fromordinal(stop.toordinal() - 1)    # the last day of the window
+
+        fileName = fileNameFormat.format(start=start, end=end, i=len(pages))
+        pages.append(Page(fileName, start, stop, **kwargs))
+
+    return pages
+
+
+class _Worker:
+    """The state kept by each process of render_pages: the timeline, and an
+    index over it (built when first needed)
+    """
+
+    def __init__(self, timeline):
+        if not isinstance(timeline, ActivityTable):
+            timeline = ActivityTable.from_activities(timeline)
+        self.table = timeline
+        self._index = None
+
+    def render(self, page):
+        t0 = time.perf_counter()
+        try:
+            nEntry = self._render(page)
+        except Exception as e:
+            return PageResult(page, error=f"{type(e).__name__}: {e}")
+
+        return PageResult(page, nEntry, time.perf_counter() - t0)
+
+    def _render(self, page):
+        from matplotlib.figure import Figure  # here so that the command line parser doesn't need matplotlib
+
+        kwargs = {}
+        for name in ["startDate", "endDate"]:
+            if getattr(page, name) is not None:
+                kwargs[name] = _as_datetime(getattr(page, name))
+
+        if page.isFiltered:
+            table, index = page.select(self.table), None
+            nEntry = int(table.visible(page.startDate, page.endDate).sum())
+        else:
+            if self._index is None:
+                self._index = IntervalIndex(self.table)
+            table, index = self.table, self._index
+            nEntry = index.count(page.startDate, page.endDate)
+
+        fig = Figure(figsize=page.figsize)
+        ax = fig.add_subplot()
+        if page.title:
+            ax.set_title(page.title)
+        show_activities(table, height=page.height, fontsize=page.fontsize, show_today=page.show_today,
+                        index=index, ax=ax, **kwargs)
+        if len(kwargs) == 2:            # show exactly the window, even if today is outside it
+            ax.set_xlim(kwargs["startDate"], kwargs["endDate"])
+
+        fig.savefig(page.fileName)
+        return nEntry
+
+
+_worker = None                          # the _Worker in a render_pages process
+
+
+def _init_worker(fileName):
+    global _worker
+    _worker = _Worker(load_activity_table(fileName))
+
+
+def _render_in_worker(page):
+    return _worker.render(page)
+
+
+def _is_binary(fileName):
+    with open(fileName, "rb") as fd:
+        return fd.read(len(_MAGIC)) == _MAGIC
+
+
+def _read_timeline(fileName):
+    """Read a timeline from a binary or CSV file"""
+    if _is_binary(fileName):
+        return load_activity_table(fileName)
+    return read_activity_table(fileName)
+
+
+def _as_datetime(date):
+    if isinstance(date, str):
+        return datetime.fromisoformat(date)
+    if isinstance(date, np.datetime64):
+        return date.astype("datetime64[us]").astype(datetime)
+    return date
+
+
+def _add_arguments(parser):
+    """Add the options that describe the pages to render to parser (the
+    parser for timelines render)
+    """
+    parser.add_argument("timelines", nargs="+", help="CSV or binary timeline files")
+    parser.add_argument("--period", choices=["month", "quarter", "year"],
+                        help="Make a page for each period between --start and --end")
+    parser.add_argument("--start", help="First date to draw (ISO format)")
+    parser.add_argument("--end", help="Last date to draw (ISO format)")
+    parser.add_argument("--format", nargs="+", default=["png"], help="Output format(s), e.g. png pdf svg")
+    parser.add_argument("--subsystem", action="append", default=[], type=_subsystem,
+                        metavar="NAME=COLOR[,COLOR...]",
+                        help="Also make pages for just the entries with these colours")
+    parser.add_argument("--outdir", default=".", help="Directory for the output files")
+    parser.add_argument("--prefix", help="Prefix for output file names (default: the timeline's name)")
+    parser.add_argument("--figsize", nargs=2, type=float, default=(12, 6), help="Figure size (inches)")
+    parser.add_argument("--height", type=float, default=0.1, help="Height of each activity bar")
+    parser.add_argument("--fontsize", type=float, default=7, help="Font size for labels")
+    parser.add_argument("--no-today", dest="show_today", action="store_false",
+                        help="Don't mark today's date")
+    parser.add_argument("--title", action="store_true", help="Title each page with its timeline's name")
+    parser.add_argument("-j", "--processes", type=int, default=1,
+                        help="Number of processes; a single timeline's pages are rendered in parallel, "
+                        "else the timelines are")
+
+
+def _check_arguments(parser, args):
+    """Check the options added by _add_arguments, calling parser.error if
+    they're inconsistent
+    """
+    if args.period and (args.start is None or args.end is None):
+        parser.error("--period requires --start and --end")
+    if args.prefix and len(args.timelines) > 1:
+        parser.error("--prefix may only be used with a single timeline")
+
+
+def _subsystem(value):
+    """Parse a --subsystem NAME=COLOR[,COLOR...] option"""
+    name, _, colors = value.partition("=")
+    if not name or not colors:
+        raise argparse.ArgumentTypeError(f"Please specify --subsystem as NAME=COLOR[,COLOR...]; "
+                                         f"saw {value!r}")
+    return name, colors.split(",")
+
+
+def _make_pages(fileName, args):
+    """Return the Pages of the timeline fileName described by the options
+    added by _add_arguments
+
+    The pages are named <prefix>[-<subsystem>][-<start of period>].<format>
+    """
+    prefix = args.prefix or os.path.splitext(os.path.basename(fileName))[0]
+    name = os.path.splitext(os.path.basename(fileName))[0]
+
+    pages = []
+    for subsystem, colors in [(None, None)] + args.subsystem:
+        stem = prefix if subsystem is None else f"{prefix}-{subsystem}"
+        title = ": ".join(t for t in [name if args.title else None, subsystem] if t) or None
+        kwargs = dict(colors=colors, title=title, figsize=tuple(args.figsize), height=args.height,
+                      fontsize=args.fontsize, show_today=args.show_today)
+        for fmt in args.format:
+            if args.period:
+                fileNameFormat = os.path.join(args.outdir, stem + "-{start:%Y-%m-%d}." + fmt)
+                pages += periodic_pages(args.start, args.end, args.period, fileNameFormat, **kwargs)
+            else:
+                pages.append(Page(os.path.join(args.outdir, f"{stem}.{fmt}"), args.start, args.end, **kwargs))
+
+    return pages
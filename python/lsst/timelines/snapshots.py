@@ -0,0 +1,327 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+import hashlib
+import os
+import re
+import tempfile
+
+import numpy as np
+
+from .activities import TimelineFormatError
+from .binary import save_activity_table, load_activity_table, _MAGIC
+from .cache import _default_directory, _evict
+from .table import ActivityTable, read_activity_table
+
+__all__ = ["Snapshots", "SnapshotCache", "read_snapshots"]
+
+_snapshotVersion = 1                    # change to invalidate all cached snapshots
+
+_slipDtype = [("kind", "U13"), ("label", object), ("occurrence", np.int32), ("status", "U7"),
+              ("oldStart", "M8[us]"), ("newStart", "M8[us]"), ("startSlip", float),
+              ("oldEnd", "M8[us]"), ("newEnd", "M8[us]"), ("endSlip", float)]
+
+
+class Snapshots:
+    """A series of versions ("snapshots") of a plan, with their entries
+    matched across versions; see `read_snapshots`
+
+    tables: the `ActivityTable` of each snapshot, in date order
+    dates: the date of each snapshot, as datetime64[D]s
+    names: a name for each snapshot (e.g. its file name)
+
+    Entries are matched by their kind (Activity, Milestone or
+    Functionality) and label; if a snapshot has several entries of the same
+    kind and label, the first matches the first, the second the second, and
+    so on.  The start and end dates of the nKey distinct entries are held
+    as (nSnapshot, nKey) arrays t0 and t1, which are NaT where an entry is
+    missing from a snapshot
+
+    keys: the (kind, label, occurrence) of each of the nKey entries
+    """
+
+    def __init__(self, tables, dates, names=None):
+        self.dates = np.asarray(dates, dtype="M8[D]")
+        self.names = list(names) if names is not None else [str(d) for d in self.dates]
+        if len(self.dates) != len(tables) or len(self.names) != len(tables):
+            raise ValueError(f"Saw {len(tables)} snapshots but {len(self.dates)} dates and "
+                             f"{len(self.names)} names")
+
+        keyIds = {}
+        entries = []                    # (snapshot, key ids, entry indices) for each snapshot
+        for s, table in enumerate(tables):
+            ind = np.flatnonzero(table.isItem)
+            kinds, labels = table.kind[ind].tolist(), table.labels[ind]
+
+            ids = np.empty(len(ind), dtype=np.int64)
+            nSeen = {}
+            for i, key in enumerate(zip(kinds, labels)):
+                occurrence = nSeen.get(key, 0)
+                nSeen[key] = occurrence + 1
+                ids[i] = keyIds.setdefault(key + (occurrence,), len(keyIds))
+            entries.append((s, ids, ind))
+
+        self.keys = [(ActivityTable.kindNames[kind], label, occurrence) for kind, label, occurrence in keyIds]
+
+        shape = (len(tables), len(keyIds))
+        self.t0 = np.full(shape, np.datetime64("NaT"), dtype="M8[us]")
+        self.t1 = np.full(shape, np.datetime64("NaT"), dtype="M8[us]")
+        for (s, ids, ind), table in zip(entries, tables):
+            self.t0[s, ids] = table.t0[ind]
+            self.t1[s, ids] = table.t1[ind]
+
+    def __len__(self):
+        return len(self.dates)
+
+    def __str__(self):
+        return "Snapshots(%d from %s to %s, %d entries)" % (
+            len(self), self.dates[0], self.dates[-1], len(self.keys)) if len(self) else "Snapshots()"
+
+    @property
+    def present(self):
+        """A boolean (nSnapshot, nKey) array; True where an entry is present"""
+        return ~np.isnat(self.t0)
+
+    def index(self, date):
+        """Return the index of the last snapshot taken on or before date (an
+        ISO string, date, or datetime64)
+        """
+        i = int(np.searchsorted(self.dates, np.datetime64(date, "D"), side="right")) - 1
+        if i < 0:
+            raise ValueError(f"There are no snapshots on or before {date}")
+        return i
+
+    def slips(self, base=0):
+        """Return how far each entry's start and end have moved, in days
+
+        base: the index of the snapshot to compare with, or None to compare
+          each snapshot with the previous one
+
+        Returns two float (nSnapshot, nKey) arrays, the slips in the starts
+        and in the ends; NaN where an entry is missing from either snapshot
+        """
+        day = np.timedelta64(1, "D")
+        if base is None:
+            startSlip, endSlip = np.full(self.t0.shape, np.nan), np.full(self.t1.shape, np.nan)
+            startSlip[1:] = np.diff(self.t0, axis=0)/day
+            endSlip[1:] = np.diff(self.t1, axis=0)/day
+        else:
+            startSlip = (self.t0 - self.t0[base])/day
+            endSlip = (self.t1 - self.t1[base])/day
+
+        return startSlip, endSlip
+
+    def slip_table(self, old=-2, new=-1, unchanged=False):
+        """Return the differences between two snapshots
+
+        old, new: the indices of the snapshots to compare
+        unchanged: include the entries that didn't move
+
+        Returns a numpy structured array with fields kind, label,
+        occurrence, status ("moved", "added", "removed", or "same"), the old
+        and new starts and ends, and startSlip and endSlip in days (NaN
+        unless the entry is in both snapshots).  The entries that moved come
+        first, in decreasing order of how far their ends slipped, then those
+        that were added, removed, and unchanged
+        """
+        startSlip, endSlip = self.slips(old)
+        startSlip, endSlip = startSlip[new], endSlip[new]
+        inOld, inNew = self.present[old], self.present[new]
+
+        status = np.full(len(self.keys), "same", dtype="U7")
+        status[inOld & inNew & ((startSlip != 0) | (endSlip != 0))] = "moved"
+        status[~inOld & inNew] = "added"
+        status[inOld & ~inNew] = "removed"
+
+        keep = (inOld | inNew) & (unchanged | (status != "same"))
+        rank = np.select([status == "moved", status == "added", status == "removed"], [0, 1, 2], 3)
+        ind = np.flatnonzero(keep)
+        ind = ind[np.lexsort((-np.nan_to_num(endSlip[ind]), rank[ind]))]
+
+        slips = np.empty(len(ind), dtype=_slipDtype)
+        slips["kind"] = [self.keys[i][0] for i in ind]
+        slips["label"] = [self.keys[i][1] for i in ind]
+        slips["occurrence"] = [self.keys[i][2] for i in ind]
+        slips["status"] = status[ind]
+        slips["oldStart"], slips["newStart"] = self.t0[old, ind], self.t0[new, ind]
+        slips["oldEnd"], slips["newEnd"] = self.t1[old, ind], self.t1[new, ind]
+        slips["startSlip"], slips["endSlip"] = startSlip[ind], endSlip[ind]
+
+        return slips
+
+    def plot(self, keys=None, n=10, ax=None, fontsize=7):
+        """Plot the history of the forecast ends of some entries (a "slip
+        chart"): each entry is a line of its end date against the date of
+        the snapshot, so an entry that's on schedule is horizontal and one
+        that slips as fast as time passes is parallel to the diagonal
+
+        keys: the indices (into self.keys) of the entries to plot
+          (default: the n whose ends moved furthest)
+        ax: the Axes to draw in (default: the current Axes)
+
+        Returns the indices of the entries plotted
+        """
+        import matplotlib.pyplot as plt
+
+        if ax is None:
+            ax = plt.gca()
+
+        if keys is None:                # NaT is ignored by fmax and fmin
+            moved = np.fmax.reduce(self.t1, axis=0) - np.fmin.reduce(self.t1, axis=0)
+            moved = np.nan_to_num(moved/np.timedelta64(1, "D"))
+            keys = np.argsort(-moved, kind="stable")[:n]
+            keys = keys[moved[keys] > 0]
+
+        x = self.dates.astype("M8[us]")
+        for i in keys:
+            kind, label, occurrence = self.keys[i]
+            ax.plot(x, self.t1[:, i], "o-" if kind == "Activity" else "D-", markersize=3,
+                    label=label if occurrence == 0 else f"{label} [{occurrence + 1}]")
+        #
+        # The diagonal, where the forecast end is the date of the snapshot
+        #
+        hi = np.fmax.reduce(np.r_[x[-1:], self.t1[:, keys].ravel()])
+        ax.plot([x[0], hi], [x[0], hi], color="gray", linestyle="--", linewidth=0.5, zorder=-1)
+        if len(x) > 1:
+            ax.set_xlim(x[0], x[-1])
+
+        ax.set_xlabel("Snapshot")
+        ax.set_ylabel("Forecast end")
+        if len(keys):
+            ax.legend(fontsize=fontsize)
+
+        return keys
+
+
+class SnapshotCache:
+    """An on-disk store of parsed snapshots, keyed by a hash of each file's
+    contents; see `read_snapshots`
+
+    directory: where to keep them (default: the snapshots subdirectory of
+      $TIMELINES_CACHE, or of ~/.cache/lsst-timelines)
+    maxBytes: the largest total size of the stored snapshots; when it's
+      exceeded the least recently used are deleted
+
+    Each snapshot is kept as a binary timeline (see `save_activity_table`),
+    written to a temporary name and then renamed into place, so several
+    processes may share a store
+    """
+
+    def __init__(self, directory=None, maxBytes=200*2**20):
+        if directory is None:
+            directory = os.path.join(_default_directory(), "snapshots")
+        self.directory = directory
+        self.maxBytes = maxBytes
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, contents):
+        """Return the key for a snapshot file's contents (bytes)"""
+        return hashlib.blake2b(contents + b"%d" % _snapshotVersion, digest_size=20).hexdigest()
+
+    def load(self, key):
+        """Return the (memory-mapped) `ActivityTable` stored under key, or
+        None if there isn't one
+        """
+        path = os.path.join(self.directory, key)
+        try:
+            os.utime(path)              # mark it as recently used
+            table = load_activity_table(path)
+        except FileNotFoundError:       # never stored, or evicted by another process
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return table
+
+    def save(self, key, table):
+        """Store table under key, evicting old snapshots if the store is then
+        too large
+        """
+        fd, tmpName = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        os.close(fd)
+        try:
+            save_activity_table(table, tmpName)
+            os.replace(tmpName, os.path.join(self.directory, key))
+        except BaseException:
+            os.unlink(tmpName)
+            raise
+
+        _evict(self.directory, self.maxBytes)
+
+    def clear(self):
+        """Delete all the stored snapshots"""
+        return _evict(self.directory, 0)
+
+
+def read_snapshots(fileNames, dates=None, processes=1, cache=True):
+    """Read several versions of a plan, matching their entries
+
+    fileNames: CSV (or binary) files, one per snapshot
+    dates: the date of each snapshot (default: the last ISO date in each
+      file's name, e.g. plans-2021-03-20.csv, or the date it was modified)
+    processes: the number of processes to parse CSV files in
+    cache: a `SnapshotCache` to keep the parsed snapshots in, True to use
+      one in the default directory, or False not to cache
+
+    The parsed CSV files are cached as binary timelines, keyed by a hash of
+    their contents, so a set of snapshots that's read again (e.g. each week
+    when a new one is added) only parses the new files.
+
+    Returns a `Snapshots`, sorted into date order
+    """
+    if cache is True:
+        cache = SnapshotCache()
+    if dates is None:
+        dates = [_snapshot_date(fileName) for fileName in fileNames]
+
+    tables = [None]*len(fileNames)
+    keys = [None]*len(fileNames)
+    for i, fileName in enumerate(fileNames):
+        with open(fileName, "rb") as fd:
+            contents = fd.read()
+        if contents.startswith(_MAGIC):
+            tables[i] = load_activity_table(fileName)
+        elif cache:
+            keys[i] = cache.key(contents)
+            tables[i] = cache.load(keys[i])
+
+    toParse = [i for i, table in enumerate(tables) if table is None]
+    if processes > 1 and len(toParse) > 1:
+        with ProcessPoolExecutor(min(processes, len(toParse))) as pool:
+            results = list(pool.map(_parse_snapshot, [fileNames[i] for i in toParse]))
+    else:
+        results = [_parse_snapshot(fileNames[i]) for i in toParse]
+
+    for i, (table, error) in zip(toParse, results):
+        if error is not None:
+            raise TimelineFormatError(*error)
+        tables[i] = table
+
+        if cache:
+            cache.save(keys[i], table)
+
+    order = np.argsort(np.asarray(dates, dtype="M8[D]"), kind="stable")
+    return Snapshots([tables[i] for i in order], np.asarray(dates, dtype="M8[D]")[order],
+                     [fileNames[i] for i in order])
+
+
+def _parse_snapshot(fileName):
+    """Read a CSV file, returning the table and None, or None and the
+    arguments of the `TimelineFormatError` (which can't be pickled)
+    """
+    try:
+        return read_activity_table(fileName), None
+    except TimelineFormatError as e:
+        return None, (e.fileName, e.lineno, e.message)
+
+
+def _snapshot_date(fileName):
+    """The date of a snapshot: the last ISO date in its name, else the date
+    that it was modified
+    """
+    found = re.findall(r"\d{4}-\d{2}-\d{2}", os.path.basename(fileName))
+    if found:
+        return np.datetime64(found[-1], "D")
+    return np.datetime64(date.fromtimestamp(os.path.getmtime(fileName)), "D")
@@ -0,0 +1,74 @@
+import contextlib
+import time
+
+__all__ = ["RenderStats"]
+
+
+class RenderStats:
+    """Timings and counts describing a call to `show_activities`
+
+    phases: dict of wall-clock time (seconds) spent in each phase, in the
+      order that they were first entered:
+        extent        finding the range of dates to be drawn
+        draw          generating the geometry and labels of the entries
+                      (including wrap)
+        wrap          wrapping the labels with textwrap
+        collections   building the collections (batched drawing only)
+        finish        the date grid, today's date, and formatting the axis
+        tight_layout  Figure.tight_layout
+    nDrawn: the number of Activities, Milestones and Functionalities drawn
+      (or, for a summarised view from a `LevelOfDetail`, the number of
+      coverage spans)
+    nCulled: the number that weren't drawn individually: those outside the
+      date window, or merged into coverage spans
+    nArtist: the number of matplotlib artists created
+    profile: a `pstats.Stats` for the whole call, if profiling was requested
+
+    Pass one to show_activities, or request it with a callback or
+    profile=True; see `show_activities`
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self.nDrawn = 0
+        self.nCulled = 0
+        self.nArtist = 0
+        self.profile = None
+
+    @property
+    def total(self):
+        """The total time, not double-counting nested phases"""
+        return sum(t for name, t in self.phases.items() if name != "wrap")
+
+    def add(self, phase, seconds):
+        """Add seconds to the time spent in phase"""
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    @contextlib.contextmanager
+    def timer(self, phase):
+        """A context manager that adds the time spent within it to phase"""
+        self.phases.setdefault(phase, 0.0)   # so phases are listed in the order they're entered
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - t0)
+
+    def __str__(self):
+        lines = [f"{'phase':<14} {'seconds':>8}"]
+        for name, t in self.phases.items():
+            lines.append(f"{name:<14} {t:8.3f}")
+        lines.append(f"{'total':<14} {self.total:8.3f}")
+        lines.append(f"drawn: {self.nDrawn}  culled: {self.nCulled}  artists: {self.nArtist}")
+
+        return "\n".join(lines)
+
+
+_noTimer = contextlib.nullcontext()
+
+
+def _timer(stats, phase):
+    """Return stats.timer(phase), or a do-nothing context manager if stats
+    is None
+    """
+    return _noTimer if stats is None else stats.timer(phase)
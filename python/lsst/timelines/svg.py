@@ -0,0 +1,311 @@
+from datetime import datetime
+from xml.sax.saxutils import escape, quoteattr
+
+import numpy as np
+
+import matplotlib as mpl
+import matplotlib.colors as mcolors
+import matplotlib.dates as mdates
+import matplotlib.font_manager as font_manager
+
+from .batching import _arrow_verts
+from .labels import get_label_wrapper, _labelPadding
+from .table import ActivityTable
+
+__all__ = ["write_svg"]
+
+
+def write_svg(timeline, fileName, height=0.1, fontsize=7, show_today=True,
+              startDate="1958-02-05", endDate="2099-12-31", figsize=(12, 6), title=None,
+              index=None, layout=None, chunkSize=10000):
+    """Write a timeline as SVG, without creating any matplotlib artists
+
+    timeline: an `ActivityTable` or a list of lists of Activities
+    fileName: the file to write, or an open text file
+    figsize: the size of the figure, in inches
+    title: a title for the plot
+    chunkSize: the number of entries to convert to SVG at a time
+
+    The other arguments are as for `show_activities`, and the bars, borders,
+    diamonds, arrows, labels, date grid, and today's date are drawn as it
+    would (but the margins around the Axes are fixed, rather than set by
+    `tight_layout`).  The output is written in a single pass over the
+    entries per layer, chunkSize entries at a time, so the memory used
+    doesn't grow with the number of entries beyond a few arrays of their
+    coordinates.  This is many times faster than `show_activities`
+    followed by savefig for large timelines.
+
+    Returns the number of entries drawn
+    """
+    if index is not None:
+        timeline = index.table
+    table = timeline if isinstance(timeline, ActivityTable) else ActivityTable.from_activities(timeline)
+
+    if isinstance(startDate, str):
+        startDate = datetime.fromisoformat(startDate)
+    if isinstance(endDate, str):
+        endDate = datetime.fromisoformat(endDate)
+
+    if isinstance(fileName, str):
+        with open(fileName, "w") as fd:
+            return _write_svg(table, fd, height, fontsize, show_today, startDate, endDate, figsize, title,
+                              index, layout, chunkSize)
+    else:
+        return _write_svg(table, fileName, height, fontsize, show_today, startDate, endDate, figsize, title,
+                          index, layout, chunkSize)
+
+
+def _write_svg(table, fd, height, fontsize, show_today, startDate, endDate, figsize, title, index, layout,
+               chunkSize):
+    if index is None:
+        sel = np.flatnonzero(table.visible(startDate, endDate))
+    else:
+        sel = index.overlapping(startDate, endDate)
+    #
+    # The geometry of the visible entries, as in ActivityTable.draw
+    #
+    t0, t1 = table.t0[sel], table.t1[sel]
+    if startDate is not None:
+        t0 = np.maximum(t0, np.datetime64(startDate, "us"))
+    if endDate is not None:
+        t1 = np.minimum(t1, np.datetime64(endDate, "us"))
+
+    if layout is None:
+        y0 = height*(1.1*(table._rows(sel, sel) - table.drow[sel]))
+    else:
+        if len(layout) != len(table):
+            raise ValueError(f"The layout has {len(layout)} entries, but the table has {len(table)}")
+        y0 = height*(1.1*-layout.rows[sel])
+
+    kind = table.kind[sel]
+    isBar = kind == ActivityTable.ACTIVITY
+    isDiamond = ~isBar
+    isArrow = kind == ActivityTable.FUNCTIONALITY
+
+    colors, borders, markerWidths, lengthArrows = table.styles()
+    colors, borders = colors[sel], borders[sel]
+    markerWidths, lengthArrows = markerWidths[sel], lengthArrows[sel]
+    #
+    # Resolve the colours that are None as ArtistBatch does, filling bars
+    # and diamonds from one cycle in the order of the entries, bars' borders
+    # from another, and arrows with the default patch colour
+    #
+    cycle = [mcolors.to_hex(c) for c in mpl.rcParams["axes.prop_cycle"].by_key().get("color", ["C0"])]
+    fills = _resolve(colors, cycle)
+    barFills, diamondFills = fills[isBar], fills[isDiamond]
+    arrowFills = _resolve(colors[isArrow], [mcolors.to_hex(mpl.rcParams["patch.facecolor"])])
+
+    barLines = np.where(borders[isBar] == None, colors[isBar], borders[isBar])  # noqa: E711
+    barLines = _resolve(barLines, cycle)
+    #
+    # The data limits, and the transformation to points on the page
+    #
+    x0, x1 = _date2num(t0), _date2num(t1)
+    xArrow = _date2num(table.t0[sel[isArrow]])
+    dx = lengthArrows[isArrow]
+    yArrow = y0[isArrow] + (0.5 + table.dy[sel[isArrow]])*height
+
+    xs = [x0[isBar], x1[isBar], xArrow, xArrow + dx,
+          x0[isDiamond] - markerWidths[isDiamond], x0[isDiamond] + markerWidths[isDiamond]]
+    now = datetime.now()
+    showToday = show_today and now > startDate
+    if showToday:
+        xs.append(np.array([mdates.date2num(now)]))
+    xs = np.concatenate(xs)
+
+    if len(sel) == 0:
+        xmin, xmax, ymin, ymax = 0, 1, 0, 1
+    else:
+        xmin, xmax = xs.min(), xs.max()
+        ymin, ymax = y0.min(), y0.max() + height
+    xmin, xmax = _margins(xmin, xmax, mpl.rcParams["axes.xmargin"])
+    ymin, ymax = _margins(ymin, ymax, mpl.rcParams["axes.ymargin"])
+
+    width, figHeight = 72*figsize[0], 72*figsize[1]
+    titleSize = font_manager.FontProperties(size=mpl.rcParams["axes.titlesize"]).get_size_in_points()
+    tickSize = font_manager.FontProperties(size=mpl.rcParams["xtick.labelsize"]).get_size_in_points()
+
+    left, right = 12, width - 12
+    top = 12 + (1.6*titleSize if title else 0)
+    bottom = figHeight - (12 + 3.5*tickSize)     # room for the rotated date labels
+    sx = (right - left)/(xmax - xmin)
+    sy = (bottom - top)/(ymax - ymin)
+
+    def X(x):
+        return left + (x - xmin)*sx
+
+    def Y(y):
+        return bottom - (y - ymin)*sy
+
+    family = font_manager.get_font(font_manager.findfont(font_manager.FontProperties())).family_name
+    family = f"{family}, {mpl.rcParams['font.family'][0]}"  # the font that matplotlib would use
+    #
+    # The header, the Axes, and the date grid
+    #
+    write = fd.write
+    write(f'<?xml version="1.0" encoding="utf-8"?>\n'
+          f'<svg xmlns="http://www.w3.org/2000/svg" width="{width:g}pt" height="{figHeight:g}pt" '
+          f'viewBox="0 0 {width:g} {figHeight:g}" font-family={quoteattr(family)}>\n'
+          f'<rect width="100%" height="100%" fill="white"/>\n'
+          f'<defs><clipPath id="axes"><rect x="{left:g}" y="{top:.2f}" width="{right - left:g}" '
+          f'height="{bottom - top:.2f}"/></clipPath></defs>\n')
+    if title:
+        write(f'<text x="{(left + right)/2:.2f}" y="{top - 0.6*titleSize:.2f}" text-anchor="middle" '
+              f'font-size="{titleSize:g}">{escape(title)}</text>\n')
+
+    locator = mdates.AutoDateLocator()
+    formatter = mdates.AutoDateFormatter(locator)
+    ticks = locator.tick_values(mdates.num2date(xmin), mdates.num2date(xmax))
+    ticks = [x for x in ticks if xmin <= x <= xmax]
+    formatter.set_locs(ticks)
+
+    write('<g stroke="#b0b0b0" stroke-width="0.8">\n')
+    for x in ticks:
+        write(f'<line x1="{X(x):.2f}" y1="{top:.2f}" x2="{X(x):.2f}" y2="{bottom:.2f}"/>\n')
+    write('</g>\n<g stroke="black" stroke-width="0.8">\n')
+    for x in ticks:
+        write(f'<line x1="{X(x):.2f}" y1="{bottom:.2f}" x2="{X(x):.2f}" y2="{bottom + 3.5:.2f}"/>\n')
+    write(f'</g>\n<g font-size="{tickSize:g}" text-anchor="end">\n')
+    for i, x in enumerate(ticks):
+        write(f'<text transform="translate({X(x):.2f},{bottom + 3.5 + tickSize:.2f}) rotate(-30)">'
+              f'{escape(formatter(x, i))}</text>\n')
+    write('</g>\n')
+
+    write('<g clip-path="url(#axes)">\n')
+    if showToday:
+        x = X(mdates.date2num(now))
+        write(f'<line x1="{x:.2f}" y1="{top:.2f}" x2="{x:.2f}" y2="{bottom:.2f}" stroke="black" '
+              f'stroke-opacity="0.5" stroke-width="1.5" stroke-dasharray="5.55,2.4"/>\n')
+    #
+    # The entries, a layer at a time (in the order that matplotlib draws them)
+    # and a chunk at a time
+    #
+    bars = np.flatnonzero(isBar)
+    bx0, bx1, by = X(x0[bars]), X(x1[bars]), Y(y0[bars] + height)
+    bh = height*sy
+    patchWidth, lineWidth = mpl.rcParams["patch.linewidth"], mpl.rcParams["lines.linewidth"]
+
+    write(f'<g fill-opacity="0.5" stroke-opacity="0.5" stroke-width="{patchWidth:g}">\n')
+    _write_chunks(fd, chunkSize, '<rect x="{:.2f}" y="{:.2f}" width="{:.2f}" height="%.2f" fill="{}" '
+                  'stroke="{}"/>\n' % bh, bx0, by, bx1 - bx0, barFills, barFills)
+    write(f'</g>\n<g fill="none" stroke-width="{lineWidth:g}">\n')
+    _write_chunks(fd, chunkSize, '<rect x="{:.2f}" y="{:.2f}" width="{:.2f}" height="%.2f" '
+                  'stroke="{}"/>\n' % bh, bx0, by, bx1 - bx0, barLines)
+    write('</g>\n')
+
+    diamonds = np.flatnonzero(isDiamond)
+    dx0, dw = X(x0[diamonds]), markerWidths[diamonds]*sx
+    dyBottom, dyMiddle, dyTop = Y(y0[diamonds]), Y(y0[diamonds] + 0.5*height), Y(y0[diamonds] + height)
+    write(f'<g stroke-width="{patchWidth:g}">\n')
+    _write_chunks(fd, chunkSize, '<polygon points="{0:.2f},{1:.2f} {2:.2f},{3:.2f} {0:.2f},{4:.2f} '
+                  '{5:.2f},{3:.2f}" fill="{6}" stroke="{6}"/>\n',
+                  dx0, dyBottom, dx0 + dw, dyMiddle, dyTop, dx0 - dw, diamondFills)
+    write('</g>\n')
+
+    if len(xArrow):
+        verts = _arrow_verts(xArrow, yArrow, dx, 0.2*height)
+        points = [" ".join(f"{x:.2f},{y:.2f}" for x, y in zip(vx, vy))
+                  for vx, vy in zip(X(verts[:, :, 0]).tolist(), Y(verts[:, :, 1]).tolist())]
+        write(f'<g stroke-width="{patchWidth:g}">\n')
+        _write_chunks(fd, chunkSize, '<polygon points="{}" fill="{}" stroke="{}"/>\n',
+                      points, arrowFills, arrowFills)
+        write('</g>\n')
+    #
+    # Labels, wrapped to the same widths as by show_activities (which uses
+    # the width of the Axes before tight_layout)
+    #
+    labels = table.labels[sel]
+    write(f'<g font-size="{fontsize:g}">\n')
+    if isBar.any():
+        totalDuration = t1.max() - t0.min()
+        axesWidth = (mpl.rcParams["figure.subplot.right"] - mpl.rcParams["figure.subplot.left"])*width
+        available = axesWidth*((t1[bars] - t0[bars])/totalDuration if totalDuration else 1)
+        available -= _labelPadding
+        available = np.broadcast_to(available, (len(bars),)).tolist()
+        xText, yText = ((bx0 + bx1)/2).tolist(), Y(y0[bars] + 0.5*height).tolist()
+
+        wrap = get_label_wrapper().wrap
+        for start in range(0, len(bars), chunkSize):
+            chunk = []
+            for i in range(start, min(start + chunkSize, len(bars))):
+                chunk.append(_text(xText[i], yText[i], wrap(labels[bars[i]], available[i], fontsize),
+                                   "middle", fontsize))
+            write("".join(chunk))
+
+    names = table._names()
+    alignRight = names[table.align[sel[diamonds]]] == "right"
+    valignTop = names[table.valign[sel[diamonds]]] == "top"
+    xText = (dx0 + np.where(alignRight, 0.5, -0.5)*dw).tolist()
+    yText = Y(y0[diamonds] + np.where(valignTop, 0.9, 0.1)*height).tolist()
+    anchors = np.where(alignRight, "start", "end").tolist()
+    for start in range(0, len(diamonds), chunkSize):
+        write("".join(_text(xText[i], yText[i], labels[diamonds[i]], anchors[i], fontsize)
+                      for i in range(start, min(start + chunkSize, len(diamonds)))))
+    write('</g>\n')
+    #
+    # The Axes' frame
+    #
+    write(f'</g>\n<rect x="{left:g}" y="{top:.2f}" width="{right - left:g}" height="{bottom - top:.2f}" '
+          f'fill="none" stroke="black" stroke-width="0.8"/>\n</svg>\n')
+
+    return len(sel)
+
+
+def _write_chunks(fd, chunkSize, fmt, *columns):
+    """Write fmt.format(*row) for each row of columns, chunkSize rows at a
+    time
+    """
+    n = len(columns[0])
+    for start in range(0, n, chunkSize):
+        end = min(start + chunkSize, n)
+        rows = zip(*[c[start:end].tolist() if isinstance(c, np.ndarray) else c[start:end] for c in columns])
+        fd.write("".join([fmt.format(*row) for row in rows]))
+
+
+def _text(x, y, text, anchor, fontsize):
+    """Return an SVG text element centred vertically on y; text may have
+    several lines
+    """
+    if not text:
+        return ""
+
+    lines = text.split("\n")
+    y -= 0.6*fontsize*(len(lines) - 1)   # the lines are 1.2*fontsize apart
+    if len(lines) == 1:
+        body = escape(text)
+    else:
+        body = "".join(f'<tspan x="{x:.2f}" dy="{0 if i == 0 else 1.2}em">{escape(line)}</tspan>'
+                       for i, line in enumerate(lines))
+
+    return (f'<text x="{x:.2f}" y="{y:.2f}" text-anchor="{anchor}" '
+            f'dominant-baseline="central">{body}</text>\n')
+
+
+def _resolve(colors, cycle):
+    """Return colors as hex strings, replacing Nones with successive
+    elements of cycle
+    """
+    hexColors = {}
+    result = np.empty(len(colors), dtype=object)
+    isNone = np.array([c is None for c in colors], dtype=bool)
+    result[isNone] = np.array(cycle, dtype=object)[np.arange(isNone.sum()) % len(cycle)]
+    for i in np.flatnonzero(~isNone):
+        c = colors[i]
+        key = c if isinstance(c, str) else tuple(c)
+        if key not in hexColors:
+            hexColors[key] = mcolors.to_hex(c)
+        result[i] = hexColors[key]
+
+    return result
+
+
+def _margins(lo, hi, margin):
+    """Add matplotlib's default margins to the range [lo, hi]"""
+    if hi == lo:
+        lo, hi = lo - 1, hi + 1
+    delta = margin*(hi - lo)
+    return lo - delta, hi + delta
+
+
+def _date2num(dates):
+    return mdates.date2num(np.asarray(dates, dtype="datetime64[us]"))
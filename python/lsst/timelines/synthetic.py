@@ -0,0 +1,190 @@
+from datetime import datetime, timedelta
+import random
+
+import numpy as np
+
+from .activities import Activity, Milestone, Functionality, AdvanceRow, Color, MarkerWidth, LengthArrow
+from .table import ActivityTable
+
+__all__ = ["makeTimeline", "makeObservingSchedule"]
+
+_colors = ["red", "blue", "green", "cyan", "magenta", "yellow", "black", "orange", "violet", "seagreen",
+           "goldenrod", "orchid"]
+_borders = ["green", "magenta", "black"]
+_verbs = ["Install", "Test", "Verify", "Integrate", "Commission", "Align", "Calibrate", "Ship", "Deploy",
+          "Re-verify", "Refurbish", "Characterise"]
+_filters = dict(u="violet", g="blue", r="green", i="goldenrod", z="orange", y="red")
+_programs = ["WFD", "WFD", "WFD", "WFD", "DDF", "ToO", "Twilight", "Calib"]
+_nouns = ["M1M3", "M2 hexapod", "ComCam", "LSSTCam", "TMA", "Rotator", "Dome", "GIS", "EAS", "CCW",
+          "Refrigeration lines", "Calibration screen", "Cabinet utilities", "Top End", "AuxTel",
+          "Pathfinder", "Active Optics", "Bridge crane"]
+
+
+def makeTimeline(nItem, startDate="2021-01-01", years=None, seed=666):
+    """Return a synthetic timeline with nItem Activities, Milestones and
+    Functionalities, as a list of lists suitable for `show_activities`
+
+    startDate: the earliest date of any entry
+    years: the span over which groups of entries start (default: 2 years
+      for up to 1000 items, growing as sqrt(nItem) for more so that each
+      row doesn't get unrealistically crowded)
+    seed: seed for the random number generator; the same arguments always
+      return the same timeline
+
+    The mix of entries is modelled on data/plans-2021-03-20.csv and
+    `planning.makeActivities`.  Each inner list averages about five items.
+    About 60% of items are Activities lasting a week to a few months,
+    usually chained one after the other.  About 25% are Milestones (with
+    assorted alignments) and 15% are Functionalities.  Most lists start
+    with a `Color` (sometimes with a border).  Further `Color`s,
+    `AdvanceRow`s, occasional `MarkerWidth` and `LengthArrow` entries, and
+    per-item colours appear at roughly the frequencies seen in the real
+    plans.
+    """
+    rng = random.Random(seed)
+
+    if years is None:
+        years = 2*max(1, (nItem/1000)**0.5)
+    t0 = datetime.fromisoformat(startDate) if isinstance(startDate, str) else startDate
+    span = int(365*years)
+
+    activities = []
+    i = 0
+    while i < nItem:
+        aa = []
+        if rng.random() < 0.9:
+            aa.append(_makeColor(rng))
+        if rng.random() < 0.1:
+            aa.append(MarkerWidth(rng.choice([1, 2, 3])))
+        if rng.random() < 0.05:
+            aa.append(LengthArrow(rng.choice([5, 10, 20])))
+
+        date = t0 + timedelta(rng.randrange(span))
+        nInGroup = min(nItem - i, 1 + int(rng.expovariate(1/4)))
+        advanced = 0
+        for j in range(nInGroup):
+            r = rng.random()
+            if r < 0.06:
+                aa.append(_makeColor(rng))
+            elif r < 0.10:
+                drow = -advanced if advanced and rng.random() < 0.5 else 1
+                aa.append(AdvanceRow(drow))
+                advanced += drow
+                date = t0 + timedelta(rng.randrange(span))
+
+            label = _makeLabel(rng, i)
+            color = rng.choice(_colors) if rng.random() < 0.05 else None
+            what = rng.random()
+            if what < 0.6:
+                duration = int(rng.lognormvariate(3.3, 0.8)) + 1     # median ~4 weeks
+                aa.append(Activity(label, date.strftime("%Y-%m-%d"), duration, color=color))
+                date += timedelta(duration + rng.randrange(-2, 10))
+            elif what < 0.85:
+                aa.append(Milestone(label, date.strftime("%Y-%m-%d"), color=color,
+                                    align=rng.choice(["right", "right", "left"]),
+                                    valign=rng.choice(["top", "top", "bottom"])))
+                date += timedelta(rng.randrange(0, 30))
+            else:
+                aa.append(Functionality(label, date.strftime("%Y-%m-%d"), color=color,
+                                        dy=rng.choice([0, 0, 0, 0.1, -0.1])))
+                date += timedelta(rng.randrange(0, 60))
+            i += 1
+
+        activities.append(aa)
+
+    return activities
+
+
+def makeObservingSchedule(nItem, startDate="2024-01-01", nights=365, seed=666):
+    """Return a synthetic nightly observing schedule with nItem exposures, as
+    an `ActivityTable` (a year of exposures is too many to build as
+    Activities)
+
+    startDate: the date of the first night
+    nights: the number of nights to spread the exposures over
+    seed: seed for the random number generator; the same arguments always
+      return the same schedule
+
+    There's one row per filter (u, g, r, i, z, y), each with its own
+    colour.  About a fifth of the nights are lost to weather; on the rest,
+    the exposures follow each other from dusk (which moves with the
+    seasons) for 8 to 11 hours, changing filter every fifty exposures or
+    so.  Each exposure lasts 50-90% of its slot in the night, so there are
+    short gaps between them and a longer gap at each filter change.  With
+    e.g. 10^6 exposures over 365 nights, each is about half a minute long.
+    """
+    rng = np.random.default_rng(seed)
+
+    clear = np.flatnonzero(rng.random(nights) > 0.2)
+    if len(clear) == 0:
+        clear = np.arange(nights)
+    night = np.sort(rng.choice(clear, nItem))
+    #
+    # Each exposure's slot in its night
+    #
+    dayOfYear = night + np.datetime64(startDate, "D").astype("M8[D]").item().timetuple().tm_yday
+    dusk = 23.5 - 1.2*np.cos(2*np.pi*dayOfYear/365.25)              # hours (UTC) after midnight
+    hours = 9.5 + 1.5*np.cos(2*np.pi*dayOfYear/365.25)               # length of the night
+    perNight = np.bincount(night, minlength=nights)
+    first = np.r_[0, np.cumsum(perNight)[:-1]]
+    slot = np.arange(nItem) - first[night]
+    slotLength = hours/np.maximum(perNight[night], 1)
+
+    t0 = dusk + slotLength*slot
+    duration = slotLength*rng.uniform(0.5, 0.9, nItem)
+    #
+    # Runs of exposures in the same filter
+    #
+    change = rng.random(nItem) < 1/50
+    change[0] = True
+    runStart = np.maximum.accumulate(np.where(change, np.arange(nItem), 0))
+    filterCode = rng.integers(0, len(_filters), nItem)[runStart]
+    duration[np.r_[change[1:], False]] *= 0.5        # leave time to change filter
+    #
+    # Sort by filter (i.e. row) and time, and prepend a Color entry to each row
+    #
+    start = np.datetime64(startDate, "D").astype("M8[us]") + night.astype("m8[D]")
+    second = np.timedelta64(1, "s")
+    t0 = start + np.round(t0*3600).astype(np.int64)*second
+    t1 = t0 + np.maximum(1, np.round(duration*3600)).astype(np.int64)*second
+
+    order = np.lexsort((t0, filterCode))
+    filterCode, t0, t1 = filterCode[order], t0[order], t1[order]
+    programs = rng.choice(_programs, nItem)
+    names = list(_filters)
+    labels = [f"{program} {i} {names[f]}" for program, i, f in zip(programs, order.tolist(), filterCode)]
+
+    nFilter = len(_filters)
+    n = nItem + nFilter
+    isColor = np.zeros(n, dtype=bool)
+    isColor[np.searchsorted(filterCode, np.arange(nFilter)) + np.arange(nFilter)] = True
+
+    kind = np.where(isColor, ActivityTable.COLOR, ActivityTable.ACTIVITY)
+    group = np.empty(n, dtype=np.int32)
+    group[isColor] = np.arange(nFilter)
+    group[~isColor] = filterCode
+    color = np.full(n, -1, dtype=np.int32)
+    color[isColor] = np.arange(nFilter)
+    t0s = np.full(n, np.datetime64("NaT"), dtype="M8[us]")
+    t1s = t0s.copy()
+    t0s[~isColor], t1s[~isColor] = t0, t1
+    allLabels = np.empty(n, dtype=object)
+    allLabels[~isColor] = labels
+
+    nan, none = np.full(n, np.nan), np.full(n, -1, dtype=np.int32)
+    return ActivityTable(nFilter, _filters.values(), kind=kind, group=group, t0=t0s, t1=t1s,
+                         drow=np.zeros(n, dtype=np.int32), color=color, border=none, align=none,
+                         valign=none, markerWidth=nan, lengthArrow=nan, dy=nan, labels=allLabels,
+                         line=np.zeros(n, dtype=np.int32))
+
+
+def _makeColor(rng):
+    if rng.random() < 0.2:
+        return Color("white", border=rng.choice(_borders))
+    return Color(rng.choice(_colors))
+
+
+def _makeLabel(rng, i):
+    if rng.random() < 0.2:
+        return f"{rng.choice(_nouns)} {rng.choice(['ready', 'delivered', 'complete'])} #{i}"
+    return f"{rng.choice(_verbs)} {rng.choice(_nouns)} #{i}"
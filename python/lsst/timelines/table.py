@@ -0,0 +1,771 @@
+import csv
+import gc
+import textwrap
+
+import numpy as np
+
+from .activities import Activity, Milestone, Functionality
+from .activities import AdvanceRow, Calendar, Color, MarkerWidth, LengthArrow
+from .activities import TimelineFormatError, _check_fields, _csvFields
+from .labels import get_label_wrapper, _axes_width, _labelPadding
+from .stats import _timer
+
+__all__ = ["ActivityTable", "StringTable", "read_activity_table"]
+
+
+class ActivityTable:
+    """A columnar, array-backed, equivalent of a list of lists of Activities
+
+    Every entry (including `Manipulation`s such as `Color` and `AdvanceRow`)
+    is a row in a set of numpy arrays:
+       kind:         index into `ActivityTable.kindNames`
+       group:        index of the inner list the entry came from
+       t0, t1:       start and end as datetime64 (NaT for Manipulations)
+       drow:         the entry's drow (or AdvanceRow's drow)
+       color, border, align, valign: codes into categories (-1 => None)
+       markerWidth, lengthArrow, dy: floats (NaN => None)
+       labels:       the Activity descriptions (None for Manipulations
+                     other than Calendars); an array of objects or a
+                     `StringTable`
+       line:         the line in the file the entry was read from (or 0)
+
+    Colours and alignments are interned in `categories`, so e.g. the colour
+    of entry i is categories[color[i]].  A `Color` entry stores its colour
+    and border in the color and border columns, `MarkerWidth` and
+    `LengthArrow` use markerWidth and lengthArrow, and a `Calendar` stores
+    its spec (weekmask and holidays) as its label.
+
+    Conversion to and from the list-of-lists structure is lossless; see
+    `from_activities` and `to_activities`.  `show_activities` accepts an
+    ActivityTable directly, in which case extent computation, clipping and
+    culling are done with array operations and the drawing is batched.
+
+    The table caches quantities derived from its columns, so treat the
+    columns as read-only once it's built.
+    """
+
+    kindNames = ("Activity", "Milestone", "Functionality",
+                 "AdvanceRow", "Color", "MarkerWidth", "LengthArrow", "Calendar")
+    ACTIVITY, MILESTONE, FUNCTIONALITY, ADVANCE_ROW, COLOR, MARKER_WIDTH, LENGTH_ARROW, CALENDAR = range(8)
+
+    columnTypes = dict(kind=np.int8, group=np.int32,
+                       t0="datetime64[us]", t1="datetime64[us]", drow=np.int32,
+                       color=np.int32, border=np.int32, align=np.int32, valign=np.int32,
+                       markerWidth=float, lengthArrow=float, dy=float,
+                       labels=object, line=np.int32)
+
+    def __init__(self, nGroup, categories, **columns):
+        """Build an ActivityTable from its columns; you probably want
+        `from_activities`
+
+        nGroup: number of inner lists (some of which may be empty)
+        categories: list of the interned strings used by color, border etc.
+        columns: one array per name in `columnTypes`
+        """
+        if set(columns) != set(self.columnTypes):
+            raise TypeError("Expected columns %s; saw %s" % (sorted(self.columnTypes), sorted(columns)))
+
+        self.nGroup = nGroup
+        self.categories = list(categories)
+        for name, dtype in self.columnTypes.items():
+            value = columns[name]
+            if not isinstance(value, StringTable):
+                value = np.asanyarray(value, dtype=dtype)  # keeping e.g. memmaps from load_activity_table
+            setattr(self, name, value)
+
+        n = len(self.kind)
+        for name in self.columnTypes:
+            if len(getattr(self, name)) != n:
+                raise ValueError(f"Column {name} has length {len(getattr(self, name))}, not {n}")
+
+        self._advance = None            # cumulative AdvanceRow offsets; see rows()
+        self._styles = {}               # cache for styles(), keyed by the defaults
+
+    def __len__(self):
+        return len(self.kind)
+
+    def __str__(self):
+        counts = np.bincount(self.kind, minlength=len(self.kindNames))
+        return "ActivityTable(%s)" % ", ".join(f"{n}: {c}" for n, c in zip(self.kindNames, counts) if c)
+
+    @property
+    def isItem(self):
+        """True for Activities, Milestones and Functionalities"""
+        return self.kind <= self.FUNCTIONALITY
+
+    @property
+    def nbytes(self):
+        """The memory used by the arrays (not counting the label strings)"""
+        return sum(getattr(self, name).nbytes for name in self.columnTypes)
+
+    def take(self, indices):
+        """Return a new ActivityTable containing only the specified entries
+
+        indices: array of indices, or a boolean mask
+        """
+        return ActivityTable(self.nGroup, self.categories,
+                             **{name: getattr(self, name)[indices] for name in self.columnTypes})
+
+    #
+    # Conversion to and from lists of lists of Activities
+    #
+    @classmethod
+    def from_activities(cls, activities):
+        """Build an ActivityTable from a list of lists of Activities
+        (as passed to `show_activities` or returned by `read_activities`)
+        """
+        kindCodes = {name: i for i, name in enumerate(cls.kindNames)}
+        categories = {}
+
+        def intern(s):
+            if not s:
+                return -1
+            return categories.setdefault(s, len(categories))
+
+        columns = {name: [] for name in cls.columnTypes}
+        nGroup = 0
+        for aa in activities:
+            for a in aa:
+                kind = kindCodes[str(a)]
+                t0 = t1 = None
+                label = None
+                drow = 0
+                color = border = align = valign = -1
+                markerWidth = lengthArrow = dy = np.nan
+
+                if kind <= cls.FUNCTIONALITY:
+                    label = a.descrip
+                    t0, t1 = a.t0, a.t0 + a.duration
+                    drow = a.drow
+                    color, border = intern(a._color), intern(a._border)
+                    markerWidth = _float(a._markerWidth)
+                    if kind != cls.ACTIVITY:
+                        align, valign = intern(a.align), intern(a.valign)
+                    if kind == cls.FUNCTIONALITY:
+                        lengthArrow, dy = _float(a._lengthArrow), _float(a.dy)
+                elif kind == cls.ADVANCE_ROW:
+                    drow = a.drow
+                elif kind == cls.COLOR:
+                    color, border = intern(a.color), intern(a.border)
+                elif kind == cls.MARKER_WIDTH:
+                    markerWidth = _float(a.markerWidth)
+                elif kind == cls.LENGTH_ARROW:
+                    lengthArrow = _float(a.lengthArrow)
+                elif kind == cls.CALENDAR:
+                    label = a.spec
+
+                for name, value in [("kind", kind), ("group", nGroup), ("t0", t0), ("t1", t1),
+                                    ("drow", drow), ("color", color), ("border", border),
+                                    ("align", align), ("valign", valign), ("markerWidth", markerWidth),
+                                    ("lengthArrow", lengthArrow), ("dy", dy), ("labels", label),
+                                    ("line", 0)]:
+                    columns[name].append(value)
+
+            nGroup += 1
+
+        labels = np.empty(len(columns["labels"]), dtype=object)  # don't let numpy split strings
+        labels[:] = columns.pop("labels")
+
+        return cls(nGroup, categories, labels=labels, **columns)
+
+    def to_activities(self):
+        """Return the equivalent list of lists of Activities"""
+        activities = [[] for i in range(self.nGroup)]
+
+        names = self._names()
+        t0s, t1s = self.t0.astype(object), self.t1.astype(object)
+
+        for i in range(len(self)):
+            kind = self.kind[i]
+            color, border = names[self.color[i]], names[self.border[i]]
+
+            if kind <= self.FUNCTIONALITY:
+                t0 = t0s[i].isoformat()
+                kwargs = dict(color=color, border=border, drow=int(self.drow[i]))
+                if kind == self.ACTIVITY:
+                    a = Activity(self.labels[i], t0, 0, markerWidth=_number(self.markerWidth[i]), **kwargs)
+                else:
+                    kwargs.update(align=names[self.align[i]], valign=names[self.valign[i]])
+                    if kind == self.MILESTONE:
+                        a = Milestone(self.labels[i], t0, markerWidth=_number(self.markerWidth[i]), **kwargs)
+                    else:
+                        a = Functionality(self.labels[i], t0, dy=_number(self.dy[i]),
+                                          lengthArrow=_number(self.lengthArrow[i]), **kwargs)
+
+                a.duration = t1s[i] - t0s[i]
+            elif kind == self.ADVANCE_ROW:
+                a = AdvanceRow(int(self.drow[i]))
+            elif kind == self.COLOR:
+                a = Color(color, border)
+            elif kind == self.MARKER_WIDTH:
+                a = MarkerWidth(_number(self.markerWidth[i]))
+            elif kind == self.LENGTH_ARROW:
+                a = LengthArrow(_number(self.lengthArrow[i]))
+            elif kind == self.CALENDAR:
+                a = Calendar(*self.labels[i].split(" ", 1))
+
+            activities[self.group[i]].append(a)
+
+        return activities
+
+    #
+    # Working-day calendars
+    #
+    def durations(self):
+        """Return the duration of each entry in working days of the `Calendar`
+        in effect for it (or in days, if there isn't one), as floats; NaN for
+        Manipulations
+        """
+        calendars, index = _calendars(self.kind, self.labels)
+        durations = np.full(len(self), np.nan)
+
+        isItem = self.isItem
+        durations[isItem] = (self.t1[isItem] - self.t0[isItem])/np.timedelta64(1, "D")
+        for c, calendar in enumerate(calendars):
+            sel = isItem & (index == c)
+            durations[sel] = calendar.durations(self.t0[sel], self.t1[sel])
+
+        return durations
+
+    def convert_calendar(self, calendar):
+        """Return a copy of the table that uses calendar throughout
+
+        Each Activity keeps its start and its number of working days (see
+        `durations`), and its end is recomputed in calendar; the Calendar
+        entries are replaced by calendar, and one is added at the start of
+        the first list if the table doesn't start with one.  The
+        conversion is done with array operations, one per distinct calendar
+        """
+        columns = {name: getattr(self, name) for name in self.columnTypes}
+        columns["labels"] = np.asarray(self.labels)
+
+        isActivity = self.kind == self.ACTIVITY
+        t1 = self.t1.copy()
+        t1[isActivity] = calendar.end_dates(self.t0[isActivity], self.durations()[isActivity])
+        columns["t1"] = t1
+
+        isCalendar = self.kind == self.CALENDAR
+        columns["labels"] = np.where(isCalendar, calendar.spec, columns["labels"])
+
+        firstItem = np.flatnonzero(self.isItem)[:1]
+        if not isCalendar.any() or (len(firstItem) and np.argmax(isCalendar) > firstItem[0]):
+            first = dict(kind=self.CALENDAR, group=0, t0=np.datetime64("NaT"), t1=np.datetime64("NaT"),
+                         drow=0, color=-1, border=-1, align=-1, valign=-1,
+                         markerWidth=np.nan, lengthArrow=np.nan, dy=np.nan, labels=calendar.spec, line=0)
+            for name, value in first.items():
+                column = np.empty(len(self) + 1, dtype=columns[name].dtype)
+                column[0] = value
+                column[1:] = columns[name]
+                columns[name] = column
+
+        return ActivityTable(max(self.nGroup, 1), self.categories, **columns)
+
+    #
+    # Vectorised equivalents of the loops in show_activities
+    #
+    def visible(self, startDate=None, endDate=None):
+        """Return a boolean array which is True for the Activities, Milestones
+        and Functionalities that overlap [startDate, endDate]
+        """
+        visible = self.isItem
+        if startDate is not None:
+            visible &= self.t1 >= np.datetime64(startDate, "us")
+        if endDate is not None:
+            visible &= self.t0 <= np.datetime64(endDate, "us")
+
+        return visible
+
+    def clipped(self, startDate=None, endDate=None):
+        """Return t0 and t1 clipped to [startDate, endDate]"""
+        t0, t1 = self.t0, self.t1
+        if startDate is not None:
+            t0 = np.maximum(t0, np.datetime64(startDate, "us"))
+        if endDate is not None:
+            t1 = np.minimum(t1, np.datetime64(endDate, "us"))
+
+        return t0, t1
+
+    def extent(self, startDate=None, endDate=None):
+        """Return the (start, end) of the visible part of the timeline, clipped
+        to [startDate, endDate], as datetime64s; (None, None) if nothing is
+        visible
+        """
+        visible = self.visible(startDate, endDate)
+        if not visible.any():
+            return None, None
+
+        t0, t1 = self.clipped(startDate, endDate)
+        return t0[visible].min(), t1[visible].max()
+
+    def rows(self, visible=None):
+        """Return the row that each entry is drawn on (before applying drow)
+
+        Each inner list of activities that has visible entries is drawn on
+        a new row, and `AdvanceRow` moves all subsequent entries down.
+
+        visible: boolean array specifying which entries are visible
+          (default: all Activities, Milestones and Functionalities)
+        """
+        if visible is None:
+            visible = self.isItem
+
+        return self._rows(np.flatnonzero(visible), np.arange(len(self)))
+
+    def _rows(self, sel, ind):
+        """Return the rows of entries ind, given that the entries sel are the
+        only visible ones
+
+        The cost is O(len(sel) + len(ind)) once the cumulative AdvanceRow
+        offsets have been computed
+        """
+        if self._advance is None:
+            self._advance = np.cumsum(np.where(self.kind == self.ADVANCE_ROW, self.drow, 0))
+
+        visibleGroups = np.unique(self.group[sel])
+        groupOffset = np.searchsorted(visibleGroups, self.group[ind])
+
+        return -self._advance[ind] - groupOffset
+
+    def styles(self, color=None, border=None, markerWidth=None, lengthArrow=None):
+        """Return the colour, border, markerWidth and lengthArrow used to draw
+        each entry, taking into account `Color`, `MarkerWidth` and
+        `LengthArrow` entries, and the entries' own values
+
+        The arguments are the defaults in effect before the first entry
+        (default: the values set in `Activity`, `Milestone` and
+        `Functionality`); colours are returned as arrays of objects (None
+        means "use the next colour in matplotlib's cycle")
+        """
+        color = Activity.color if color is None else color
+        border = Activity.border if border is None else border
+        markerWidth = Milestone.markerWidth if markerWidth is None else markerWidth
+        lengthArrow = Functionality.lengthArrow if lengthArrow is None else lengthArrow
+
+        key = (color, border, markerWidth, lengthArrow)
+        if key not in self._styles:
+            self._styles[key] = self._resolve_styles(*key)
+
+        return self._styles[key]
+
+    def _resolve_styles(self, color, border, markerWidth, lengthArrow):
+        names = self._names()
+        colors, borders = names[self.color], names[self.border]
+
+        isColor = self.kind == self.COLOR
+        defaultColor = _ffill(isColor, colors, color)
+        defaultBorder = _ffill(isColor, borders, border)
+        defaultMarkerWidth = _ffill(self.kind == self.MARKER_WIDTH, self.markerWidth, markerWidth)
+        defaultLengthArrow = _ffill(self.kind == self.LENGTH_ARROW, self.lengthArrow, lengthArrow)
+
+        return (np.where(colors == None, defaultColor, colors),  # noqa: E711; elementwise comparison
+                np.where(borders == None, defaultBorder, borders),  # noqa: E711
+                np.where(np.isnan(self.markerWidth), defaultMarkerWidth, self.markerWidth),
+                np.where(np.isnan(self.lengthArrow), defaultLengthArrow, self.lengthArrow))
+
+    def draw(self, batch, height=0.1, fontsize=7, startDate=None, endDate=None, index=None, ax=None,
+             stats=None, layout=None):
+        """Add the entries visible in [startDate, endDate] to an `ArtistBatch`
+
+        index: an `IntervalIndex` built on this table, used to find the
+          visible entries without scanning the whole table
+        ax: the Axes that the batch will be drawn into, used to choose where
+          to wrap the labels (default: the current Axes)
+        stats: a `RenderStats` to record the time spent wrapping labels in
+        layout: a `RowLayout` (from `pack_rows`) giving the row of each
+          entry; if None, the rows are set by the groups, `AdvanceRow`s,
+          and drows
+
+        Returns the number of entries drawn
+        """
+        if index is None:
+            sel = np.flatnonzero(self.visible(startDate, endDate))
+        else:
+            sel = index.overlapping(startDate, endDate)
+        if len(sel) == 0:
+            return 0
+
+        t0, t1 = self.t0[sel], self.t1[sel]
+        if startDate is not None:
+            t0 = np.maximum(t0, np.datetime64(startDate, "us"))
+        if endDate is not None:
+            t1 = np.minimum(t1, np.datetime64(endDate, "us"))
+        totalDuration = t1.max() - t0.min()  # used in line-wrapping the labels
+
+        colors, borders, markerWidths, lengthArrows = self.styles()
+
+        kind = self.kind[sel]
+        if layout is None:
+            y0 = height*(1.1*(self._rows(sel, sel) - self.drow[sel]))
+        else:
+            if len(layout) != len(self):
+                raise ValueError(f"The layout has {len(layout)} entries, but the table has {len(self)}")
+            y0 = height*(1.1*-layout.rows[sel])
+        arrowColors = colors[sel]
+        isBar = kind == self.ACTIVITY
+        colors, borders = batch.resolve_colors(colors[sel], borders[sel], isBar)  # in the entries' order
+        labels = self.labels[sel]
+        #
+        # Activities
+        #
+        batch.add_bars(t0[isBar], t1[isBar], y0[isBar], height, colors[isBar], borders[isBar])
+
+        with _timer(stats, "wrap"):
+            if fontsize:
+                if ax is None:
+                    import matplotlib.pyplot as plt
+                    ax = plt.gca()
+                width = _axes_width(ax)  # in points
+                if totalDuration:
+                    width = width*((t1[isBar] - t0[isBar])/totalDuration)
+                width = np.broadcast_to(width - _labelPadding, (isBar.sum(),))
+
+                wrap = get_label_wrapper().wrap
+                wrapped = [wrap(d, w, fontsize) for d, w in zip(labels[isBar], width.tolist())]
+            else:
+                wrapped = [textwrap.fill(d, width=10, break_long_words=False) for d in labels[isBar]]
+        batch.add_texts(t0[isBar] + (t1[isBar] - t0[isBar])//2, y0[isBar] + 0.5*height, wrapped,
+                        horizontalalignment='center', verticalalignment='center', fontsize=fontsize)
+        #
+        # Milestones and Functionalities
+        #
+        isMilestone = ~isBar
+        if isMilestone.any():
+            t0, y0, colors = t0[isMilestone], y0[isMilestone], colors[isMilestone]
+            markerWidth = markerWidths[sel][isMilestone]
+            batch.add_diamonds(t0, markerWidth, y0, height, colors)
+
+            names = self._names()
+            alignRight = names[self.align[sel][isMilestone]] == "right"
+            valignTop = names[self.valign[sel][isMilestone]] == "top"
+            labels = labels[isMilestone]
+
+            tLabel = t0 + (np.where(alignRight, 0.5, -0.5)*markerWidth*86400e6).astype("timedelta64[us]")
+            yLabel = y0 + np.where(valignTop, 0.9, 0.1)*height
+            for right in (True, False):
+                ok = alignRight == right
+                batch.add_texts(tLabel[ok], yLabel[ok], labels[ok],
+                                horizontalalignment="left" if right else "right",  # matplotlib is confusing
+                                verticalalignment='center', fontsize=fontsize, zorder=10)
+
+            isFunctionality = kind[isMilestone] == self.FUNCTIONALITY
+            if isFunctionality.any():
+                ind = sel[~isBar][isFunctionality]
+                batch.add_arrows(self.t0[ind], y0[isFunctionality] + (0.5 + self.dy[ind])*height,
+                                 lengthArrows[ind], 0.2*height, arrowColors[~isBar][isFunctionality])
+
+        return len(sel)
+
+    def _names(self):
+        """Return an array of categories, with None appended for code -1"""
+        names = np.empty(len(self.categories) + 1, dtype=object)
+        for i, c in enumerate(self.categories):  # c may be a tuple, so don't use a slice
+            names[i] = c
+        return names
+
+
+class StringTable:
+    """A read-only sequence of strings (or Nones) held as UTF-8 in a single
+    buffer, and decoded on demand
+
+    Used for the labels of an `ActivityTable` backed by a memory-mapped
+    file, so that opening the file doesn't require decoding every label.
+    Indexing with an integer returns a str; with a slice, boolean mask or
+    array of indices it returns an array of objects
+
+    data: uint8 array containing the concatenated UTF-8 strings
+    start: int64 array of the offset of each string in data
+    length: int32 array of the length of each string in bytes (-1 => None)
+    """
+
+    def __init__(self, data, start, length):
+        self.data = data
+        self.start = start
+        self.length = length
+
+    def __len__(self):
+        return len(self.start)
+
+    def __getitem__(self, i):
+        if isinstance(i, (int, np.integer)):
+            return self._decode(int(self.start[i]), int(self.length[i]))
+
+        ind = np.arange(len(self))[i]
+        values = np.empty(len(ind), dtype=object)
+        if len(ind) == 0:
+            return values
+        #
+        # Copy the bytes spanned by the strings once, rather than slicing
+        # data (which may be a memmap) for each string
+        #
+        start, length = self.start[ind], self.length[ind]
+        lo, hi = int(start.min()), int((start + np.maximum(length, 0)).max())
+        buf = self.data[lo:hi].tobytes()
+        values[:] = [None if n < 0 else buf[s:s + n].decode()
+                     for s, n in zip((start - lo).tolist(), length.tolist())]
+
+        return values
+
+    def __iter__(self):
+        for s, n in zip(self.start.tolist(), self.length.tolist()):
+            yield self._decode(s, n)
+
+    def __array__(self, dtype=None, copy=None):
+        return self[:]
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes + self.start.nbytes + self.length.nbytes
+
+    @classmethod
+    def from_strings(cls, strings):
+        """Build a StringTable from a sequence of strings (or Nones)"""
+        encoded = [b"" if s is None else s.encode() for s in strings]
+        length = np.array([-1 if s is None else len(e) for s, e in zip(strings, encoded)], dtype=np.int32)
+        start = np.zeros(len(encoded), dtype=np.int64)
+        np.cumsum(np.maximum(length[:-1], 0), out=start[1:])
+
+        return cls(np.frombuffer(b"".join(encoded), dtype=np.uint8), start, length)
+
+    def _decode(self, start, length):
+        if length < 0:
+            return None
+        return self.data[start:start + length].tobytes().decode()
+
+
+def _calendars(kind, labels):
+    """Return the distinct `Calendar`s in a table, and the index into them of
+    the Calendar in effect for each entry (-1 if none)
+    """
+    isCalendar = kind == ActivityTable.CALENDAR
+    if not isCalendar.any():
+        return [], np.full(len(kind), -1)
+
+    specs, code = np.unique(np.asarray(labels[isCalendar], dtype=str), return_inverse=True)
+    calendars = [Calendar(*spec.split(" ", 1)) for spec in specs]
+
+    codes = np.full(len(kind), -1)
+    codes[isCalendar] = code.ravel()
+    return calendars, _ffill(isCalendar, codes, -1)
+
+
+def _end_dates(fileName, lines, t0, durations, calendars, index):
+    """Return the ends of Activities read from fileName, given their
+    durations as strings; the durations are in working days of
+    calendars[index], or in days where index is -1
+    """
+    try:
+        values = durations.astype(float)
+    except ValueError:
+        values = None
+    if values is None or not np.isfinite(values).all():
+        for line, value in zip(lines, durations):
+            try:
+                ok = np.isfinite(float(value))
+            except ValueError:
+                ok = False
+            if not ok:
+                raise TimelineFormatError(fileName, line, f"Invalid duration {value!r}")
+    durations = values
+
+    t1 = t0 + np.round(durations*86400e6).astype("timedelta64[us]")
+    for c, calendar in enumerate(calendars):
+        sel = index == c
+        t1[sel] = calendar.end_dates(t0[sel], durations[sel])
+
+    return t1
+
+
+def _ffill(isSet, values, default):
+    """Return an array whose i-th element is values[j] for the largest j <= i
+    where isSet[j] is True, or default if there is no such j
+    """
+    ind = np.where(isSet, np.arange(len(isSet)), -1)
+    np.maximum.accumulate(ind, out=ind)
+
+    filled = np.empty(len(values), dtype=values.dtype)
+    filled[:] = values[np.maximum(ind, 0)] if len(values) else []
+    filled[ind < 0] = default
+
+    return filled
+
+
+def _float(value):
+    """Convert value to a float, with None (or "") becoming NaN"""
+    return np.nan if value is None or value == "" else float(value)
+
+
+def _number(value):
+    """Convert a float back to an int if it's integral, or None if it's NaN"""
+    if np.isnan(value):
+        return None
+    return int(value) if float(value).is_integer() else float(value)
+
+
+def _is_number(values):
+    """Return a boolean array that's True where the strings in values are
+    numbers (as parsed by float, and so by `read_activities`)
+
+    Dates have a "-" after their first character, which a number can only
+    have in its exponent, so only the strings that could be numbers are
+    parsed
+    """
+    isNumber = np.zeros(len(values), dtype=bool)
+    hasExponent = np.char.find(np.char.lower(values), "e") >= 0
+    maybe = np.flatnonzero((np.char.find(values, "-", 1) < 0) | hasExponent)
+    try:
+        values[maybe].astype(float)
+        isNumber[maybe] = True
+    except ValueError:
+        for i in maybe.tolist():
+            try:
+                float(values[i])
+                isNumber[i] = True
+            except ValueError:
+                pass
+
+    return isNumber
+
+
+def read_activity_table(fileName):
+    """Read a file written by `write_activities` straight into an
+    `ActivityTable`
+
+    No Activity objects are created, and the dates, numbers and categories
+    are converted in bulk, so this is much faster than `read_activities`
+    for large files.  Errors are reported as `TimelineFormatError`, giving
+    the line number
+    """
+    gcWasEnabled = gc.isenabled()
+    gc.disable()                        # the cyclic GC is expensive while building large lists of lists
+    try:
+        return _read_activity_table(fileName)
+    finally:
+        if gcWasEnabled:
+            gc.enable()
+
+
+def _read_activity_table(fileName):
+    with open(fileName) as fd:
+        csvin = csv.reader(fd)
+        entries = [(args, csvin.line_num) for args in csvin]
+
+    blank = np.array([len(args) == 0 for args, lineno in entries], dtype=bool)
+    nGroup = int(blank.sum()) + 1
+    group = np.cumsum(blank)[~blank]
+
+    entries = [e for e in entries if e[0]]
+    line = np.array([lineno for args, lineno in entries], dtype=np.int32)
+
+    nField = {what: len(names) for what, names in _csvFields.items()}
+    for args, lineno in entries:
+        if nField.get(args[0], -1) != len(args) - 1:
+            try:
+                _check_fields(args[0], args[1:])
+            except ValueError as e:
+                raise TimelineFormatError(fileName, lineno, str(e)) from None
+
+    n = len(entries)
+    kindCodes = {name: i for i, name in enumerate(ActivityTable.kindNames)}
+    kind = np.array([kindCodes[args[0]] for args, lineno in entries], dtype=np.int8)
+    #
+    # Scatter the fields of each kind of row into string-valued columns
+    #
+    defaults = dict(t0="NaT", t1="NaT", drow="0", color="", border="", align="", valign="",
+                    markerWidth="", lengthArrow="", dy="", labels=None)
+    columns = {}
+    for name, value in defaults.items():
+        columns[name] = np.empty(n, dtype=object)
+        columns[name][:] = value
+
+    for what, k in kindCodes.items():
+        pos = np.flatnonzero(kind == k)
+        if len(pos) == 0:
+            continue
+
+        fields = dict(zip(_csvFields[what], list(zip(*[entries[i][0] for i in pos]))[1:]))
+        if "descrip" in fields:
+            fields["labels"] = fields.pop("descrip")
+        if "t0" in fields:
+            fields["t1"] = fields.pop("duration", fields["t0"])
+        if what == "Calendar":          # stored as its spec in the labels column
+            specs, labels = {}, []
+            for i, spec in zip(pos, zip(fields.pop("weekmask"), fields.pop("holidays"))):
+                if spec not in specs:
+                    try:
+                        specs[spec] = Calendar(*spec).spec
+                    except ValueError as e:
+                        raise TimelineFormatError(fileName, line[i], f"Invalid Calendar: {e}") from None
+                labels.append(specs[spec])
+            fields["labels"] = labels
+
+        for name, values in fields.items():
+            columns[name][pos] = values
+    #
+    # Functionalities have no align or valign fields, but are Milestones
+    # with the default alignment
+    #
+    isFunctionality = kind == ActivityTable.FUNCTIONALITY
+    columns["align"][isFunctionality] = "right"
+    columns["valign"][isFunctionality] = "top"
+
+    isItem = kind <= ActivityTable.FUNCTIONALITY
+
+    def convert(name, dtype, required=None):
+        """Convert column name to dtype, reporting the line of the first bad
+        value;  required is a mask of entries that may not be empty (NaN/NaT)
+        """
+        values = columns[name]
+        if dtype == float:
+            values = np.where(values == "", "nan", values)
+        try:
+            values = values.astype(dtype)
+        except ValueError:
+            for i, v in enumerate(values):
+                try:
+                    np.array(v, dtype=dtype)
+                except ValueError:
+                    raise TimelineFormatError(fileName, line[i], f"Invalid {name} {v!r}") from None
+            raise
+
+        if required is not None:
+            bad = np.flatnonzero(required & (np.isnan(values) if dtype == float else np.isnat(values)))
+            if len(bad):
+                i = bad[0]
+                raise TimelineFormatError(fileName, line[i],
+                                          f"Missing or invalid {name} {columns[name][i]!r}")
+
+        return values
+
+    #
+    # An Activity's duration field is either its number of days (working
+    # days, if there's a Calendar) or, if it isn't a number, its end date
+    #
+    isActivity = np.flatnonzero(kind == ActivityTable.ACTIVITY)
+    isDuration = np.zeros(n, dtype=bool)
+    isDuration[isActivity] = _is_number(columns["t1"][isActivity].astype(str))
+    durations = columns["t1"][isDuration]
+    columns["t1"][isDuration] = "NaT"
+
+    t0 = convert("t0", "datetime64[us]", isItem)
+    t1 = convert("t1", "datetime64[us]", isItem & ~isDuration)
+    if isDuration.any():
+        calendars, index = _calendars(kind, columns["labels"])
+        t1[isDuration] = _end_dates(fileName, line[isDuration], t0[isDuration], durations,
+                                    calendars, index[isDuration])
+    drow = convert("drow", np.int32)
+    markerWidth = convert("markerWidth", float, kind == ActivityTable.MARKER_WIDTH)
+    lengthArrow = convert("lengthArrow", float, kind == ActivityTable.LENGTH_ARROW)
+    dy = convert("dy", float, kind == ActivityTable.FUNCTIONALITY)
+    #
+    # Intern the colours and alignments
+    #
+    categories = {"": -1}
+    codes = np.array([categories.setdefault(v, len(categories) - 1)
+                      for name in ["color", "border", "align", "valign"] for v in columns[name]],
+                     dtype=np.int32)
+    del categories[""]
+    color, border, align, valign = codes.reshape(4, n)
+
+    return ActivityTable(nGroup, categories, kind=kind, group=group, line=line,
+                         t0=t0, t1=t1, drow=drow, color=color, border=border, align=align, valign=valign,
+                         markerWidth=markerWidth, lengthArrow=lengthArrow, dy=dy, labels=columns["labels"])
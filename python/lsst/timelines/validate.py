@@ -0,0 +1,183 @@
+import numpy as np
+
+from .activities import _isoformat
+from .binary import load_activity_table, _MAGIC
+from .table import ActivityTable, read_activity_table
+
+__all__ = ["Finding", "validate"]
+
+
+class Finding:
+    """A problem with an entry of a timeline, found by `validate`
+
+    check: the name of the check that found it (see `validate`)
+    severity: "error" (the timeline won't be drawn as intended) or
+      "warning" (it probably won't)
+    index: the index of the entry in the `ActivityTable`
+    line: the line of the file that the entry was read from (0 if unknown)
+    label: the entry's label
+    message: a description of the problem
+    fileName: the file the timeline was read from, or None
+    """
+
+    def __init__(self, check, severity, index, line, label, message, fileName=None):
+        self.check = check
+        self.severity = severity
+        self.index = index
+        self.line = line
+        self.label = label
+        self.message = message
+        self.fileName = fileName
+
+    def __str__(self):
+        where = f"{self.fileName or '<timeline>'}:{self.line}" if self.line else \
+            f"{self.fileName or '<timeline>'}[{self.index}]"
+        return f"{where}: {self.severity}: {self.message} [{self.check}]"
+
+
+def validate(timeline, checks=None, layout=None):
+    """Check a timeline for entries that won't be drawn as intended
+
+    timeline: an `ActivityTable`, a list of lists of Activities, or the name
+      of a CSV file (as written by `write_activities`) or binary file (as
+      written by `save_activity_table`)
+    checks: the names of the checks to run (default: all of them):
+       negative-duration  Activities that end before they start (error)
+       overlap            Activities that overlap an earlier Activity drawn
+                          on the same row (warning)
+       duplicate-label    entries with the same kind and label as an earlier
+                          one, which can't be told apart in plots or matched
+                          by `read_snapshots` (warning)
+       unknown-color      colours (or border colours) that matplotlib
+                          doesn't recognise (error)
+    layout: a `RowLayout` giving each entry's row; if None, the rows are
+      set by the inner lists, `AdvanceRow`s, and drows, as in
+      `show_activities`
+
+    Each check is a vectorised sweep over the table (the overlaps are found
+    by sorting the Activities by row and start date), so the cost is
+    O(N log N) and a timeline of 10^5 entries takes a fraction of a second.
+
+    Returns a list of `Finding`s, in the order of the entries in the file
+    """
+    fileName = None
+    if isinstance(timeline, str):
+        fileName = timeline
+        with open(fileName, "rb") as fd:
+            isBinary = fd.read(len(_MAGIC)) == _MAGIC
+        table = load_activity_table(fileName) if isBinary else read_activity_table(fileName)
+    elif isinstance(timeline, ActivityTable):
+        table = timeline
+    else:
+        table = ActivityTable.from_activities(timeline)
+
+    if checks is None:
+        checks = list(_checks)
+    for check in checks:
+        if check not in _checks:
+            raise ValueError(f"Unknown check {check!r}; expected one of {', '.join(_checks)}")
+
+    found = []                          # (check, severity, index, message)
+    for check in checks:
+        severity, checker = _checks[check]
+        found += [(check, severity, int(i), message) for i, message in checker(table, layout)]
+
+    found.sort(key=lambda f: (int(table.line[f[2]]), f[2]))
+    return [Finding(check, severity, i, int(table.line[i]), table.labels[i], message, fileName)
+            for check, severity, i, message in found]
+
+
+def _where(table, i):
+    """Describe entry i of table, for a message"""
+    return f"{table.labels[i]!r} (line {table.line[i]})" if table.line[i] else \
+        f"{table.labels[i]!r} (entry {i})"
+
+
+def _check_negative_duration(table, layout):
+    """Activities that end before they start"""
+    bad = np.flatnonzero((table.kind == ActivityTable.ACTIVITY) & (table.t1 < table.t0))
+    return [(i, f"{table.labels[i]!r} ends ({_isoformat(table.t1[i].item())}) before it starts "
+             f"({_isoformat(table.t0[i].item())})") for i in bad.tolist()]
+
+
+def _check_overlap(table, layout):
+    """Activities that overlap an earlier Activity on the same row
+
+    The Activities are sorted by row and start, and the latest end so far in
+    each row is accumulated; an Activity overlaps if it starts before that
+    end (just touching is allowed).  The times are replaced by their ranks
+    so that an offset per row can make np.maximum.accumulate restart with
+    each row without overflowing
+    """
+    ind = np.flatnonzero((table.kind == ActivityTable.ACTIVITY) & (table.t1 > table.t0))
+    if len(ind) < 2:
+        return []
+
+    if layout is None:                  # as in ActivityTable.draw
+        row = table.rows()[ind] - table.drow[ind]
+    else:
+        row = -layout.rows[ind]
+
+    times, ranks = np.unique(np.r_[table.t0[ind], table.t1[ind]], return_inverse=True)
+    t0, t1 = ranks[:len(ind)].astype(np.int64), ranks[len(ind):].astype(np.int64)
+    rowRank = np.unique(row, return_inverse=True)[1].astype(np.int64)
+
+    order = np.lexsort((t0, rowRank))
+    ind, t0, t1, rowRank = ind[order], t0[order], t1[order], rowRank[order]
+
+    offset = rowRank*(len(times) + 1)
+    runningEnd = np.maximum.accumulate(t1 + offset) - offset
+    #
+    # The Activity that set each running end is the one where it last
+    # increased (or the row started)
+    #
+    newEnd = (runningEnd[1:] != runningEnd[:-1]) | (rowRank[1:] != rowRank[:-1])
+    increased = np.flatnonzero(np.r_[True, newEnd])
+    holder = increased[np.searchsorted(increased, np.arange(len(ind)), side="right") - 1]
+
+    overlaps = np.flatnonzero((rowRank[1:] == rowRank[:-1]) & (t0[1:] < runningEnd[:-1])) + 1
+    return [(ind[j], f"{table.labels[ind[j]]!r} overlaps {_where(table, ind[holder[j - 1]])} "
+             "on the same row") for j in overlaps.tolist()]
+
+
+def _check_duplicate_label(table, layout):
+    """Entries with the same kind and label as an earlier entry"""
+    ind = np.flatnonzero(table.isItem)
+    if len(ind) < 2:
+        return []
+    labels = table.labels[ind]
+
+    code = np.unique(labels.astype(str), return_inverse=True)[1]
+    order = np.lexsort((code, table.kind[ind]))     # stable, so the first of each run is the earliest
+    ind, code, kind = ind[order], code[order], table.kind[ind][order]
+
+    same = (code[1:] == code[:-1]) & (kind[1:] == kind[:-1])
+    first = np.maximum.accumulate(np.where(np.r_[True, ~same], np.arange(len(ind)), 0))
+    duplicates = np.flatnonzero(same) + 1
+    return [(ind[j], f"{ActivityTable.kindNames[kind[j]]} {table.labels[ind[j]]!r} has the same label as "
+             f"{_where(table, ind[first[j]])}") for j in duplicates.tolist()]
+
+
+def _check_unknown_color(table, layout):
+    """Colours and border colours that matplotlib doesn't recognise"""
+    from matplotlib.colors import is_color_like  # here as it imports matplotlib
+
+    bad = np.array([not is_color_like(c) for c in table.categories] + [False], dtype=bool)  # -1 is None
+    uses = (table.kind <= ActivityTable.FUNCTIONALITY) | (table.kind == ActivityTable.COLOR)
+
+    findings = []
+    for column in ("color", "border"):
+        for i in np.flatnonzero(uses & bad[getattr(table, column)]).tolist():
+            value = table.categories[getattr(table, column)[i]]
+            what = "Color" if table.kind[i] == ActivityTable.COLOR else repr(table.labels[i])
+            findings.append((i, f"{what} has an unknown {column} {value!r}"))
+
+    return findings
+
+
+_checks = {
+    "negative-duration": ("error", _check_negative_duration),
+    "overlap": ("warning", _check_overlap),
+    "duplicate-label": ("warning", _check_duplicate_label),
+    "unknown-color": ("error", _check_unknown_color),
+}
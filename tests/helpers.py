@@ -0,0 +1,88 @@
+"""Timelines and utilities shared by the tests"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from lsst.timelines import (Activity, Milestone, Functionality, AdvanceRow, Calendar, Color, LengthArrow,
+                            MarkerWidth, write_activities)
+
+dataDir = os.path.join(os.path.dirname(__file__), os.path.pardir, "data")
+planFile = os.path.join(dataDir, "plans-2021-03-20.csv")
+
+
+def makeActivities(start="2021-01-06"):
+    """A small plan, worked by hand (2021-01-04 is a Monday):
+
+        A  red   [01-04, 01-14)         in the first list
+        B  red   [01-06, 01-09)         starting at start
+        C  blue  [01-08T12, 01-10T12)   in the second list
+        M        01-05                  a Milestone, which takes no time
+        D  red   [01-14, 01-15)         in the third list, starting as A ends
+    """
+    return [
+        [Color("red"), Activity("A", "2021-01-04", 10), Activity("B", start, 3)],
+        [Activity("C", "2021-01-08T12:00:00", 2, color="blue"), Milestone("M", "2021-01-05")],
+        [Activity("D", "2021-01-14", 1)],
+    ]
+
+
+def makeEveryKind():
+    """A timeline with every kind of entry and Manipulation, using every
+    column: entries with explicit colours and borders mixed with ones drawn
+    in the next colour of the cycle, non-ASCII and empty labels, and an empty
+    list
+    """
+    return [
+        [
+            Activity("A", "2021-01-01", 10.5),
+            Milestone("", "2021-01-15", align="left", valign="bottom"),
+            Activity("Café ☕ — intégration", "2021-01-20", 5, color="red", border="black", drow=1),
+        ], [
+            Milestone("M2", "2021-02-01", color="green", markerWidth=3),
+            Activity("C", "2021-02-05", 20),
+            Functionality("Ünïcødé τηλεσκόπιο", "2021-02-10", dy=0.5, lengthArrow=7),
+            AdvanceRow(2),
+        ], [
+            Color("purple", border="black"),
+            MarkerWidth(4),
+            LengthArrow(9),
+            Calendar("1111000", ["2021-02-11"]),
+            Activity("D", "2021-03-01", "2021-03-20T12:34:56", drow=1),
+            Milestone("M3", "2021-03-25", markerWidth=4),
+            Functionality("F", "2021-03-26"),
+            Color((0.1, 0.2, 0.3)),
+            Activity("E", "2021-04-01", 3, border="orange"),
+            Color(None),
+            Milestone("M4", "2021-04-10"),
+        ],
+        [],
+    ]
+
+
+def flatten(activities):
+    """Return (list, type, data) for each entry of a list of lists"""
+    return [(i, str(a), a.getData()) for i, aa in enumerate(activities) for a in aa]
+
+
+class TimelineTestCase(unittest.TestCase):
+    """A TestCase with a temporary directory, self.tmpdir, which is removed
+    after each test
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+    def write(self, name, activities):
+        """Write a timeline (a list of lists of activities, or the text of a
+        CSV file) to name in self.tmpdir, returning the file's path
+        """
+        fileName = os.path.join(self.tmpdir, name)
+        if isinstance(activities, str):
+            with open(fileName, "w") as fd:
+                fd.write(activities)
+        else:
+            write_activities(activities, fileName)
+
+        return fileName
@@ -0,0 +1,87 @@
+import unittest
+
+import numpy as np
+
+from lsst.timelines import ActivityTable, load_profile, makeTimeline
+
+from helpers import makeActivities
+
+
+def bruteForce(table, edges):
+    """Return the counts, peak and busy days in each bin, for all the
+    Activities together, by looking at each bin in turn
+    """
+    isActivity = (table.kind == ActivityTable.ACTIVITY) & (table.t1 > table.t0)
+    t0, t1 = table.t0[isActivity], table.t1[isActivity]
+    day = np.timedelta64(1, "D")
+
+    counts, peak, busy = [], [], []
+    for e0, e1 in zip(edges[:-1], edges[1:]):
+        counts.append(np.sum((t0 < e1) & (t1 > e0)))
+        busy.append(np.sum(np.maximum((np.minimum(t1, e1) - np.maximum(t0, e0))/day, 0)))
+        times = np.r_[e0, t0[(t0 >= e0) & (t0 < e1)]]  # the number in progress only rises at these
+        peak.append(max(np.sum((t0 <= t) & (t1 > t)) for t in times))
+
+    return np.array(counts), np.array(peak), np.array(busy)
+
+
+class LoadProfileTestCase(unittest.TestCase):
+
+    def testByHand(self):
+        """The shared plan, worked by hand in weekly bins: A has 7 days in
+        the first week and 3 in the second, B and C are in the first, and D
+        is in the second
+        """
+        profile = load_profile(makeActivities(), binSize="week")
+        np.testing.assert_array_equal(profile.edges, np.array(["2021-01-04", "2021-01-11", "2021-01-18"],
+                                                              dtype="M8[us]"))
+        self.assertEqual(len(profile), 2)
+        self.assertEqual(profile.categories, [None])
+        np.testing.assert_array_equal(profile.counts, [[3, 2]])
+        np.testing.assert_array_equal(profile.peak, [[3, 1]])
+        np.testing.assert_allclose(profile.busy, [[12, 4]])
+        self.assertEqual(profile.total, {None: 16})
+
+        profile = load_profile(makeActivities(), binSize="week", by="color")
+        self.assertEqual(profile.categories, ["red", "blue"])
+        np.testing.assert_array_equal(profile.counts, [[2, 2], [1, 0]])
+        np.testing.assert_array_equal(profile.peak, [[2, 1], [1, 0]])
+        np.testing.assert_allclose(profile.busy, [[10, 4], [2, 0]])
+        self.assertEqual(profile.total, dict(red=14, blue=2))
+
+        profile = load_profile(makeActivities(), binSize="week", by="list")
+        self.assertEqual(profile.categories, [0, 1, 2])
+        np.testing.assert_array_equal(profile.counts, [[2, 1], [1, 0], [0, 1]])
+
+    def testDays(self):
+        """Daily bins, in a window that cuts A"""
+        profile = load_profile(makeActivities(), "2021-01-08", "2021-01-10")
+        self.assertEqual(len(profile), 3)
+        np.testing.assert_array_equal(profile.counts, [[3, 2, 2]])
+        np.testing.assert_array_equal(profile.peak, [[3, 2, 2]])
+        np.testing.assert_allclose(profile.busy, [[2.5, 2, 1.5]])
+
+    def testRandom(self):
+        table = ActivityTable.from_activities(makeTimeline(300, years=1))
+        for binSize in ["day", "week", "month", 2.5]:
+            profile = load_profile(table, binSize=binSize)
+            counts, peak, busy = bruteForce(table, profile.edges)
+            np.testing.assert_array_equal(profile.counts[0], counts, err_msg=str(binSize))
+            np.testing.assert_array_equal(profile.peak[0], peak, err_msg=str(binSize))
+            np.testing.assert_allclose(profile.busy[0], busy, atol=1e-9, err_msg=str(binSize))
+
+        byColor, total = load_profile(table, binSize="week", by="color"), load_profile(table, binSize="week")
+        np.testing.assert_array_equal(byColor.counts.sum(axis=0), total.counts[0])
+        np.testing.assert_allclose(byColor.busy.sum(axis=0), total.busy[0])
+
+    def testErrors(self):
+        with self.assertRaises(ValueError):
+            load_profile(makeActivities(), binSize="fortnight")
+        with self.assertRaises(ValueError):
+            load_profile(makeActivities(), binSize=0)
+        with self.assertRaises(ValueError):
+            load_profile(makeActivities(), by="label")
+
+
+if __name__ == "__main__":
+    unittest.main()
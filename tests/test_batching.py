@@ -0,0 +1,103 @@
+import unittest
+
+import numpy as np
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.collections as mcollections  # noqa: E402
+import matplotlib.colors as mcolors  # noqa: E402
+import matplotlib.patches as mpatches  # noqa: E402
+from matplotlib.figure import Figure  # noqa: E402
+
+from lsst.timelines import Activity, Milestone, ActivityTable, show_activities  # noqa: E402
+
+from helpers import makeEveryKind  # noqa: E402
+
+
+def draw(activities, **kwargs):
+    ax = Figure().add_subplot()
+    show_activities(activities, ax=ax, show_today=False, **kwargs)
+    return ax
+
+
+def perObjectGeometry(ax):
+    """Return the bars, bar outlines, diamonds and arrows drawn one artist
+    per entry, as lists of (vertices, rgba)
+    """
+    bars, diamonds, arrows = [], [], []
+    for patch in ax.patches:
+        if isinstance(patch, mpatches.FancyArrow):
+            arrows.append((patch.get_xy(), patch.get_facecolor()))
+        elif patch.get_alpha() == 0.5:
+            bars.append((patch.get_xy(), patch.get_facecolor()))
+        else:
+            diamonds.append((patch.get_xy(), patch.get_facecolor()))
+    lines = [(line.get_xydata(), mcolors.to_rgba(line.get_color())) for line in ax.lines]
+
+    return bars, lines, diamonds, arrows
+
+
+def batchedGeometry(ax):
+    """Return the same as perObjectGeometry, from an `ArtistBatch`'s
+    collections
+    """
+    polys = {0.5: [], 1: [], None: []}     # bars, diamonds, and arrows, by alpha
+    lines = []
+    for collection in ax.collections:
+        if isinstance(collection, mcollections.LineCollection):
+            paths, colors, found = collection.get_segments(), collection.get_color(), lines
+        else:
+            paths = [path.vertices for path in collection.get_paths()]
+            colors, found = collection.get_facecolor(), polys[collection.get_alpha()]
+        colors = np.broadcast_to(colors, (len(paths), 4))
+        found += [(xy, tuple(c)) for xy, c in zip(paths, colors)]
+
+    return polys[0.5], lines, polys[1], polys[None]
+
+
+class BatchingTestCase(unittest.TestCase):
+    """Compare the artists made by show_activities(batched=True) (and from
+    an ActivityTable) with those made one per entry
+    """
+
+    def assertSameGeometry(self, expected, found, what):
+        self.assertEqual(len(expected), len(found), what)
+        for i, ((xy0, c0), (xy1, c1)) in enumerate(zip(expected, found)):
+            n = min(len(xy0), len(xy1))     # a Polygon may add a closing vertex
+            np.testing.assert_allclose(xy0[:n], xy1[:n], atol=1e-9, err_msg=f"{what} {i}")
+            np.testing.assert_allclose(c0, c1, err_msg=f"{what} {i} colour")
+
+    def checkAgainstPerObject(self, **kwargs):
+        expected = perObjectGeometry(draw(makeEveryKind()))
+        found = batchedGeometry(draw(**kwargs))
+
+        for what, e, f in zip(["bar", "outline", "diamond", "arrow"], expected, found):
+            self.assertSameGeometry(e, f, what)
+
+    def testBatched(self):
+        self.checkAgainstPerObject(activities=makeEveryKind(), batched=True)
+
+    def testTable(self):
+        self.checkAgainstPerObject(activities=ActivityTable.from_activities(makeEveryKind()))
+
+    def testColorCycle(self):
+        """Entries with no colour take successive colours of the cycle in
+        the order that they're drawn, bars and diamonds alike
+        """
+        cycle = [mcolors.to_rgba(c) for c in matplotlib.rcParams["axes.prop_cycle"].by_key()["color"]]
+        activities = [[Milestone("M1", "2021-01-01"), Activity("A", "2021-01-05", 3),
+                       Milestone("M2", "2021-01-10"), Activity("B", "2021-01-15", 3)]]
+
+        table = ActivityTable.from_activities(activities)
+        for kwargs in [dict(activities=activities), dict(activities=activities, batched=True),
+                       dict(activities=table)]:
+            ax = draw(**kwargs)
+            bars, lines, diamonds, arrows = perObjectGeometry(ax) if not ax.collections else \
+                batchedGeometry(ax)
+            fills = [c[:3] for xy, c in diamonds[:1] + bars[:1] + diamonds[1:] + bars[1:]]
+            self.assertEqual(fills, [c[:3] for c in cycle[:4]], kwargs)
+            self.assertEqual([c for xy, c in lines], cycle[:2], kwargs)  # the outlines have their own cycle
+
+
+if __name__ == "__main__":
+    unittest.main()
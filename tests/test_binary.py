@@ -0,0 +1,84 @@
+import os
+import unittest
+
+import numpy as np
+
+from lsst.timelines import (ActivityTable, StringTable, read_activities, save_activity_table,
+                            load_activity_table)
+
+from helpers import TimelineTestCase, makeEveryKind, flatten, planFile
+
+
+class BinaryTestCase(TimelineTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.fileName = os.path.join(self.tmpdir, "timeline.bin")
+
+    def assertTablesEqual(self, table, loaded):
+        self.assertEqual(loaded.nGroup, table.nGroup)
+        self.assertEqual(loaded.categories, table.categories)
+        for name in ActivityTable.columnTypes:
+            if name == "labels":
+                self.assertEqual(list(loaded.labels), list(table.labels))
+            else:
+                np.testing.assert_array_equal(getattr(loaded, name), getattr(table, name), err_msg=name)
+                self.assertEqual(getattr(loaded, name).dtype, np.dtype(ActivityTable.columnTypes[name]), name)
+        np.testing.assert_array_equal(np.isnat(loaded.t0), np.isnat(table.t0))
+        np.testing.assert_array_equal(np.isnat(loaded.t1), np.isnat(table.t1))
+
+    def testRoundTrip(self):
+        """Every column, including NaT dates and non-ASCII, empty, and
+        missing labels, survives a round trip; the columns are memory mapped
+        unless mmap is False
+        """
+        activities = makeEveryKind()
+        table = ActivityTable.from_activities(activities)
+        self.assertIn("", list(table.labels))
+        self.assertIn(None, list(table.labels))
+        self.assertTrue(np.isnat(table.t0).any())
+
+        save_activity_table(table, self.fileName)
+        for mmap in [True, False]:
+            loaded = load_activity_table(self.fileName, mmap=mmap)
+            self.assertTablesEqual(table, loaded)
+            self.assertEqual(flatten(loaded.to_activities()), flatten(activities))
+
+            self.assertIsInstance(loaded.labels, StringTable)
+            for name in ActivityTable.columnTypes:
+                column = getattr(loaded, name)
+                columns = [column.data, column.start, column.length] if name == "labels" else [column]
+                for c in columns:
+                    self.assertEqual(isinstance(c, np.memmap), mmap, name)
+
+        self.assertEqual(list(loaded.labels[np.array([1, 2])]), list(table.labels[1:3]))
+
+    def testActivities(self):
+        """save_activity_table accepts lists of lists too, and the loaded
+        StringTable can be saved again
+        """
+        activities = read_activities(planFile)
+        save_activity_table(activities, self.fileName)
+        loaded = load_activity_table(self.fileName)
+        self.assertTablesEqual(ActivityTable.from_activities(activities), loaded)
+
+        fileName2 = os.path.join(self.tmpdir, "timeline2.bin")
+        save_activity_table(loaded, fileName2)
+        with open(self.fileName, "rb") as fd1, open(fileName2, "rb") as fd2:
+            self.assertEqual(fd1.read(), fd2.read())
+
+    def testEmpty(self):
+        save_activity_table([], self.fileName)
+        loaded = load_activity_table(self.fileName)
+        self.assertEqual(len(loaded), 0)
+        self.assertEqual(loaded.to_activities(), [])
+
+    def testNotBinary(self):
+        with open(self.fileName, "w") as fd:
+            fd.write("Activity,A,2021-01-01,10,,,,0\n")
+        with self.assertRaises(RuntimeError):
+            load_activity_table(self.fileName)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import unittest
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from lsst.timelines import Activity, Calendar, ActivityTable, read_activities, read_activity_table
+
+from helpers import TimelineTestCase
+
+holidays = ["2021-01-11", "2021-12-20/2022-01-02", "2022-01-06"]
+
+
+def workingDays(weekmask, holidays):
+    """Return a function telling whether a date is a working day, without
+    using numpy's business day functions
+    """
+    days = set()
+    for h in holidays:
+        first, _, last = h.partition("/")
+        first = date.fromisoformat(first)
+        for i in range((date.fromisoformat(last or h) - first).days + 1):
+            days.add(first + timedelta(i))
+
+    return lambda d: weekmask[d.weekday()] == "1" and d not in days
+
+
+def expectedEnd(isWorking, t0, n):
+    """The end of an Activity starting on date t0 that lasts n (> 0) working
+    days: midnight after its nth working day, found by counting days
+    """
+    d = t0
+    while True:
+        if isWorking(d):
+            n -= 1
+            if n == 0:
+                return datetime.combine(d, datetime.min.time()) + timedelta(1)
+        d += timedelta(1)
+
+
+class CalendarTestCase(TimelineTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.calendars = [Calendar(), Calendar("1111100", holidays),
+                          Calendar("Mon Tue Wed Thu", holidays[:1]), Calendar("1111111")]
+        self.weekmasks = ["1111100", "1111100", "1111000", "1111111"]
+        self.holidays = [[], holidays, holidays[:1], []]
+
+        rng = np.random.default_rng(1066)
+        self.t0 = np.datetime64("2020-12-01") + rng.integers(0, 60, 500).astype("timedelta64[D]")
+
+    def testEndDates(self):
+        """Whole numbers of working days across weekends and holidays,
+        compared with a count of the days and with np.busday_offset
+        """
+        n = np.arange(len(self.t0)) % 15 + 1
+        for calendar, weekmask, holidays in zip(self.calendars, self.weekmasks, self.holidays):
+            isWorking = workingDays(weekmask, holidays)
+            ends = calendar.end_dates(self.t0, n)
+            self.assertEqual(ends.dtype, np.dtype("datetime64[us]"))
+            self.assertEqual(ends.astype(datetime).tolist(),
+                             [expectedEnd(isWorking, t0, int(k)) for t0, k in zip(self.t0.astype(date), n)])
+
+            busdaycal = np.busdaycalendar(weekmask=weekmask, holidays=calendar.holidays)
+            last = np.busday_offset(self.t0, n - 1, roll="forward", busdaycal=busdaycal)
+            np.testing.assert_array_equal(ends, (last + 1).astype("datetime64[us]"))
+
+    def testByHand(self):
+        calendar = self.calendars[1]
+        end = calendar.end_dates(datetime(2021, 1, 8), 3)            # Fri, (weekend), (Mon), Tue, Wed
+        self.assertEqual(end, np.datetime64("2021-01-14"))
+        end = calendar.end_dates(datetime(2021, 1, 9), 0.5)          # Sat -> Tue noon
+        self.assertEqual(end, np.datetime64("2021-01-12T12:00"))
+        end = calendar.end_dates(np.datetime64("2021-12-17"), [1, 2, 2.25])  # over the shutdown
+        np.testing.assert_array_equal(end, np.array(["2021-12-18", "2022-01-04", "2022-01-04T06:00"],
+                                                    dtype="datetime64[us]"))
+        self.assertEqual(calendar.end_dates(np.datetime64("2021-01-08T10:00"), 0),
+                         np.datetime64("2021-01-08T10:00"))
+
+        self.assertEqual(Activity("A", "2021-01-08", 3, calendar=calendar).duration, timedelta(6))
+
+    def testDurations(self):
+        """durations inverts end_dates, for whole and fractional days"""
+        duration = np.round(np.linspace(0, 30, len(self.t0)), 2)
+        for calendar in self.calendars:
+            ends = calendar.end_dates(self.t0, duration)
+            np.testing.assert_allclose(calendar.durations(self.t0, ends), duration, atol=1e-9)
+
+        calendar = self.calendars[1]
+        self.assertEqual(calendar.durations(np.datetime64("2021-01-08"), np.datetime64("2021-01-13T18:00")),
+                         2.75)
+        self.assertEqual(calendar.durations(np.datetime64("2021-01-08"), np.datetime64("2021-01-10T18:00")),
+                         1)                                           # Sunday isn't worked
+
+    def testConvert(self):
+        """Converting to another calendar and back gives the original ends"""
+        duration = np.round(np.linspace(0.1, 30, len(self.t0)), 2)
+        for calendar in self.calendars:
+            t1 = calendar.end_dates(self.t0, duration)
+            for other in self.calendars:
+                converted = calendar.convert(self.t0, t1, other)
+                np.testing.assert_allclose(other.durations(self.t0, converted), duration, atol=1e-9)
+                np.testing.assert_array_equal(other.convert(self.t0, converted, calendar), t1)
+
+    def testSpec(self):
+        calendar = self.calendars[1]
+        self.assertEqual(calendar.spec,         # numpy drops the holidays that fall at weekends
+                         "1111100 2021-01-11 2021-12-20/2021-12-24 2021-12-27/2021-12-31 2022-01-06")
+        self.assertEqual(Calendar(*calendar.spec.split(" ", 1)), calendar)
+        self.assertEqual(Calendar(" ".join(["Mon", "Tue", "Wed", "Thu", "Fri"])), Calendar())
+        self.assertNotEqual(calendar, Calendar())
+
+    def testTable(self):
+        """A Calendar in a file applies to the Activities that follow it, and
+        convert_calendar round trips
+        """
+        fileName = self.write("plan.csv", "Activity,A,2021-01-08,3,,,,0\n"
+                                          "Calendar,1111100,2021-01-11\n"
+                                          "Activity,B,2021-01-08,3,,,,0\n")
+        activities = read_activities(fileName)
+        self.assertEqual([a.duration for aa in activities for a in aa if isinstance(a, Activity)],
+                         [timedelta(3), timedelta(6)])
+
+        table = read_activity_table(fileName)
+        np.testing.assert_array_equal(table.t1[table.kind == ActivityTable.ACTIVITY],
+                                      np.array(["2021-01-11", "2021-01-14"], dtype="datetime64[us]"))
+        np.testing.assert_allclose(table.durations()[table.isItem], [3, 3])
+
+        converted = table.convert_calendar(Calendar("1111111"))
+        isActivity = converted.kind == ActivityTable.ACTIVITY
+        np.testing.assert_array_equal(converted.t1[isActivity],
+                                      np.array(["2021-01-11", "2021-01-11"], dtype="datetime64[us]"))
+        back = converted.convert_calendar(self.calendars[1])
+        np.testing.assert_array_equal(back.t1[back.kind == ActivityTable.ACTIVITY],
+                                      np.array(["2021-01-14", "2021-01-14"], dtype="datetime64[us]"))
+
+
+if __name__ == "__main__":
+    unittest.main()
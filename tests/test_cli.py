@@ -0,0 +1,72 @@
+import contextlib
+import io
+import os
+import unittest
+
+import matplotlib
+matplotlib.use("Agg")
+
+from lsst.timelines.cli import main  # noqa: E402
+
+from helpers import TimelineTestCase, planFile  # noqa: E402
+
+
+class RenderTestCase(TimelineTestCase):
+    """Test timelines render"""
+
+    def setUp(self):
+        super().setUp()
+        self.outdir = os.path.join(self.tmpdir, "out")
+        self.cacheDir = os.path.join(self.tmpdir, "cache")
+
+    def render(self, *args):
+        """Run timelines render, returning its exit status and output"""
+        argv = ["render", planFile, "--outdir", self.outdir, "--cache-dir", self.cacheDir, "--no-today",
+                *args]
+        with contextlib.redirect_stdout(io.StringIO()) as stdout:
+            status = main(argv)
+        return status, stdout.getvalue()
+
+    def testCache(self):
+        """Rendering again copies the unchanged pages from the cache"""
+        status, output = self.render()
+        self.assertEqual(status, 0)
+        self.assertIn("Rendered 1 files; copied 0 unchanged files", output)
+        fileName = os.path.join(self.outdir, "plans-2021-03-20.png")
+        with open(fileName, "rb") as fd:
+            first = fd.read()
+
+        os.unlink(fileName)
+        status, output = self.render()
+        self.assertEqual(status, 0)
+        self.assertIn(f"{fileName}: cached", output)
+        self.assertIn("Rendered 0 files; copied 1 unchanged files", output)
+        with open(fileName, "rb") as fd:
+            self.assertEqual(fd.read(), first)
+
+        status, output = self.render("--fontsize", "8")     # a different option is a different render
+        self.assertIn("Rendered 1 files; copied 0 unchanged files", output)
+
+    def testPages(self):
+        """--period and --subsystem make a page for each period, and for
+        each subsystem; the cache is per page
+        """
+        args = ["--period", "quarter", "--start", "2021-02-01", "--end", "2021-06-30",
+                "--subsystem", "CCS=red", "--prefix", "plan", "--format", "png", "pdf"]
+        status, output = self.render(*args)
+        self.assertEqual(status, 0)
+        expected = [f"plan{s}-{d}.{fmt}" for s in ["", "-CCS"] for d in ["2021-01-01", "2021-04-01"]
+                    for fmt in ["png", "pdf"]]
+        self.assertEqual(sorted(os.listdir(self.outdir)), sorted(expected))
+
+        status, output = self.render(*args, "-j", "2")
+        self.assertIn("Rendered 0 files; copied 8 unchanged files", output)
+
+    def testArguments(self):
+        for args in [["--period", "month"], ["--subsystem", "CCS"], ["--prefix", "plan", planFile]]:
+            with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit, msg=args):
+                self.render(*args)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import unittest
+from datetime import datetime, timedelta
+
+from lsst.timelines import Activity, Milestone, Summary, TimelineNode, make_tree
+
+from helpers import makeActivities, flatten
+
+
+def date(s):
+    return datetime.fromisoformat(s)
+
+
+def makePlan():
+    """The shared plan, with a list holding just a Milestone (drawn in red),
+    and a function giving where each list belongs:
+
+        Camera/Cryostat   A, B
+        Camera/Optics     C, M
+        Telescope         D
+        Telescope/Mount   N  01-20
+    """
+    paths = {"A": ("Camera", "Cryostat"), "C": ("Camera", "Optics"), "D": ("Telescope",),
+             "N": ("Telescope", "Mount")}
+
+    return makeActivities() + [[Milestone("N", "2021-01-20")]], \
+        lambda aa: paths[next(a.descrip for a in aa if isinstance(a, Activity))]
+
+
+class TimelineNodeTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.activities, path = makePlan()
+        self.root = make_tree(self.activities, path)
+        self.nodes = {node.name: node for node in self.root.walk()}
+
+    def testTree(self):
+        self.assertEqual([(node.name, node.depth) for node in self.root.walk()],
+                         [("All", 0), ("Camera", 1), ("Cryostat", 2), ("A", 3), ("Optics", 2), ("C", 3),
+                          ("Telescope", 1), ("D", 2), ("Mount", 2), ("N", 3)])
+        self.assertEqual([leaf.name for leaf in self.root.leaves()], ["A", "C", "D", "N"])
+
+        summary = self.root.summary
+        self.assertEqual((summary.t0, summary.t1), (date("2021-01-04"), date("2021-01-20")))
+        self.assertEqual((summary.nActivity, summary.nMilestone, summary.nFunctionality), (4, 2, 0))
+        self.assertEqual(summary.work, timedelta(16))
+        self.assertEqual(self.nodes["Camera"].label(), "Camera (3 activities, 1 milestone)")
+        self.assertEqual(self.nodes["Mount"].label(), "Mount (1 milestone)")
+
+        empty = Summary.combine([TimelineNode("empty").summary, self.nodes["Optics"].summary])
+        self.assertEqual((empty.t0, empty.t1, empty.nEntry),
+                         (date("2021-01-05"), date("2021-01-10T12:00"), 2))
+
+    def testInvalidate(self):
+        """Changing a leaf and calling its invalidate clears the cached
+        summaries of the leaf and its ancestors, and no others
+        """
+        summaries = {name: node.summary for name, node in self.nodes.items()}
+
+        A = self.activities[0][1]
+        A.duration = timedelta(20)
+        self.nodes["A"].invalidate()
+
+        ancestors = {"A", "Cryostat", "Camera", "All"}
+        self.assertEqual({name for name, node in self.nodes.items() if node._summary is None}, ancestors)
+        for name, node in self.nodes.items():
+            if name not in ancestors:
+                self.assertIs(node._summary, summaries[name], name)
+
+        self.assertEqual(self.nodes["Camera"].summary.t1, date("2021-01-24"))
+        self.assertEqual(self.root.summary.t1, date("2021-01-24"))
+        self.assertEqual(self.root.summary.work, timedelta(26))
+        for name, node in self.nodes.items():     # only the ancestors were summarised again
+            self.assertEqual(node._summary is summaries[name], name not in ancestors, name)
+        #
+        # Adding or removing a node invalidates its new (or old) ancestors
+        #
+        self.nodes["Mount"].add(TimelineNode("M3", activities=[Milestone("M3", "2021-06-01")]))
+        self.assertEqual(self.root.summary.t1, date("2021-06-01"))
+        self.assertIs(self.nodes["Camera"]._summary, self.nodes["Camera"].summary)
+
+        self.nodes["Camera"].remove(self.nodes["Optics"])
+        self.assertEqual(self.nodes["Camera"].summary.nActivity, 2)
+        self.assertEqual(self.root.summary.nActivity, 3)
+
+    def testCut(self):
+        self.assertEqual([node.name for node in self.root.cut()], ["A", "C", "D", "N"])
+        self.assertEqual([node.name for node in self.root.cut(0)], ["All"])
+        self.assertEqual([node.name for node in self.root.cut(1)], ["Camera", "Telescope"])
+        self.assertEqual([node.name for node in self.root.cut(2)], ["Cryostat", "Optics", "D", "Mount"])
+        self.assertEqual([node.name for node in self.nodes["Camera"].cut(1)], ["Cryostat", "Optics"])
+
+        self.nodes["Cryostat"].collapsed = True
+        self.assertEqual([node.name for node in self.root.cut()], ["Cryostat", "C", "D", "N"])
+        self.assertEqual([node.name for node in self.root.cut(1)], ["Camera", "Telescope"])
+
+    def testToActivities(self):
+        """Leaves are drawn as they were, with the settings in effect before
+        them, and other nodes in the cut as summary bars
+        """
+        def bar(label, t0, t1):
+            return ("Activity", [label, t0, t1, None, None, None, 0])
+
+        self.assertEqual(flatten(self.root.to_activities()), flatten(self.activities))
+
+        self.assertEqual([a[1:] for a in flatten(self.root.to_activities(1))],
+                         [bar("Camera (3 activities, 1 milestone)", "2021-01-04", "2021-01-14"),
+                          bar("Telescope (1 activity, 1 milestone)", "2021-01-14", "2021-01-20")])
+        #
+        # D is still red without A before it, and Mount, which has no
+        # Activities, is a Milestone drawn in its own colour
+        #
+        self.nodes["Mount"].color = "green"
+        self.assertEqual([a[1:] for a in flatten(self.root.to_activities(2))], [
+            bar("Cryostat (2 activities)", "2021-01-04", "2021-01-14"),
+            bar("Optics (1 activity, 1 milestone)", "2021-01-05", "2021-01-10T12:00:00"),
+            ("Color", ["red", ""]),
+            bar("D", "2021-01-14", "2021-01-15"),
+            ("Color", ["green", ""]),
+            ("Milestone", ["Mount (1 milestone)", "2021-01-20", None, None, "right", "top", None, 0]),
+        ])
+
+        self.nodes["Optics"].add(TimelineNode("empty", activities=[]))
+        self.nodes["Optics"].remove(self.nodes["C"])
+        self.assertEqual([aa[-1].descrip for aa in self.root.to_activities(2)],
+                         ["Cryostat (2 activities)", "D", "Mount (1 milestone)"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+import lsst.timelines
+
+pythonDir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(lsst.timelines.__file__))))
+
+
+def runPython(script):
+    """Run script in a new python that imports this lsst.timelines, and
+    return what it printed, parsed as JSON
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([pythonDir, os.environ.get("PYTHONPATH", "")]))
+    out = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True,
+                         check=True).stdout
+    return json.loads(out)
+
+
+class ImportTestCase(unittest.TestCase):
+
+    def testNoMatplotlib(self):
+        """Importing the package doesn't load matplotlib"""
+        loaded = runPython("import json, sys\n"
+                           "import lsst.timelines\n"
+                           "print(json.dumps([m for m in sys.modules if m.startswith('matplotlib')]))")
+        self.assertEqual(loaded, [])
+
+    def testAll(self):
+        """__all__ lists the public names of every module, including those
+        that are imported when first used, and star-import finds them all
+        """
+        modules = [name[:-3] for name in os.listdir(os.path.dirname(lsst.timelines.__file__))
+                   if name.endswith(".py") and not name.startswith("_")
+                   and name not in ("cli.py", "planning.py")]  # the command line, and an example
+        for module in modules:
+            for name in __import__(f"lsst.timelines.{module}", fromlist=["__all__"]).__all__:
+                self.assertIn(name, lsst.timelines.__all__, f"{module}.{name}")
+
+        self.assertEqual(len(set(lsst.timelines.__all__)), len(lsst.timelines.__all__))
+        self.assertLessEqual(set(lsst.timelines.__all__), set(dir(lsst.timelines)))
+
+        names = runPython("import json\n"
+                          "from lsst.timelines import *\n"
+                          "print(json.dumps(sorted(n for n in dir() if not n.startswith('_'))))")
+        self.assertEqual(set(names) - {"json"}, set(lsst.timelines.__all__))
+        for name in ["ArtistBatch", "render_pages", "TimelineFigure", "LevelOfDetail", "write_svg",
+                     "InteractiveTimeline"]:
+            self.assertIn(name, names)
+
+
+if __name__ == "__main__":
+    unittest.main()
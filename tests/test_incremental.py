@@ -0,0 +1,139 @@
+import os
+import unittest
+import warnings
+from datetime import datetime
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.colors as mcolors  # noqa: E402
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: E402
+from matplotlib.figure import Figure  # noqa: E402
+
+from lsst.timelines import (Activity, Milestone, read_activities, write_activities,  # noqa: E402
+                            TimelineFigure, CachedReader, show_activities)
+
+from helpers import TimelineTestCase, makeActivities, makeEveryKind, flatten  # noqa: E402
+
+
+def makePlan(start="2021-01-06"):
+    """The shared plan, with its last list repeated"""
+    return makeActivities(start) + makeActivities(start)[-1:]
+
+
+class IncrementalTestCase(TimelineTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.fileName = self.write("plan.csv", makePlan())
+
+        fig = Figure()
+        FigureCanvasAgg(fig)
+        self.ax = fig.add_subplot()
+
+    def rewrite(self, activities):
+        """Rewrite the file, making sure that its mtime changes"""
+        st = os.stat(self.fileName)
+        write_activities(activities, self.fileName)
+        os.utime(self.fileName, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    def testCachedReader(self):
+        reader = CachedReader(self.fileName)
+        first = reader.read()
+        self.assertEqual(flatten(first), flatten(read_activities(self.fileName)))
+        self.assertEqual(reader.nParsed, 4)
+        self.assertFalse(reader.changed())
+
+        second = reader.read()
+        self.assertEqual(reader.nParsed, 0)
+        self.assertEqual(flatten(second), flatten(first))
+        #
+        # Each read returns its own Activities, even for identical blocks,
+        # so changing them doesn't change the cache
+        #
+        self.assertIsNot(second[1][0], first[1][0])
+        self.assertIsNot(second[3][0], second[2][0])
+        second[1][0].t0 = datetime(2022, 1, 1)
+        second[1][0].after.append((second[0][1], 0))
+        third = reader.read()
+        self.assertEqual(flatten(third), flatten(first))
+        self.assertEqual(third[1][0].after, [])
+
+        self.rewrite(makePlan(start="2021-01-07"))
+        self.assertTrue(reader.changed())
+        fourth = reader.read()
+        self.assertEqual(reader.nParsed, 1)
+        self.assertEqual(flatten(fourth), flatten(makePlan(start="2021-01-07")))
+
+    def testUpdate(self):
+        tf = TimelineFigure(makePlan(), ax=self.ax, show_today=False)
+        self.assertEqual(len(tf), 6)
+        artists = {ident: entry[1] for ident, entry in tf._entries.items()}
+
+        counts = tf.update(makePlan())
+        self.assertEqual(counts, dict(added=0, removed=0, updated=0, unchanged=6))
+
+        counts = tf.update(makePlan(start="2021-01-07"))
+        self.assertEqual(counts, dict(added=0, removed=0, updated=1, unchanged=5))
+        for ident, entry in tf._entries.items():    # all the artists were reused
+            self.assertEqual([id(a) for a in entry[1]], [id(a) for a in artists[ident]])
+
+        activities = makePlan(start="2021-01-07")
+        activities[0].append(Milestone("N", "2021-01-25"))
+        del activities[-1]
+        counts = tf.update(activities)
+        self.assertEqual(counts, dict(added=1, removed=1, updated=0, unchanged=5))
+
+    def colors(self, ax):
+        """Return the colours of the patches and lines drawn into ax"""
+        return ([mcolors.to_hex(p.get_facecolor()) for p in ax.patches],
+                [mcolors.to_hex(line.get_color()) for line in ax.lines])
+
+    def testColors(self):
+        """Entries with no colour cycle as they do in show_activities, even
+        after an update
+        """
+        fig = Figure()
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        show_activities(makeEveryKind(), ax=ax, show_today=False)
+
+        tf = TimelineFigure(makeEveryKind(), ax=self.ax, show_today=False)
+        self.assertEqual(self.colors(self.ax), self.colors(ax))
+
+        activities = makeEveryKind()
+        activities[0].insert(0, Activity("Z", "2020-12-20", 3))
+        counts = tf.update(activities)
+        self.assertGreater(counts["updated"], 0)        # the later entries' colours moved on
+
+        ax.clear()
+        show_activities(activities, ax=ax, show_today=False)
+        self.assertEqual([sorted(c) for c in self.colors(self.ax)],   # Z's artists were added last
+                         [sorted(c) for c in self.colors(ax)])
+
+    def testPoll(self):
+        tf = TimelineFigure(ax=self.ax, show_today=False)
+        tf.watch(self.fileName)
+        try:
+            self.assertEqual(len(tf), 6)
+            self.assertIsNone(tf.poll())        # unchanged
+
+            self.rewrite(makePlan(start="2021-01-07"))
+            self.assertEqual(tf.poll(), dict(added=0, removed=0, updated=1, unchanged=5))
+            self.assertIsNone(tf.poll())
+
+            st = os.stat(self.fileName)
+            with open(self.fileName, "a") as fd:
+                fd.write("Activity,E,2021-03-01,tomorrow,,,,0\n")
+            os.utime(self.fileName, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter("always")
+                self.assertIsNone(tf.poll())
+            self.assertEqual(len(caught), 1)
+            self.assertIn("plan.csv:", str(caught[0].message))
+            self.assertEqual(len(tf), 6)        # the figure is left as it was
+        finally:
+            tf.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+
+import numpy as np
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.collections as mcollections  # noqa: E402
+import matplotlib.dates as mdates  # noqa: E402
+from matplotlib.backend_bases import MouseEvent  # noqa: E402
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: E402
+from matplotlib.figure import Figure  # noqa: E402
+
+from lsst.timelines import ActivityTable, InteractiveTimeline, show_activities  # noqa: E402
+
+from helpers import makeActivities  # noqa: E402
+
+height = 0.1
+
+
+class InteractiveTimelineTestCase(unittest.TestCase):
+    """Move the pointer over a timeline drawn by show_activities, with
+    synthetic events, and check the entries that are found
+    """
+
+    def setUp(self):
+        self.table = ActivityTable.from_activities(makeActivities())
+        self.index = {label: i for i, label in enumerate(self.table.labels) if label is not None}
+
+    def draw(self, **kwargs):
+        fig = Figure()
+        FigureCanvasAgg(fig)
+        self.ax = fig.add_subplot()
+        show_activities(self.table, ax=self.ax, height=height, show_today=False, **kwargs)
+
+        limits = self.ax.get_xlim(), self.ax.get_ylim()
+        self.selections = []
+        self.it = InteractiveTimeline(self.table, self.ax, height=height, today="2021-01-10",
+                                      onSelect=self.selections.append, **kwargs)
+        self.ax.figure.canvas.draw()
+        self.assertEqual((self.ax.get_xlim(), self.ax.get_ylim()), limits)   # the animated artists don't move
+
+    def event(self, name, date, row, button=None):
+        """Send an event at date, in the middle of row (0 at the top)"""
+        xy = mdates.date2num(np.datetime64(date)), -1.1*height*row + 0.5*height
+        x, y = self.ax.transData.transform(xy)
+        MouseEvent(name, self.ax.figure.canvas, x, y, button=button)._process()
+
+    def hovered(self, date, row):
+        """Return the label of the entry under the pointer at date and row"""
+        self.event("motion_notify_event", date, row)
+        return None if self.it.hovered is None else self.table.labels[self.it.hovered]
+
+    def drawnBar(self, label):
+        """Return the vertices of the bar drawn for an Activity"""
+        bars = [c for c in self.ax.collections
+                if isinstance(c, mcollections.PolyCollection) and c.get_alpha() == 0.5][0]
+        isBar = self.table.kind == ActivityTable.ACTIVITY
+        drawn = [i for i in np.flatnonzero(self.table.isItem & isBar) if self.it._visible[i]]
+        return bars.get_paths()[drawn.index(self.index[label])].vertices[:4]
+
+    def testFullView(self):
+        self.draw()
+        self.assertEqual(self.hovered("2021-01-12", 0), "A")
+        self.assertEqual(self.hovered("2021-01-07T12:00", 0), "B")     # drawn over A
+        self.assertEqual(self.hovered("2021-01-09T12:00", 1), "C")
+        self.assertEqual(self.hovered("2021-01-05", 1), "M")
+        self.assertEqual(self.hovered("2021-01-14T12:00", 2), "D")
+        self.assertIsNone(self.hovered("2021-01-12", 1))
+        self.assertIsNone(self.hovered("2021-01-14T12:00", 3))
+
+        self.event("button_press_event", "2021-01-14T12:00", 2, button=1)
+        self.event("button_press_event", "2021-01-12", 0, button=1)
+        self.assertEqual(self.selections, [[self.index["D"]], [self.index["A"], self.index["D"]]])
+        self.event("button_press_event", "2021-01-12", 1, button=1)
+        self.assertEqual(self.it.selected, [])
+
+    def testWindow(self):
+        """Only the lists with entries in the window have rows, so D moves up
+        to the second row; entries outside the window can't be picked
+        """
+        self.draw(startDate="2021-01-11", endDate="2021-01-20")
+        self.assertEqual(self.hovered("2021-01-12", 0), "A")
+        self.assertEqual(self.hovered("2021-01-14T12:00", 1), "D")
+        self.assertIsNone(self.hovered("2021-01-14T12:00", 2))
+        self.assertIsNone(self.hovered("2021-01-10T11:00", 0))       # A is clipped to the window
+
+        self.event("button_press_event", "2021-01-14T12:00", 1, button=1)
+        self.assertEqual(self.it.selected, [self.index["D"]])
+        np.testing.assert_allclose(self.it._selection.get_paths()[0].vertices[:4], self.drawnBar("D"))
+        self.hovered("2021-01-12", 0)
+        np.testing.assert_allclose(self.it._outline.get_xy()[:4], self.drawnBar("A"))
+
+
+if __name__ == "__main__":
+    unittest.main()
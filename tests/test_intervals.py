@@ -0,0 +1,129 @@
+import unittest
+
+import numpy as np
+
+from lsst.timelines import ActivityTable, IntervalIndex
+
+
+def makeTable(t0, t1, kind):
+    """Return an ActivityTable with the given kinds and dates (in
+    microseconds; ignored for Manipulations), and defaults for the rest
+    """
+    n = len(kind)
+    isItem = kind <= ActivityTable.FUNCTIONALITY
+    nat = np.datetime64("NaT", "us")
+    return ActivityTable(1, [],
+                         kind=kind, group=np.zeros(n), drow=np.zeros(n),
+                         t0=np.where(isItem, t0.astype("datetime64[us]"), nat),
+                         t1=np.where(isItem, t1.astype("datetime64[us]"), nat),
+                         color=np.full(n, -1), border=np.full(n, -1), align=np.full(n, -1),
+                         valign=np.full(n, -1), markerWidth=np.full(n, np.nan),
+                         lengthArrow=np.full(n, np.nan), dy=np.full(n, np.nan),
+                         labels=np.full(n, None, dtype=object), line=np.zeros(n))
+
+
+def makeRandomTable(rng, n):
+    """Return a table of n entries, with durations of 0, on either side of
+    the index's duration class limits (powers of two microseconds), and
+    random lengths, and some Manipulations mixed in
+    """
+    t0 = rng.integers(0, 2**40, n)
+    k = rng.integers(0, 40, n)
+    duration = np.select([k < 5, k < 15, k < 25, k < 30],
+                         [0, 2**k, 2**k - 1, 2**k + 1], rng.integers(0, 2**36, n))
+    kind = rng.choice([ActivityTable.ACTIVITY, ActivityTable.MILESTONE, ActivityTable.FUNCTIONALITY,
+                       ActivityTable.COLOR, ActivityTable.ADVANCE_ROW], n, p=[0.6, 0.1, 0.1, 0.1, 0.1])
+    duration[kind == ActivityTable.MILESTONE] = 0
+
+    return makeTable(t0, t0 + duration, kind)
+
+
+class IntervalIndexTestCase(unittest.TestCase):
+    """Compare an IntervalIndex's queries with brute force masks over the
+    table
+    """
+
+    def setUp(self):
+        self.rng = np.random.default_rng(12345)
+
+    def windows(self, table, n):
+        """Return n random windows [a, b] (as datetime64 or None), many of
+        them starting or ending exactly at an entry's start or end
+        """
+        items = np.flatnonzero(table.isItem)
+        edges = np.concatenate([table.t0[items], table.t1[items]])
+        lo, hi = edges.min().astype(np.int64), edges.max().astype(np.int64)
+
+        def date():
+            r = self.rng.random()
+            if r < 0.1:
+                return None
+            if r < 0.6:
+                return self.rng.choice(edges) + np.timedelta64(int(self.rng.integers(-1, 2)), "us")
+            return np.datetime64(int(self.rng.integers(lo - 2**30, hi + 2**30)), "us")
+
+        windows = []
+        for i in range(n):
+            a, b = date(), date()
+            if a is not None and b is not None and a > b:
+                a, b = b, a
+            if self.rng.random() < 0.1 and a is not None:
+                b = a
+            windows.append((a, b))
+
+        return windows
+
+    def bruteForce(self, table, a, b):
+        mask = table.isItem.copy()
+        if a is not None:
+            mask &= table.t1 >= a
+        if b is not None:
+            mask &= table.t0 <= b
+        return mask
+
+    def checkIndex(self, table, nWindow=300):
+        index = IntervalIndex(table)
+        self.assertEqual(len(index), table.isItem.sum())
+
+        for a, b in self.windows(table, nWindow):
+            mask = self.bruteForce(table, a, b)
+            msg = f"[{a}, {b}]"
+            np.testing.assert_array_equal(index.overlapping(a, b), np.flatnonzero(mask), err_msg=msg)
+            self.assertEqual(index.count(a, b), mask.sum(), msg)
+            self.assertEqual(index.extent(a, b), table.extent(a, b), msg)
+            if a is not None:
+                np.testing.assert_array_equal(index.active(a), np.flatnonzero(self.bruteForce(table, a, a)),
+                                              err_msg=msg)
+
+    def testRandom(self):
+        for n in [1, 10, 1000]:
+            self.checkIndex(makeRandomTable(self.rng, n))
+
+    def testEdges(self):
+        """Windows that just touch an entry, and zero-length entries"""
+        us = np.array([0, 10, 10, 20, 2**20, 2**20 + 1, 2**21])
+        table = makeTable(us[:-1], us[1:], np.zeros(len(us) - 1, dtype=np.int8))
+        index = IntervalIndex(table)
+
+        self.assertEqual(list(index.overlapping(np.datetime64(10, "us"), np.datetime64(10, "us"))), [0, 1, 2])
+        self.assertEqual(list(index.active(np.datetime64(2**20, "us"))), [3, 4])
+        self.assertEqual(list(index.active(np.datetime64(2**20 + 1, "us"))), [4, 5])
+        self.assertEqual(index.count(np.datetime64(21, "us"), np.datetime64(2**20 - 1, "us")), 1)
+        self.assertEqual(index.extent(np.datetime64(-5, "us"), np.datetime64(5, "us")),
+                         (np.datetime64(0, "us"), np.datetime64(5, "us")))
+        self.assertEqual(index.extent(np.datetime64(2**21 + 1, "us")), (None, None))
+
+        self.checkIndex(table)
+
+    def testEmpty(self):
+        for table in [makeTable(np.zeros(0), np.zeros(0), np.zeros(0, dtype=np.int8)),
+                      makeTable(np.zeros(2), np.zeros(2), np.full(2, ActivityTable.COLOR, dtype=np.int8))]:
+            index = IntervalIndex(table)
+            self.assertEqual(len(index), 0)
+            self.assertEqual(len(index.overlapping()), 0)
+            self.assertEqual(index.count(), 0)
+            self.assertEqual(index.extent(), (None, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
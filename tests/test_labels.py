@@ -0,0 +1,106 @@
+import unittest
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.font_manager as font_manager  # noqa: E402
+from matplotlib.backends.backend_agg import RendererAgg  # noqa: E402
+
+from lsst.timelines import FontMetrics, LabelWrapper, get_font_metrics  # noqa: E402
+
+
+class FontMetricsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = get_font_metrics(10)
+
+    def testWidth(self):
+        """Widths agree with matplotlib's measurement of the rendered text
+        (which includes kerning, so they're not identical)
+        """
+        renderer = RendererAgg(100, 100, 72)       # at 72 dpi, a pixel is a point
+        prop = font_manager.FontProperties(size=10)
+        for text in ["Hello", "Commissioning Camera", "WWWW", "iiii", "Ünïcødé τηλεσκόπιο"]:
+            expected = renderer.get_text_width_height_descent(text, prop, ismath=False)[0]
+            self.assertAlmostEqual(self.metrics.width(text), expected, delta=1 + 0.03*expected, msg=text)
+
+        self.assertEqual(self.metrics.width(""), 0)
+        self.assertEqual(self.metrics.width("ab"),
+                         self.metrics.char_width("a") + self.metrics.char_width("b"))
+        self.assertGreater(self.metrics.width("WWWW"), self.metrics.width("iiii"))
+        self.assertAlmostEqual(get_font_metrics(20).width("Hello"), 2*self.metrics.width("Hello"), places=6)
+
+    def testShared(self):
+        self.assertIs(get_font_metrics(10.0), self.metrics)
+        self.assertIsNot(get_font_metrics(11), self.metrics)
+
+    def testWordWidths(self):
+        """Words' widths are remembered, up to a limit"""
+        metrics = FontMetrics(self.metrics.fileName, 10)
+        metrics._maxWords = 3
+        words = "the first of the words and the last".split()
+        self.assertEqual(metrics.word_widths(words), [self.metrics.width(w) for w in words])
+        self.assertEqual(sorted(metrics._words), ["first", "of", "the"])
+
+
+class LabelWrapperTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.wrapper = LabelWrapper(maxsize=3)
+        self.metrics = get_font_metrics(10)
+
+    def wrap(self, text, width):
+        return self.wrapper.wrap(text, width, 10)
+
+    def testWrap(self):
+        """Words are added to a line while it fits; a word that doesn't fit
+        on its own gets a line to itself, rather than being broken or
+        truncated
+        """
+        width = self.metrics.width("alpha beta")
+        self.assertEqual(self.wrap("alpha beta gamma", width + 0.6), "alpha beta\ngamma")
+        self.assertEqual(self.wrap("alpha beta gamma", width - 1), "alpha\nbeta\ngamma")
+        self.assertEqual(self.wrap("alpha   beta\ngamma", 1000), "alpha beta gamma")
+        self.assertEqual(self.wrap("a Supercalifragilistic b", 20), "a\nSupercalifragilistic\nb")
+        self.assertEqual(self.wrap("", 100), "")
+        self.assertEqual(self.wrap("  ", 100), "")
+
+        label = "Integration and test of the camera in the clean room"
+        for width in [20, 50, 80, 120, 200]:
+            lines = self.wrap(label, width).split("\n")
+            self.assertEqual(" ".join(lines), label)
+            for i, line in enumerate(lines):
+                if " " in line:
+                    self.assertLessEqual(self.metrics.width(line), width, line)
+                if i + 1 < len(lines):      # the next word didn't fit
+                    nextWord = lines[i + 1].split()[0]
+                    self.assertGreater(self.metrics.width(f"{line} {nextWord}"), width, line)
+
+    def testCache(self):
+        """The least recently used labels are dropped beyond maxsize, and
+        widths that round to the same point share an entry
+        """
+        self.assertEqual(self.wrap("A B", 50), self.wrap("A B", 49.7))
+        self.assertEqual((self.wrapper.hits, self.wrapper.misses), (1, 1))
+
+        self.wrap("C D", 50)
+        self.wrap("E F", 50)
+        self.wrap("A B", 50)                # now the most recently used
+        self.assertEqual((self.wrapper.hits, self.wrapper.misses, len(self.wrapper)), (2, 3, 3))
+
+        self.wrap("G H", 50)                # drops "C D"
+        self.assertEqual(len(self.wrapper), 3)
+        self.wrap("A B", 50)
+        self.assertEqual((self.wrapper.hits, self.wrapper.misses), (3, 4))
+        self.wrap("C D", 50)
+        self.assertEqual((self.wrapper.hits, self.wrapper.misses), (3, 5))
+
+        self.wrap("A B", 50)
+        self.wrapper.wrap("A B", 50, 12)    # a different fontsize is a different entry
+        self.assertEqual((self.wrapper.hits, self.wrapper.misses), (4, 6))
+
+        self.wrapper.clear()
+        self.assertEqual((len(self.wrapper), self.wrapper.hits, self.wrapper.misses), (0, 0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
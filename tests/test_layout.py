@@ -0,0 +1,101 @@
+import unittest
+
+import numpy as np
+
+from lsst.timelines import (Activity, Milestone, Functionality, Color, MarkerWidth, LengthArrow,
+                            ActivityTable, makeTimeline, pack_rows)
+
+day = 86400e6                           # microseconds
+
+
+def extents(table):
+    """Return the [start, end] (in microseconds) occupied by each entry,
+    computed independently of pack_rows: Activities from t0 to t1,
+    Milestones the width of their diamond, and Functionalities their
+    diamond and arrow
+    """
+    colors, borders, markerWidths, lengthArrows = table.styles()
+    start = table.t0.astype(np.int64).astype(float)
+    end = table.t1.astype(np.int64).astype(float)
+    for i in np.flatnonzero(table.kind != ActivityTable.ACTIVITY):
+        t0 = start[i]
+        start[i] = t0 - markerWidths[i]*day
+        end[i] = t0 + markerWidths[i]*day
+        if table.kind[i] == ActivityTable.FUNCTIONALITY:
+            end[i] = max(end[i], t0 + lengthArrows[i]*day)
+
+    return start, end
+
+
+def maxOverlap(start, end):
+    """Return the largest number of the intervals in use at once, where
+    an interval that ends as another starts doesn't overlap it
+    """
+    return max([np.sum((start <= s) & ((end > s) | (np.arange(len(start)) == i)))
+                for i, s in enumerate(start)], default=0)
+
+
+class PackRowsTestCase(unittest.TestCase):
+
+    def checkLayout(self, table, layout, groups):
+        """Check that no entries on a row overlap, each group is on its
+        own rows, and each uses as few rows as possible
+        """
+        start, end = extents(table)
+        rows = layout.rows
+        self.assertTrue(np.all((rows >= 0) == table.isItem))
+        self.assertEqual(layout.nRow, len(np.unique(rows[table.isItem])))
+
+        for row in np.unique(rows[table.isItem]):
+            ind = np.flatnonzero(rows == row)
+            ind = ind[np.argsort(start[ind], kind="stable")]
+            self.assertTrue(np.all(start[ind[1:]] >= end[ind[:-1]]), f"row {row}")
+
+        for g, group in enumerate(groups):
+            ind = np.flatnonzero(table.isItem & group)
+            self.assertTrue(np.all(rows[ind] >= layout.groupRows[g]))
+            self.assertTrue(np.all(rows[ind] < layout.groupRows[g + 1]))
+            self.assertEqual(layout.groupRows[g + 1] - layout.groupRows[g], maxOverlap(start[ind], end[ind]),
+                             f"group {g}")
+
+    def testRandom(self):
+        table = ActivityTable.from_activities(makeTimeline(300, years=1))
+        colors = table.styles()[0]
+
+        self.checkLayout(table, pack_rows(table), [np.ones(len(table), dtype=bool)])
+        self.checkLayout(table, pack_rows(table, groupBy="list"),
+                         [table.group == g for g in np.unique(table.group[table.isItem])])
+        firstColors = list(dict.fromkeys(colors[table.isItem]))
+        self.checkLayout(table, pack_rows(table, groupBy="color"), [colors == c for c in firstColors])
+
+    def testMarkers(self):
+        """Milestones and Functionalities occupy their diamonds (and arrows)"""
+        def nRow(*entries):
+            return pack_rows([list(entries)]).nRow
+
+        activity = Activity("A", "2021-01-01", "2021-01-10")
+        self.assertEqual(nRow(activity, Activity("B", "2021-01-10", 5)), 1)      # they just touch
+        self.assertEqual(nRow(activity, Activity("B", "2021-01-10", 5), MarkerWidth(0.5)), 1)
+        self.assertEqual(nRow(activity, Milestone("M", "2021-01-11")), 2)        # the diamond is 2 days wide
+        self.assertEqual(nRow(MarkerWidth(0.5), activity, Milestone("M", "2021-01-11")), 1)
+        self.assertEqual(nRow(activity, Milestone("M", "2021-01-11", markerWidth=0.5)), 1)
+
+        self.assertEqual(nRow(Functionality("F", "2021-01-01", lengthArrow=5),
+                              Activity("B", "2021-01-04", 5)), 2)                 # the arrow
+        self.assertEqual(nRow(LengthArrow(2), Functionality("F", "2021-01-01"),
+                              Activity("B", "2021-01-04", 5)), 1)
+        self.assertEqual(nRow(activity, LengthArrow(0), Functionality("F", "2021-01-11")), 2)  # the diamond
+        self.assertEqual(nRow(activity, MarkerWidth(0.5), LengthArrow(0),
+                              Functionality("F", "2021-01-11")), 1)
+
+    def testGap(self):
+        entries = [[Color("red"), Activity("A", "2021-01-01", 10), Activity("B", "2021-01-12", 5)]]
+        self.assertEqual(pack_rows(entries).nRow, 1)
+        self.assertEqual(pack_rows(entries, gap=2).nRow, 2)
+
+        with self.assertRaises(ValueError):
+            pack_rows(entries, groupBy="row")
+
+
+if __name__ == "__main__":
+    unittest.main()
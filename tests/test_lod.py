@@ -0,0 +1,113 @@
+import unittest
+
+import numpy as np
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.collections as mcollections  # noqa: E402
+import matplotlib.dates as mdates  # noqa: E402
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: E402
+from matplotlib.figure import Figure  # noqa: E402
+
+from lsst.timelines import (ActivityTable, LevelOfDetail, RenderStats, makeTimeline,  # noqa: E402
+                            show_activities)
+
+
+class LevelOfDetailTestCase(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.table = ActivityTable.from_activities(makeTimeline(3000, years=2))
+        cls.nItem = int(cls.table.isItem.sum())
+
+    def setUp(self):
+        self.lod = LevelOfDetail(self.table, maxItems=200)
+        fig = Figure(figsize=(8, 6))
+        FigureCanvasAgg(fig)
+        self.ax = fig.add_subplot()
+        #
+        # A window holding fewer than maxItems entries
+        #
+        self.window = np.datetime64("2021-06-01", "us"), np.datetime64("2021-06-20", "us")
+        self.inWindow = self.lod.index.overlapping(*self.window)
+
+    def zoom(self, startDate, endDate):
+        self.ax.set_xlim(mdates.date2num(startDate), mdates.date2num(endDate))
+
+    def drawn(self):
+        """Return the number of bars and diamonds, and of coverage spans,
+        drawn into the Axes
+        """
+        nItem = nSpan = 0
+        for collection in self.ax.collections:
+            if isinstance(collection, mcollections.PolyCollection):
+                if len(collection.get_edgecolor()) == 0:    # spans have no edges
+                    nSpan += len(collection.get_paths())
+                elif collection.get_alpha() in (0.5, 1):    # bars and diamonds; arrows have no alpha
+                    nItem += len(collection.get_paths())
+
+        return nItem, nSpan
+
+    def testLevels(self):
+        """Each level has at most half as many spans as the one before, and
+        every entry lies within a span of its row at every level
+        """
+        row, x0, x1 = self.lod._row, self.lod._x0, self.lod._x1
+        nSpan = len(row) + 1
+        for level, resolution in enumerate(self.lod.resolutions):
+            spanRow, spanX0, spanX1, coverage, color = self.lod.spans(level)
+            self.assertLessEqual(len(spanRow), nSpan//2 if level else nSpan)
+            nSpan = len(spanRow)
+
+            self.assertTrue(((coverage >= 0) & (coverage <= 1)).all())
+            self.assertTrue((spanX1 >= spanX0).all())
+            for r in np.unique(row):
+                i = np.flatnonzero(spanRow == r)
+                j = np.searchsorted(spanX0[i], x0[row == r], side="right") - 1
+                self.assertTrue((j >= 0).all())
+                self.assertTrue((x1[row == r] <= spanX1[i][j]).all(), f"level {level} row {r}")
+
+        resolutions = self.lod.resolutions
+        self.assertEqual(self.lod.level(0.5*resolutions[0]), 0)
+        self.assertEqual(self.lod.level(2*resolutions[-1]), len(resolutions) - 1)
+        for level, resolution in enumerate(resolutions):
+            self.assertEqual(self.lod.level(resolution), level)
+
+    def testZoom(self):
+        """Zoomed out, the coverage spans are drawn; zoomed in, each entry
+        in the window is; and changing the x-limits switches between them
+        """
+        stats = show_activities(self.table, ax=self.ax, lod=self.lod, stats=RenderStats(), show_today=False)
+        nItem, nSpan = self.drawn()
+        self.assertEqual(nItem, 0)
+        self.assertEqual(stats.nDrawn, nSpan)
+        self.assertLess(nSpan, self.nItem)
+        self.assertEqual(stats.nDrawn + stats.nCulled, self.nItem)
+        xlim = self.ax.get_xlim()
+
+        self.zoom(*self.window)
+        self.assertEqual(self.drawn(), (len(self.inWindow), 0))
+
+        self.ax.set_xlim(xlim)
+        self.assertEqual(self.drawn(), (0, nSpan))
+
+        self.assertEqual(self.lod.draw(self.ax, startDate=self.window[0], endDate=self.window[1]),
+                         len(self.inWindow))
+        self.assertEqual(self.lod.draw(self.ax), nSpan)
+
+    def testDetach(self):
+        self.lod.detach(self.ax)            # before attach, does nothing
+
+        show_activities(self.table, ax=self.ax, lod=self.lod, show_today=False)
+        nSpan = self.drawn()[1]
+        self.lod.detach(self.ax)
+        self.zoom(*self.window)
+        self.assertEqual(self.drawn(), (0, nSpan))
+        self.lod.detach(self.ax)
+
+        self.lod.attach(self.ax)
+        self.assertEqual(self.drawn(), (len(self.inWindow), 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
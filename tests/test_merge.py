@@ -0,0 +1,92 @@
+import contextlib
+import io
+import os
+import unittest
+
+from lsst.timelines import (Activity, Milestone, Color, MarkerWidth, ActivityTable, merge_activities,
+                            read_activities)
+from lsst.timelines.cli import main
+
+from helpers import TimelineTestCase, flatten
+
+
+class MergeTestCase(TimelineTestCase):
+
+    def setUp(self):
+        super().setUp()
+
+        self.team1 = self.write("team1.csv", [
+            [Color("red"), Activity("A1", "2021-01-01", 10)],
+            [Milestone("M1", "2021-03-01")],
+        ])
+        self.team2 = self.write("team2.csv", [
+            [Color("blue"), MarkerWidth(5), Milestone("M2", "2021-02-01")],
+            [Activity("A2", "2021-04-01", 10, color="green")],
+        ])
+
+    def styles(self, activities):
+        """Return {label: (colour, markerWidth)} as drawn"""
+        table = ActivityTable.from_activities(activities)
+        colors, borders, markerWidths, lengthArrows = table.styles()
+        return {table.labels[i]: (colors[i], markerWidths[i]) for i in range(len(table)) if table.isItem[i]}
+
+    def testByDate(self):
+        merged = list(merge_activities([self.team1, self.team2]))
+        self.assertEqual([aa[-1].descrip for aa in merged], ["A1", "M2", "M1", "A2"])
+        #
+        # Each entry is drawn as it was in its own file
+        #
+        expected = dict(self.styles(read_activities(self.team1)), **self.styles(read_activities(self.team2)))
+        self.assertEqual(self.styles(merged), expected)
+
+    def testByGroup(self):
+        merged = list(merge_activities([self.team2, self.team1], by="group"))
+        self.assertEqual([aa[-1].descrip for aa in merged], ["M2", "A1", "A2", "M1"])
+
+    def testFilters(self):
+        merged = list(merge_activities([self.team1, self.team2], kinds=["Milestone"]))
+        self.assertEqual([a.descrip for aa in merged for a in aa if hasattr(a, "descrip")], ["M2", "M1"])
+        self.assertEqual(self.styles(merged), dict(M2=("blue", 5), M1=("red", 2)))
+
+        merged = list(merge_activities([self.team1, self.team2], startDate="2021-02-15", colors=["red"]))
+        self.assertEqual([a.descrip for aa in merged for a in aa if hasattr(a, "descrip")], ["M1"])
+
+        merged = list(merge_activities([self.team1, self.team2], label="^A"))
+        self.assertEqual([a.descrip for aa in merged for a in aa if hasattr(a, "descrip")], ["A1", "A2"])
+
+        with self.assertRaises(ValueError):
+            list(merge_activities([self.team1], kinds=["Task"]))
+        with self.assertRaises(ValueError):
+            list(merge_activities([self.team1], by="colour"))
+
+    def testCommand(self):
+        output = os.path.join(self.tmpdir, "merged.csv")
+        self.assertEqual(main(["merge", self.team1, self.team2, "-o", output]), 0)
+        self.assertEqual(flatten(read_activities(output)),
+                         flatten(merge_activities([self.team1, self.team2])))
+
+    def testCommandFailure(self):
+        """A bad line part way through an input leaves the output as it was,
+        and no temporary files
+        """
+        bad = os.path.join(self.tmpdir, "bad.csv")
+        with open(self.team2) as fd:
+            text = fd.read()
+        with open(bad, "w") as fd:
+            fd.write(text + "Activity,A3,2021-05-01,later,,,,0\n\n")
+
+        output = os.path.join(self.tmpdir, "merged.csv")
+        with open(output, "w") as fd:
+            fd.write("old\n")
+
+        with contextlib.redirect_stderr(io.StringIO()) as stderr:
+            self.assertEqual(main(["merge", self.team1, bad, "-o", output]), 1)
+        self.assertIn(f"{bad}:", stderr.getvalue())
+
+        with open(output) as fd:
+            self.assertEqual(fd.read(), "old\n")
+        self.assertEqual(sorted(os.listdir(self.tmpdir)), ["bad.csv", "merged.csv", "team1.csv", "team2.csv"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+from datetime import datetime
+import os
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.collections as mcollections  # noqa: E402
+import matplotlib.dates as mdates  # noqa: E402
+from matplotlib.figure import Figure  # noqa: E402
+
+from lsst.timelines import (Activity, ActivityTable, Milestone, Page, periodic_pages,  # noqa: E402
+                            render_pages, save_activity_table)
+
+from helpers import TimelineTestCase  # noqa: E402
+
+savefig = Figure.savefig                # as the tests replace it
+
+
+def makePlan():
+    """A plan with an Activity spanning the end of January, and entries on
+    the last day of January and the first of February
+    """
+    return [
+        [Activity("A", "2021-01-04", 10, color="red"), Activity("X", "2021-01-25", 14, color="red")],
+        [Milestone("M", "2021-01-31T12:00:00"), Activity("F", "2021-02-01T06:00:00", 2)],
+        [Activity("Q", "2021-04-06", 5, color="blue")],
+    ]
+
+
+class PeriodicPagesTestCase(unittest.TestCase):
+
+    def assertWindows(self, pages, starts):
+        """Check that pages' windows start at starts, and each ends as the
+        next begins
+        """
+        starts = [datetime.fromisoformat(s) for s in starts]
+        self.assertEqual([p.startDate for p in pages], starts[:-1])
+        self.assertEqual([p.endDate for p in pages], starts[1:])
+
+    def testBoundaries(self):
+        pages = periodic_pages("2021-01-15", "2021-03-02")
+        self.assertWindows(pages, ["2021-01-01", "2021-02-01", "2021-03-01", "2021-04-01"])
+        self.assertEqual([p.fileName for p in pages],
+                         ["timeline-2021-01-01.png", "timeline-2021-02-01.png", "timeline-2021-03-01.png"])
+
+        pages = periodic_pages("2020-11-15", datetime(2021, 2, 1), "quarter")
+        self.assertWindows(pages, ["2020-10-01", "2021-01-01", "2021-04-01"])
+
+        pages = periodic_pages("2021-12-31", "2022-01-01", "year")
+        self.assertWindows(pages, ["2021-01-01", "2022-01-01", "2023-01-01"])
+
+        pages = periodic_pages("2021-03-01", "2021-03-01")
+        self.assertWindows(pages, ["2021-03-01", "2021-04-01"])
+
+    def testArguments(self):
+        pages = periodic_pages("2021-01-01", "2021-02-01", fileNameFormat="{i}_{start:%m%d}-{end:%m%d}.pdf",
+                               colors=["red"], title="Plan")
+        self.assertEqual([p.fileName for p in pages], ["0_0101-0131.pdf", "1_0201-0228.pdf"])
+        self.assertEqual([(p.colors, p.title) for p in pages], [(["red"], "Plan")]*2)
+
+        with self.assertRaisesRegex(ValueError, "Unknown period"):
+            periodic_pages("2021-01-01", "2021-02-01", "week")
+
+
+class RenderPagesTestCase(TimelineTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.pages = periodic_pages("2021-01-01", "2021-02-28",
+                                    fileNameFormat=os.path.join(self.tmpdir, "plan-{start:%Y-%m}.png"),
+                                    show_today=False)
+        self.drawn = {}
+
+    def savefig(self, fig, fileName, **kwargs):
+        """Record the window and bars of each page as it's saved"""
+        ax = fig.axes[0]
+        bars = [tuple(path.vertices[:2, 0]) for c in ax.collections
+                if isinstance(c, mcollections.PolyCollection) and c.get_alpha() == 0.5
+                for path in c.get_paths()]
+        self.drawn[os.path.basename(fileName)] = (ax.get_xlim(), bars)
+
+        return savefig(fig, fileName, **kwargs)
+
+    def testSpanning(self):
+        """X, which spans the end of January, is drawn on both pages up to
+        their edges; M, on the last day of January, is on the first page
+        """
+        with mock.patch.object(Figure, "savefig", autospec=True, side_effect=self.savefig):
+            results = render_pages(makePlan(), self.pages, nProcess=0)
+
+        self.assertEqual([r.error for r in results], [None, None])
+        self.assertEqual([r.nEntry for r in results], [3, 2])      # A, X, M; and X, F
+        for page in self.pages:
+            self.assertTrue(os.path.exists(page.fileName))
+
+        jan1, feb1, mar1, x0, x1 = (mdates.date2num(np.datetime64(d)) for d in
+                                    ["2021-01-01", "2021-02-01", "2021-03-01", "2021-01-25", "2021-02-08"])
+
+        xlim, bars = self.drawn["plan-2021-01.png"]
+        np.testing.assert_allclose(xlim, (jan1, feb1))
+        self.assertIn((x0, feb1), bars)
+
+        xlim, bars = self.drawn["plan-2021-02.png"]
+        np.testing.assert_allclose(xlim, (feb1, mar1))
+        self.assertIn((feb1, x1), bars)
+
+    def testFiles(self):
+        """Pages are written by worker processes sharing a binary file, or in
+        this process; each result is reported, and failures don't stop the
+        other pages
+        """
+        binFile = os.path.join(self.tmpdir, "plan.bin")
+        save_activity_table(ActivityTable.from_activities(makePlan()), binFile)
+
+        pages = self.pages + [Page(os.path.join(self.tmpdir, "missing", "all.png"), show_today=False),
+                              Page(os.path.join(self.tmpdir, "blue.pdf"), colors=["blue"], show_today=False)]
+        for timeline, nProcess in [(makePlan(), 0), (binFile, 2), (self.write("plan.csv", makePlan()), 2)]:
+            for page in pages[:2] + pages[3:]:
+                if os.path.exists(page.fileName):
+                    os.unlink(page.fileName)
+
+            progress = []
+            results = render_pages(timeline, pages, nProcess=nProcess, progress=progress.append)
+            self.assertEqual([r.page.fileName for r in results], [p.fileName for p in pages])
+            self.assertEqual(sorted(r.page.fileName for r in progress), sorted(p.fileName for p in pages))
+
+            self.assertEqual([r.nEntry for r in results], [3, 2, 0, 1])
+            self.assertIsNone(results[0].error)
+            self.assertIn("No such file or directory", results[2].error)
+            self.assertIn("FAILED", str(results[2]))
+            self.assertEqual(sorted(os.listdir(self.tmpdir)),
+                             ["blue.pdf", "plan-2021-01.png", "plan-2021-02.png", "plan.bin", "plan.csv"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+
+import numpy as np
+
+from lsst.timelines import (ActivityTable, TimelineFormatError, iter_activities, read_activities,
+                            read_activity_table)
+
+from helpers import TimelineTestCase, flatten, planFile
+
+
+class ReadTestCase(TimelineTestCase):
+    """Compare read_activity_table with read_activities, and check the errors
+    that they report
+    """
+
+    def testPlan(self):
+        table = read_activity_table(planFile)
+        self.assertEqual(flatten(table.to_activities()), flatten(read_activities(planFile)))
+
+    def testDurations(self):
+        """An Activity's duration is a number of days if it's a number, even
+        if it has a "-" in its exponent, else an end date
+        """
+        fileName = self.write("timeline.csv", "Activity,A,2021-01-01,10,,,,0\n"
+                                              "Activity,B,2021-01-01,1e-3,,,,0\n"
+                                              "Activity,C,2021-01-01,2.5E-1,,,,0\n"
+                                              "Activity,D,2021-01-01,-1,,,,0\n"
+                                              "Activity,E,2021-01-01,2021-01-05,,,,0\n"
+                                              "Activity,F,2021-01-01,2021-01-05T12:00:00,,,,0\n")
+        table = read_activity_table(fileName)
+        days = (table.t1 - table.t0)/np.timedelta64(1, "D")
+        np.testing.assert_allclose(days, [10, 1e-3, 0.25, -1, 4, 4.5])
+
+        self.assertEqual(flatten(table.to_activities()), flatten(read_activities(fileName)))
+
+    def testErrors(self):
+        """Errors give the file and line, whichever reader finds them"""
+        good = "Color,red,\nActivity,A,2021-01-01,10,,,,0\n\n"
+        for bad in ["Activity,B,2021-01-01,soon,,,,0",
+                    "Activity,B,2021-01-01,nan,,,,0",
+                    "Activity,B,2021-01-01,-inf,,,,0",
+                    "Activity,B,2021-13-01,10,,,,0",
+                    "Activity,B,2021-01-01,10,,,,0,extra",
+                    "Milestone,B,2021-01-01,,,right,top,wide,0",
+                    "Frobnicate,B"]:
+            fileName = self.write("timeline.csv", good + bad + "\n")
+            for reader in (read_activity_table, lambda f: list(iter_activities(f))):
+                with self.assertRaises(TimelineFormatError, msg=bad) as cm:
+                    reader(fileName)
+                self.assertEqual(cm.exception.fileName, fileName)
+                self.assertEqual(cm.exception.lineno, 4, msg=bad)
+                self.assertTrue(str(cm.exception).startswith(f"{fileName}:4: "), str(cm.exception))
+
+    def testEmpty(self):
+        table = read_activity_table(self.write("timeline.csv", ""))
+        self.assertIsInstance(table, ActivityTable)
+        self.assertEqual(len(table), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import random
+import unittest
+from datetime import datetime, timedelta
+
+from lsst.timelines import Activity, Calendar, Milestone, Schedule
+
+
+def date(s):
+    return datetime.fromisoformat(s)
+
+
+class ScheduleTestCase(unittest.TestCase):
+
+    def setUp(self):
+        """A small plan, worked by hand:
+
+            A  01-01 -> 01-11
+            B  after A             01-11 -> 01-16
+            C  after A + 2 days    01-13 -> 01-21
+            D  after B and C       01-21 -> 01-25
+            E  (independent)       01-05 -> 01-07
+            M  after D + 1 day     01-26 (a Milestone)
+
+        so the plan ends on 01-26, the critical path is A, C, D, M, B has
+        5 days' slack and E 19
+        """
+        self.A = Activity("A", "2021-01-01", 10)
+        self.B = Activity("B", "2020-06-01", 5, after=[self.A])
+        self.C = Activity("C", "2020-06-01", 8, after=[(self.A, 2)])
+        self.D = Activity("D", "2020-06-01", 4, after=[self.B, self.C])
+        self.E = Activity("E", "2021-01-05", 2)
+        self.M = Milestone("M", "2020-06-01", after=[(self.D, timedelta(1))])
+
+        self.schedule = Schedule([[self.A, self.B], [self.C, self.D, self.E], [self.M]])
+
+    def assertStarts(self, **starts):
+        for name, start in starts.items():
+            activity = getattr(self, name)
+            self.assertEqual(self.schedule.start(activity), date(start), name)
+            self.assertEqual(activity.t0, date(start), name)
+
+    def testPropagation(self):
+        self.assertEqual(len(self.schedule), 6)
+        self.assertStarts(A="2021-01-01", B="2021-01-11", C="2021-01-13", D="2021-01-21", E="2021-01-05",
+                          M="2021-01-26")
+        self.assertEqual(self.schedule.finish(self.D), date("2021-01-25"))
+
+        moved = self.schedule.set_duration(self.A, 12)
+        self.assertEqual(moved, [self.B, self.C, self.D, self.M])
+        self.assertStarts(B="2021-01-13", C="2021-01-15", D="2021-01-23", M="2021-01-28")
+
+        self.assertEqual(self.schedule.set_duration(self.B, timedelta(days=20)), [self.D, self.M])
+        self.assertStarts(D="2021-02-02", M="2021-02-07")
+
+        self.assertEqual(self.schedule.set_duration(self.C, 1), [])    # D is still waiting for B
+        self.assertEqual(self.schedule.set_duration(self.E, 3), [])    # nothing follows E
+        self.assertEqual(self.E.duration, timedelta(3))
+
+        moved = self.schedule.set_start(self.A, "2021-01-02")
+        self.assertEqual(moved, [self.A, self.B, self.C, self.D, self.M])
+        self.assertStarts(A="2021-01-02", B="2021-01-14", D="2021-02-03")
+        self.assertEqual(self.schedule.set_start(self.A, date("2021-01-02")), [])
+
+        with self.assertRaises(ValueError):
+            self.schedule.set_start(self.B, "2021-01-01")     # B's start is set by A
+        with self.assertRaises(ValueError):
+            self.schedule.start(Activity("X", "2021-01-01", 1))
+
+    def testSlack(self):
+        self.assertEqual(self.schedule.critical_path(), [self.A, self.C, self.D, self.M])
+        slack = {a.descrip: self.schedule.slack(a).days for a in self.schedule.activities}
+        self.assertEqual(slack, dict(A=0, B=5, C=0, D=0, E=19, M=0))
+
+        self.schedule.set_duration(self.B, 10)     # B now finishes on 01-21, with C
+        self.assertEqual(self.schedule.slack(self.B), timedelta(0))
+        self.assertIn(self.schedule.critical_path(), ([self.A, self.B, self.D, self.M],
+                                                      [self.A, self.C, self.D, self.M]))
+
+        self.schedule.set_duration(self.B, 20)
+        self.assertEqual(self.schedule.critical_path(), [self.A, self.B, self.D, self.M])
+        self.assertEqual(self.schedule.slack(self.C), timedelta(10))
+        self.assertEqual(self.schedule.slack(self.E), timedelta(29))
+
+    def testCalendar(self):
+        """Numerical durations are in the calendar's working days, if one is
+        given; 2021-01-01 is a Friday, and 01-11 a holiday
+        """
+        calendar = Calendar("1111100", ["2021-01-11"])
+        moved = self.schedule.set_duration(self.A, 3, calendar)     # Fri, Mon 01-04, Tue
+        self.assertEqual(moved, [self.B, self.C, self.D, self.M])
+        self.assertEqual(self.A.duration, timedelta(5))
+        self.assertStarts(B="2021-01-06", C="2021-01-08")
+
+        self.schedule.set_durations({self.B: 4.5, self.C: timedelta(2), self.E: 2}, calendar)
+        self.assertEqual(self.B.duration, timedelta(days=7, hours=12))  # Wed-Fri, Tue 01-12, half of Wed
+        self.assertEqual(self.C.duration, timedelta(2))
+        self.assertEqual(self.E.duration, timedelta(2))                 # Tue 01-05, Wed
+        self.assertStarts(D="2021-01-13T12:00:00")
+
+        self.schedule.set_duration(self.A, 3)                         # calendar days, as before
+        self.assertEqual(self.A.duration, timedelta(3))
+
+    def testCycle(self):
+        X = Activity("X", "2021-01-01", 1)
+        Y = Activity("Y", "2021-01-01", 1, after=[X])
+        Z = Activity("Z", "2021-01-01", 1, after=[Y])
+        X.after.append((Z, timedelta(0)))
+        with self.assertRaisesRegex(ValueError, "The dependencies form a cycle"):
+            Schedule([self.A, X, Y, Z])
+
+    def testMissingPredecessor(self):
+        with self.assertRaisesRegex(ValueError, "isn't in the timeline"):
+            Schedule([self.B])
+
+    def testIncremental(self):
+        """Changing durations one at a time gives the same schedule as
+        scheduling the changed plan from scratch
+        """
+        rng = random.Random(42)
+        activities = []
+        for i in range(200):
+            after = [(a, rng.choice([0, 0, 1, 3])) for a in rng.sample(activities, min(len(activities), 3))
+                     if rng.random() < 0.5]
+            activities.append(Activity(f"A{i}", "2021-01-01", rng.randrange(1, 20), after=after))
+
+        schedule = Schedule(activities)
+        for i in range(50):
+            schedule.set_duration(rng.choice(activities), rng.randrange(0, 30))
+
+        starts = [a.t0 for a in activities]
+        slack = [schedule.slack(a) for a in activities]
+        fresh = Schedule(activities)
+        self.assertEqual([fresh.start(a) for a in activities], starts)
+        self.assertEqual([fresh.slack(a) for a in activities], slack)
+
+
+if __name__ == "__main__":
+    unittest.main()
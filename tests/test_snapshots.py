@@ -0,0 +1,167 @@
+import contextlib
+import csv
+import io
+import os
+import shutil
+import unittest
+
+import numpy as np
+
+from lsst.timelines import (Activity, Milestone, Color, TimelineFormatError, SnapshotCache, Snapshots,
+                            read_activity_table, read_snapshots, save_activity_table)
+from lsst.timelines.cli import main
+
+from helpers import TimelineTestCase
+
+
+def makePlans():
+    """Three snapshots of a plan: B slips and C is added in the second, and
+    B slips again, the second D moves and M is removed in the third
+    """
+    A, C = Activity("A", "2021-02-01", 10), Activity("C", "2021-03-01", 2)
+    return {
+        "plan-2021-01-01.csv": [[Color("red"), A, Activity("B", "2021-02-11", 5)],
+                                [Activity("D", "2021-03-01", 1), Activity("D", "2021-04-01", 1),
+                                 Milestone("M", "2021-05-01")]],
+        "plan-2021-02-01.csv": [[Color("red"), A, Activity("B", "2021-02-13", 5), C],
+                                [Activity("D", "2021-03-01", 1), Activity("D", "2021-04-01", 1),
+                                 Milestone("M", "2021-05-01")]],
+        "plan-2021-03-01.csv": [[Color("red"), A, Activity("B", "2021-02-13", 9), C],
+                                [Activity("D", "2021-03-01", 1), Activity("D", "2021-04-03", 1)]],
+    }
+
+
+class SnapshotsTestCase(TimelineTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cacheDir = os.path.join(self.tmpdir, "cache")
+        self.fileNames = [self.write(name, activities) for name, activities in makePlans().items()]
+
+    def read(self, fileNames=None, **kwargs):
+        kwargs.setdefault("cache", False)
+        return read_snapshots(fileNames or self.fileNames[::-1], **kwargs)  # in the wrong order
+
+    def testMatching(self):
+        snapshots = self.read()
+        self.assertEqual(len(snapshots), 3)
+        self.assertEqual(snapshots.names, self.fileNames)
+        np.testing.assert_array_equal(snapshots.dates, np.array(["2021-01-01", "2021-02-01", "2021-03-01"],
+                                                                dtype="M8[D]"))
+        self.assertEqual(snapshots.keys, [("Activity", "A", 0), ("Activity", "B", 0), ("Activity", "D", 0),
+                                          ("Activity", "D", 1), ("Milestone", "M", 0), ("Activity", "C", 0)])
+        np.testing.assert_array_equal(snapshots.present, [[1, 1, 1, 1, 1, 0],
+                                                          [1, 1, 1, 1, 1, 1],
+                                                          [1, 1, 1, 1, 0, 1]])
+        self.assertEqual(snapshots.index("2021-02-15"), 1)
+        with self.assertRaises(ValueError):
+            snapshots.index("2020-12-31")
+
+        startSlip, endSlip = snapshots.slips()
+        np.testing.assert_array_equal(endSlip[:, :5], [[0, 0, 0, 0, 0],
+                                                       [0, 2, 0, 0, 0],
+                                                       [0, 6, 0, 2, np.nan]])
+        self.assertTrue(np.isnan(endSlip[:, 5]).all())     # C isn't in the first snapshot
+
+        startSlip, endSlip = snapshots.slips(base=None)
+        np.testing.assert_array_equal(startSlip[1:, :4], [[0, 2, 0, 0], [0, 0, 0, 2]])
+        np.testing.assert_array_equal(endSlip[2], [0, 4, 0, 2, np.nan, 0])
+
+    def testSlipTable(self):
+        snapshots = self.read()
+        slips = snapshots.slip_table()
+        self.assertEqual([(s["label"], s["occurrence"], s["status"]) for s in slips],
+                         [("B", 0, "moved"), ("D", 1, "moved"), ("M", 0, "removed")])
+        self.assertEqual(slips[0]["startSlip"], 0)
+        self.assertEqual(slips[0]["endSlip"], 4)
+        self.assertEqual(slips[0]["newEnd"], np.datetime64("2021-02-22", "us"))
+        self.assertTrue(np.isnat(slips[2]["newStart"]))
+        self.assertTrue(np.isnan(slips[2]["endSlip"]))
+
+        slips = snapshots.slip_table(0, -1, unchanged=True)
+        self.assertEqual([(s["label"], s["status"]) for s in slips],
+                         [("B", "moved"), ("D", "moved"), ("C", "added"), ("M", "removed"), ("A", "same"),
+                          ("D", "same")])
+        self.assertEqual(slips[0]["endSlip"], 6)
+
+    def testCache(self):
+        """Parsed CSV files are stored under a hash of their contents, so
+        reading the snapshots again only parses the new or changed files
+        """
+        expected = self.read()
+
+        cache = SnapshotCache(self.cacheDir)
+        snapshots = self.read(cache=cache)
+        self.assertEqual((cache.hits, cache.misses), (0, 3))
+        self.assertEqual(len(os.listdir(self.cacheDir)), 3)
+        self.assertSnapshotsEqual(snapshots, expected)
+
+        cache = SnapshotCache(self.cacheDir)
+        snapshots = self.read(cache=cache, processes=2)
+        self.assertEqual((cache.hits, cache.misses), (3, 0))
+        self.assertSnapshotsEqual(snapshots, expected)
+        #
+        # A changed file is parsed again; a copy of an unchanged file (even
+        # with a different name, and so date) isn't
+        #
+        with open(self.fileNames[-1], "a") as fd:
+            fd.write("Activity,E,2021-06-01,3,,,,0\n")
+        copied = os.path.join(self.tmpdir, "plan-2021-04-01.csv")
+        shutil.copyfile(self.fileNames[0], copied)
+
+        cache = SnapshotCache(self.cacheDir)
+        snapshots = self.read(self.fileNames + [copied], cache=cache)
+        self.assertEqual((cache.hits, cache.misses), (3, 1))
+        self.assertEqual(len(snapshots), 4)
+        self.assertIn(("Activity", "E", 0), snapshots.keys)
+        self.assertEqual(len(os.listdir(self.cacheDir)), 4)
+
+        cache.clear()
+        self.assertEqual(os.listdir(self.cacheDir), [])
+
+    def testBinary(self):
+        """Binary snapshots are read directly, not stored in the cache"""
+        binary = os.path.join(self.tmpdir, "plan-2021-04-01.bin")
+        save_activity_table(read_activity_table(self.fileNames[-1]), binary)
+
+        cache = SnapshotCache(self.cacheDir)
+        snapshots = self.read(self.fileNames + [binary], cache=cache)
+        self.assertEqual(len(snapshots), 4)
+        self.assertEqual(len(os.listdir(self.cacheDir)), 3)
+        self.assertEqual(len(snapshots.slip_table(2, 3)), 0)
+
+    def testErrors(self):
+        with open(self.fileNames[1], "a") as fd:
+            fd.write("Activity,E,2021-06-01,soon,,,,0\n")
+        with self.assertRaises(TimelineFormatError):
+            self.read(cache=SnapshotCache(self.cacheDir), processes=2)
+
+        with self.assertRaises(ValueError):
+            Snapshots([read_activity_table(self.fileNames[0])], ["2021-01-01", "2021-02-01"])
+
+    def testCommand(self):
+        output = os.path.join(self.tmpdir, "slips.csv")
+        argv = ["slips", *self.fileNames, "--cache-dir", self.cacheDir, "--output", output]
+        for i in range(2):
+            with contextlib.redirect_stderr(io.StringIO()) as stderr:
+                self.assertEqual(main(argv), 0)
+            self.assertIn("2 moved, 0 added, 1 removed", stderr.getvalue())
+            self.assertEqual(len(os.listdir(self.cacheDir)), 3)
+
+        with open(output) as fd:
+            rows = list(csv.DictReader(fd))
+        self.assertEqual([(r["label"], r["status"], r["endSlip"]) for r in rows],
+                         [("B", "moved", "4.0"), ("D", "moved", "2.0"), ("M", "removed", "")])
+
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(main(argv[:2] + ["--no-cache"]), 1)    # a single snapshot
+
+    def assertSnapshotsEqual(self, snapshots, expected):
+        self.assertEqual(snapshots.keys, expected.keys)
+        np.testing.assert_array_equal(snapshots.dates, expected.dates)
+        np.testing.assert_array_equal(snapshots.t0, expected.t0)
+        np.testing.assert_array_equal(snapshots.t1, expected.t1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import pstats
+import unittest
+
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: E402
+from matplotlib.figure import Figure  # noqa: E402
+
+from lsst.timelines import ActivityTable, LevelOfDetail, RenderStats, show_activities  # noqa: E402
+
+from helpers import makeActivities  # noqa: E402
+
+nItem = 5                               # A, B, C, M and D
+window = dict(startDate="2021-01-11", endDate="2021-01-20")     # only A and D are in it
+
+
+class RenderStatsTestCase(unittest.TestCase):
+    """Check the RenderStats filled in by each of show_activities' ways of
+    drawing
+    """
+
+    def draw(self, activities, **kwargs):
+        fig = Figure()
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        nChildren = len(ax.get_children())
+        stats = show_activities(activities, ax=ax, stats=RenderStats(), show_today=False, **kwargs)
+        return stats, len(ax.get_children()) - nChildren
+
+    def check(self, phases, nDrawn, activities=None, **kwargs):
+        """Draw the whole plan and the window, checking the phases timed and
+        the numbers drawn (nDrawn for the whole plan and the window) and
+        culled
+        """
+        for nExpected, kw in zip(nDrawn, [{}, window]):
+            stats, nAdded = self.draw(makeActivities() if activities is None else activities, **kwargs, **kw)
+
+            self.assertEqual(list(stats.phases), phases)
+            self.assertTrue(all(t >= 0 for t in stats.phases.values()), stats.phases)
+            self.assertAlmostEqual(stats.total, sum(t for p, t in stats.phases.items() if p != "wrap"))
+            self.assertGreater(stats.total, 0)
+
+            self.assertEqual(stats.nDrawn, nExpected, kw)
+            self.assertEqual(stats.nDrawn + stats.nCulled, nItem, kw)
+            self.assertGreater(stats.nArtist, 0)
+            self.assertLessEqual(stats.nArtist, nAdded)     # finish adds the grid lines, tick labels etc.
+
+            self.assertIn(f"drawn: {stats.nDrawn}  culled: {stats.nCulled}", str(stats))
+
+    def testList(self):
+        self.check(["extent", "draw", "wrap", "finish", "tight_layout"], (5, 2))
+
+    def testBatched(self):
+        self.check(["extent", "draw", "wrap", "collections", "finish", "tight_layout"], (5, 2), batched=True)
+
+    def testTable(self):
+        self.check(["draw", "wrap", "collections", "finish", "tight_layout"], (5, 2),
+                   activities=ActivityTable.from_activities(makeActivities()))
+
+    def testLevelOfDetail(self):
+        """With maxItems=1 the plan is drawn as coverage spans, with B merged
+        into A's and counted as culled
+        """
+        lod = LevelOfDetail(makeActivities(), maxItems=1)
+        self.check(["extent", "draw", "finish", "tight_layout"], (4, 2), lod=lod)
+
+        lod = LevelOfDetail(makeActivities())
+        self.check(["extent", "draw", "finish", "tight_layout"], (5, 2), lod=lod)
+
+    def testCallbackAndProfile(self):
+        found = []
+        fig = Figure()
+        FigureCanvasAgg(fig)
+        stats = show_activities(makeActivities(), ax=fig.add_subplot(), show_today=False,
+                                callback=found.append, profile=True)
+        self.assertEqual(found, [stats])
+        self.assertEqual(stats.nDrawn, nItem)
+        self.assertIsInstance(stats.profile, pstats.Stats)
+
+        self.assertIsNone(show_activities(makeActivities(), ax=fig.add_subplot(), show_today=False))
+
+
+if __name__ == "__main__":
+    unittest.main()
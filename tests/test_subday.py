@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta
+import unittest
+
+import numpy as np
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.dates as mdates  # noqa: E402
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: E402
+from matplotlib.figure import Figure  # noqa: E402
+
+from lsst.timelines import (Activity, ActivityTable, Color, get_label_wrapper, pack_rows,  # noqa: E402
+                            show_activities)
+from lsst.timelines.labels import _labelPadding  # noqa: E402
+
+from test_batching import batchedGeometry  # noqa: E402
+
+height = 0.1
+fontsize = 7
+dusk = datetime(2024, 3, 1, 22, 0)
+
+
+def makeNight():
+    """Part of a night's observing, 22:00 to 00:40: 20-minute exposures
+    (one with a long label) in one row, and a 2-hour calibration in another
+    """
+    return [
+        [Color("green"),
+         Activity("u exposure", dusk, 20/1440),
+         Activity("g exposure", dusk + timedelta(minutes=20), timedelta(minutes=20)),
+         Activity("r exposure of the deep drilling field", "2024-03-01T23:20:00", "2024-03-01T23:40:00")],
+        [Activity("Calibration", dusk + timedelta(minutes=40), 2/24, color="blue")],
+    ]
+
+
+class SubDayTestCase(unittest.TestCase):
+    """Draw 20-minute blocks, and check that they're drawn and labelled as
+    longer Activities are
+    """
+
+    def draw(self, activities, **kwargs):
+        fig = Figure(figsize=(8, 4))
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        #
+        # The width that the labels are wrapped to fit: that of the Axes
+        # before tight_layout
+        #
+        params = fig.subplotpars
+        self.axesWidth = (params.right - params.left)*fig.get_figwidth()*72
+        show_activities(activities, ax=ax, height=height, fontsize=fontsize, show_today=False, **kwargs)
+        return ax
+
+    def bars(self, ax):
+        """Return the vertices of the bars drawn into ax, one patch per entry
+        or batched
+        """
+        bars = [p.get_xy() for p in ax.patches if p.get_alpha() == 0.5]
+        return bars or [xy for xy, c in batchedGeometry(ax)[0]]
+
+    def check(self, ax):
+        bars = self.bars(ax)
+        self.assertEqual(len(bars), 4)
+        x0 = np.array([xy[0, 0] for xy in bars])
+        x1 = np.array([xy[1, 0] for xy in bars])
+        y0 = np.array([xy[0, 1] for xy in bars])
+
+        start = mdates.date2num(np.datetime64(dusk))
+        np.testing.assert_allclose(x0, start + np.array([0, 20, 80, 40])/1440, atol=1e-9)
+        np.testing.assert_allclose(x1 - x0, np.array([20, 20, 20, 120])/1440, atol=1e-9)
+        np.testing.assert_allclose(y0, [0, 0, 0, -1.1*height])         # a row per list, as for days
+        np.testing.assert_allclose(ax.get_xlim(), start + np.array([-0.05, 1.05])*160/1440)
+        #
+        # Each label is centred in its bar, and wrapped to its share of the
+        # Axes' width
+        #
+        labels = {t.get_text().replace("\n", " "): t for t in ax.texts}
+        names = ["u exposure", "g exposure", "r exposure of the deep drilling field", "Calibration"]
+        for xy, label in zip(bars, names):
+            text = labels[label]
+            x, y = text.get_position()
+            np.testing.assert_allclose([ax.xaxis.convert_units(x), y],   # x may be a datetime
+                                       [xy[:2, 0].mean(), xy[0, 1] + 0.5*height])
+
+            width = self.axesWidth*(xy[1, 0] - xy[0, 0])/(160/1440) - _labelPadding
+            self.assertEqual(text.get_text(), get_label_wrapper().wrap(label, width, fontsize))
+
+        self.assertNotIn("\n", labels["u exposure"].get_text())         # 20 minutes is room for it
+        self.assertIn("\n", labels[names[2]].get_text())
+
+    def testPerEntry(self):
+        self.check(self.draw(makeNight()))
+
+    def testBatched(self):
+        self.check(self.draw(makeNight(), batched=True))
+
+    def testTable(self):
+        self.check(self.draw(ActivityTable.from_activities(makeNight())))
+
+    def testPackRows(self):
+        """Blocks that follow each other share a row: the calibration follows
+        the g exposure, and the r exposure, during the calibration, needs
+        another row
+        """
+        layout = pack_rows(makeNight())
+        table = ActivityTable.from_activities(makeNight())
+        self.assertEqual(layout.rows[table.isItem].tolist(), [0, 0, 1, 0])
+
+        bars = self.bars(self.draw(makeNight(), layout=layout))
+        np.testing.assert_allclose([xy[0, 1] for xy in bars], [0, 0, -1.1*height, 0])
+        self.assertTrue(all(xy[1, 0] > xy[0, 0] for xy in bars))
+
+
+if __name__ == "__main__":
+    unittest.main()
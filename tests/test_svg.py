@@ -0,0 +1,146 @@
+import io
+import unittest
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.colors as mcolors  # noqa: E402
+import matplotlib.dates as mdates  # noqa: E402
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: E402
+from matplotlib.figure import Figure  # noqa: E402
+
+from lsst.timelines import Activity, Functionality, Milestone, show_activities, write_svg  # noqa: E402
+
+from test_batching import batchedGeometry  # noqa: E402
+
+ns = {"svg": "http://www.w3.org/2000/svg"}
+
+
+def makePlan():
+    """A coloured and an uncoloured Activity, a Milestone, a 20-minute
+    Activity at a time of day, and a Functionality
+    """
+    return [
+        [Activity("A", "2021-01-04", 10, color="red"), Activity("B", "2021-01-06", 3)],
+        [Milestone("M", "2021-01-05"), Activity("T", "2021-01-08T09:00:00", 20/1440, color="green")],
+        [Functionality("F", "2021-01-12")],
+    ]
+
+
+def points(polygon):
+    return np.array([[float(v) for v in xy.split(",")] for xy in polygon.get("points").split()])
+
+
+def svgGeometry(text):
+    """Return the bars, bar outlines, diamonds and arrows in an SVG written
+    by write_svg, as lists of (vertices, colour) in points, and the
+    clipping rectangle of the Axes as (left, top, right, bottom)
+    """
+    root = ET.fromstring(text)
+    clip = root.find("svg:defs/svg:clipPath/svg:rect", ns)
+    x, y, w, h = (float(clip.get(k)) for k in ("x", "y", "width", "height"))
+
+    layers = root.find("svg:g[@clip-path]", ns)
+    bars = layers.find("svg:g[@fill-opacity]", ns)
+    outlines = layers.find("svg:g[@fill='none']", ns)
+    polygons = [g for g in layers.findall("svg:g", ns)   # the diamonds, and the arrows if there are any
+                if not {"fill-opacity", "fill", "font-size"} & set(g.keys())]
+    diamonds, arrows = (polygons + [[]])[:2]
+
+    def corners(rect):
+        x0, y0 = float(rect.get("x")), float(rect.get("y"))
+        x1, y1 = x0 + float(rect.get("width")), y0 + float(rect.get("height"))
+        return np.array([[x0, y1], [x1, y1], [x1, y0], [x0, y0]])   # from bottom left, as matplotlib's
+
+    return ([(corners(r), r.get("fill")) for r in bars],
+            [(corners(r), r.get("stroke")) for r in outlines],
+            [(points(p), p.get("fill")) for p in diamonds],
+            [(points(p), p.get("fill")) for p in arrows],
+            (x, y, x + w, y + h))
+
+
+class SvgTestCase(unittest.TestCase):
+    """Compare the SVG written by write_svg with what show_activities draws
+    into an Agg Axes; the SVG is in points, so the data coordinates are
+    mapped to points by fitting a scale and offset to each axis
+    """
+
+    def draw(self, activities, **kwargs):
+        fig = Figure(figsize=(12, 6))
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        show_activities(activities, ax=ax, batched=True, show_today=False, **kwargs)
+        return ax
+
+    def write(self, activities, **kwargs):
+        fd = io.StringIO()
+        nDrawn = write_svg(activities, fd, show_today=False, **kwargs)
+        return nDrawn, svgGeometry(fd.getvalue())
+
+    def compare(self, ax, svg):
+        """Check that the shapes in svg are those drawn into ax, returning
+        the transformation from data coordinates to points
+        """
+        drawn = batchedGeometry(ax)
+        found = svg[:4]
+        #
+        # The transformation, from the corners of the bars
+        #
+        xy = np.concatenate([v[:4] for v, c in drawn[0]])
+        pts = np.concatenate([v for v, c in found[0]])
+        transform = [np.polyfit(xy[:, i], pts[:, i], 1) for i in (0, 1)]
+
+        for what, d, f in zip(["bar", "outline", "diamond", "arrow"], drawn, found):
+            self.assertEqual(len(d), len(f), what)
+            for i, ((xy, rgba), (pts, color)) in enumerate(zip(d, f)):
+                n = min(len(xy), len(pts))     # matplotlib adds a closing vertex
+                expected = np.column_stack([np.polyval(transform[0], xy[:n, 0]),
+                                            np.polyval(transform[1], xy[:n, 1])])
+                np.testing.assert_allclose(pts[:n], expected, atol=0.02, err_msg=f"{what} {i}")
+                self.assertEqual(color, mcolors.to_hex(rgba), f"{what} {i} colour")
+        #
+        # The Axes cover the same range of dates
+        #
+        left, top, right, bottom = svg[4]
+        np.testing.assert_allclose([left, right], np.polyval(transform[0], ax.get_xlim()), atol=0.02)
+
+        return transform
+
+    def testGeometry(self):
+        ax = self.draw(makePlan())
+        nDrawn, svg = self.write(makePlan())
+        self.assertEqual(nDrawn, 5)
+
+        transform = self.compare(ax, svg)
+        self.assertEqual([c for v, c in svg[0]], ["#ff0000", "#1f77b4", "#008000"])
+        self.assertEqual([c for v, c in svg[2]], ["#ff7f0e", "#2ca02c"])   # M and F, cycling after B
+        self.assertEqual([c for v, c in svg[3]], [mcolors.to_hex(matplotlib.rcParams["patch.facecolor"])])
+        #
+        # The 20-minute block starts at 09:00 and is 20 minutes wide
+        #
+        x0, x1 = svg[0][2][0][:2, 0]
+        t0 = mdates.date2num(np.datetime64("2021-01-08T09:00"))
+        self.assertAlmostEqual(x0, np.polyval(transform[0], t0), delta=0.02)
+        self.assertAlmostEqual(x1 - x0, transform[0][0]*20/1440, delta=0.02)
+        self.assertGreater(x1 - x0, 0)
+
+    def testWindow(self):
+        """Only the entries in [startDate, endDate] are drawn, clipped to it"""
+        window = dict(startDate="2021-01-07", endDate="2021-01-11")
+        ax = self.draw(makePlan(), **window)
+        nDrawn, svg = self.write(makePlan(), **window)
+        self.assertEqual(nDrawn, 3)            # A, B and T
+
+        transform = self.compare(ax, svg)
+        self.assertEqual(len(svg[2]) + len(svg[3]), 0)
+
+        x = np.concatenate([v[:, 0] for v, c in svg[0]])
+        start, end = (mdates.date2num(np.datetime64(window[k])) for k in ("startDate", "endDate"))
+        self.assertAlmostEqual(x.min(), np.polyval(transform[0], start), delta=0.02)
+        self.assertAlmostEqual(x.max(), np.polyval(transform[0], end), delta=0.02)
+
+
+if __name__ == "__main__":
+    unittest.main()
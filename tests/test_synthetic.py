@@ -0,0 +1,123 @@
+import contextlib
+from datetime import datetime
+import importlib.util
+import io
+import json
+import os
+import sys
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import matplotlib
+matplotlib.use("Agg")
+
+from lsst.timelines import (Activity, ActivityTable, Functionality, Milestone,  # noqa: E402
+                            makeObservingSchedule, makeTimeline)
+from lsst.timelines.activities import Manipulation  # noqa: E402
+
+from helpers import TimelineTestCase, flatten  # noqa: E402
+
+benchSuite = os.path.join(os.path.dirname(__file__), os.path.pardir, "benchmarks", "bench_suite.py")
+
+
+class MakeTimelineTestCase(unittest.TestCase):
+
+    def testDeterministic(self):
+        self.assertEqual(flatten(makeTimeline(200, seed=1)), flatten(makeTimeline(200, seed=1)))
+        self.assertNotEqual(flatten(makeTimeline(200, seed=1)), flatten(makeTimeline(200, seed=2)))
+
+    def testCounts(self):
+        for nItem in [0, 1, 7, 500]:
+            activities = makeTimeline(nItem)
+            items = [a for aa in activities for a in aa if not isinstance(a, Manipulation)]
+            self.assertEqual(len(items), nItem)
+
+        activities = makeTimeline(3000)
+        kinds = [type(a) for aa in activities for a in aa if not isinstance(a, Manipulation)]
+        for kind, fraction in [(Activity, 0.6), (Milestone, 0.25), (Functionality, 0.15)]:
+            self.assertAlmostEqual(kinds.count(kind)/len(kinds), fraction, delta=0.03, msg=kind.__name__)
+
+    def testDates(self):
+        startDate = datetime(2022, 3, 1)
+        for a in (a for aa in makeTimeline(1000, startDate=startDate, years=1) for a in aa):
+            if isinstance(a, Manipulation):
+                continue
+            self.assertGreaterEqual(a.t0, startDate)
+            self.assertLess(a.t0, datetime(2025, 1, 1))     # chains of entries may run past a year
+            if type(a) is Activity:
+                self.assertGreater(a.duration.total_seconds(), 0)
+
+
+class MakeObservingScheduleTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.table = makeObservingSchedule(5000, startDate="2024-03-01", nights=30, seed=1)
+
+    def testDeterministic(self):
+        again = makeObservingSchedule(5000, startDate="2024-03-01", nights=30, seed=1)
+        other = makeObservingSchedule(5000, startDate="2024-03-01", nights=30, seed=2)
+        for name in ["kind", "group", "t0", "t1", "color"]:
+            np.testing.assert_array_equal(getattr(self.table, name), getattr(again, name), err_msg=name)
+        self.assertEqual(list(self.table.labels), list(again.labels))
+        self.assertFalse(np.array_equal(self.table.t0, other.t0))
+
+    def testSchedule(self):
+        """The requested number of exposures, each within the nights, and
+        following each other in its filter's row
+        """
+        table = self.table
+        self.assertEqual(int(table.isItem.sum()), 5000)
+        self.assertEqual(int((table.kind == ActivityTable.COLOR).sum()), 6)
+
+        t0, t1 = table.t0[table.isItem], table.t1[table.isItem]
+        self.assertFalse(np.isnat(t0).any() or np.isnat(t1).any())
+        self.assertTrue((t1 > t0).all())
+        self.assertGreaterEqual(t0.min(), np.datetime64("2024-03-01T12:00"))   # the first dusk
+        self.assertLess(t1.max(), np.datetime64("2024-04-01T12:00"))           # the last dawn
+        self.assertLess((t1 - t0).max(), np.timedelta64(1, "h"))
+
+        group = table.group[table.isItem]
+        sameRow = group[1:] == group[:-1]
+        self.assertTrue((t1[:-1][sameRow] <= t0[1:][sameRow]).all())
+
+        for nItem in [1, 7]:
+            table = makeObservingSchedule(nItem, nights=3)
+            self.assertEqual(int(table.isItem.sum()), nItem)
+            self.assertEqual(len(table), nItem + 6)                     # and a Color per filter
+
+
+class BenchSuiteTestCase(TimelineTestCase):
+    """Run benchmarks/bench_suite.py at a tiny size"""
+
+    def run_main(self, *args):
+        spec = importlib.util.spec_from_file_location("bench_suite", benchSuite)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+
+        with mock.patch.object(sys, "argv", ["bench_suite.py", *args]), \
+             contextlib.redirect_stdout(io.StringIO()) as stdout, contextlib.redirect_stderr(io.StringIO()):
+            module.main()
+        return module, stdout.getvalue()
+
+    def testTiny(self):
+        output = os.path.join(self.tmpdir, "results.json")
+        module, stdout = self.run_main("--sizes", "20", "--repeat", "1", "--output", output)
+        with open(output) as fd:
+            results = json.load(fd)
+
+        self.assertEqual(sorted(results["times"]), sorted(c.name for c in module.cases))
+        for name, times in results["times"].items():
+            self.assertGreaterEqual(times["20"], 0, name)
+        self.assertIn("Best of 1 times", stdout)
+
+        again = os.path.join(self.tmpdir, "again.json")
+        module, stdout = self.run_main("--sizes", "20", "--repeat", "1", "--cases", "read", "write",
+                                       "--output", again, "--compare", output)
+        with open(again) as fd:
+            self.assertEqual(sorted(json.load(fd)["times"]), ["read", "write"])
+
+
+if __name__ == "__main__":
+    unittest.main()
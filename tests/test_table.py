@@ -0,0 +1,63 @@
+import unittest
+
+import numpy as np
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.colors as mcolors  # noqa: E402
+import matplotlib.patches as mpatches  # noqa: E402
+from matplotlib.figure import Figure  # noqa: E402
+
+from lsst.timelines import ActivityTable, read_activities, show_activities  # noqa: E402
+
+from helpers import flatten, planFile  # noqa: E402
+
+
+class ActivityTableTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.activities = read_activities(planFile)
+        self.table = ActivityTable.from_activities(self.activities)
+
+    def testRoundTrip(self):
+        """from_activities then to_activities gives back the same timeline"""
+        self.assertEqual(len(self.table), sum(len(aa) for aa in self.activities))
+        self.assertEqual(flatten(self.table.to_activities()), flatten(self.activities))
+
+    def testRowsAndStyles(self):
+        """rows() and styles() agree with what show_activities draws, one
+        artist per entry
+        """
+        height = 0.1
+        ax = Figure().add_subplot()
+        show_activities(self.activities, ax=ax, height=height, show_today=False)
+        #
+        # Each Activity and Milestone (and Functionality) is drawn as one
+        # filled polygon, in order; Functionalities also have an arrow
+        #
+        fills = [p for p in ax.patches if not isinstance(p, mpatches.FancyArrow)]
+        items = np.flatnonzero(self.table.isItem)
+        self.assertEqual(len(fills), len(items))
+
+        rows = self.table.rows() - self.table.drow
+        colors, borders, markerWidths, lengthArrows = self.table.styles()
+        for i, fill in zip(items, fills):
+            xy = fill.get_xy()
+            self.assertAlmostEqual(xy[:, 1].min(), height*1.1*rows[i], msg=self.table.labels[i])
+            if colors[i] is not None:
+                self.assertEqual(mcolors.to_rgb(fill.get_facecolor()), mcolors.to_rgb(colors[i]),
+                                 msg=self.table.labels[i])
+            if self.table.kind[i] != ActivityTable.ACTIVITY:
+                halfWidth = 0.5*(xy[:, 0].max() - xy[:, 0].min())
+                self.assertAlmostEqual(halfWidth, markerWidths[i], msg=self.table.labels[i])
+
+        arrows = [p for p in ax.patches if isinstance(p, mpatches.FancyArrow)]
+        isFunctionality = self.table.kind == ActivityTable.FUNCTIONALITY
+        self.assertEqual(len(arrows), isFunctionality.sum())
+        for i, arrow in zip(np.flatnonzero(isFunctionality), arrows):
+            xy = arrow.get_xy()
+            self.assertAlmostEqual(xy[:, 0].max() - xy[:, 0].min(), lengthArrows[i], msg=self.table.labels[i])
+
+
+if __name__ == "__main__":
+    unittest.main()
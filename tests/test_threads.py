@@ -0,0 +1,78 @@
+from concurrent.futures import ThreadPoolExecutor
+import unittest
+
+import numpy as np
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.colors as mcolors  # noqa: E402
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: E402
+from matplotlib.figure import Figure  # noqa: E402
+
+from lsst.timelines import (Activity, Functionality, Milestone, makeTimeline,  # noqa: E402
+                            show_activities)
+
+from helpers import makeActivities, makeEveryKind  # noqa: E402
+
+timelines = dict(plan=makeActivities, everyKind=makeEveryKind, synthetic=lambda: makeTimeline(100, seed=1))
+
+
+def defaults():
+    """The class attributes that a RenderContext starts from"""
+    return [(cls.__name__, name, getattr(cls, name)) for cls in (Activity, Milestone, Functionality)
+            for name in ("color", "border", "markerWidth", "height", "fontsize", "lengthArrow", "row")
+            if hasattr(cls, name)]
+
+
+def render(name, batched):
+    """Draw one of the timelines into its own Figure, returning the colours
+    of the artists in the order they were drawn, and the pixels
+    """
+    fig = Figure(figsize=(8, 4), dpi=50)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    show_activities(timelines[name](), ax=ax, batched=batched, show_today=False)
+
+    colors = [mcolors.to_hex(p.get_facecolor()) for p in ax.patches]
+    colors += [mcolors.to_hex(line.get_color()) for line in ax.lines]
+    for collection in ax.collections:
+        colors += [mcolors.to_hex(c) for c in collection.get_facecolor()]
+        colors += [mcolors.to_hex(c) for c in collection.get_edgecolor()]
+    canvas.draw()
+
+    return colors, np.asarray(canvas.buffer_rgba()).copy()
+
+
+class ThreadsTestCase(unittest.TestCase):
+    """Draw different timelines from several threads at once, each into its
+    own Figure, and check that they're drawn just as they are one at a time
+    """
+
+    def check(self, batched):
+        before = defaults()
+        expected = {name: render(name, batched) for name in timelines}
+
+        jobs = list(timelines)*3
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(render, jobs, [batched]*len(jobs)))
+
+        for name, (colors, pixels) in zip(jobs, results):
+            self.assertEqual(colors, expected[name][0], name)
+            np.testing.assert_array_equal(pixels, expected[name][1], err_msg=name)
+        #
+        # Drawing a timeline doesn't change the defaults, or the colours of
+        # the next one drawn
+        #
+        self.assertEqual(defaults(), before)
+        for name in reversed(timelines):
+            self.assertEqual(render(name, batched)[0], expected[name][0], name)
+
+    def testPerEntry(self):
+        self.check(batched=False)
+
+    def testBatched(self):
+        self.check(batched=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import contextlib
+import io
+import os
+import unittest
+
+from lsst.timelines import (Activity, Color, ActivityTable, Finding, read_activities, validate, pack_rows,
+                            save_activity_table)
+from lsst.timelines.cli import main
+
+from helpers import TimelineTestCase, planFile
+
+#
+# A timeline with one (or two) problems for each check, and near misses
+#
+badTimeline = """\
+Color,red,black
+Activity,A,2021-01-01,10,,,,0
+Activity,B,2021-01-05,3,,,,0
+Activity,C,2021-01-11,2,,,,0
+Activity,Neg,2021-02-10,2021-02-01,,,,0
+Milestone,A,2021-01-20,,,right,top,,0
+
+Activity,D,2021-01-03,5,,,,0
+Activity,E,2021-01-12,1,,,,-1
+Activity,A,2021-03-01,1,notacolour,,,0
+Color,red,blurple
+"""
+#
+# What's wrong with it: (line, check, severity, message).  C just touches A,
+# the Milestone A isn't an Activity, and D is on the next row, so they're
+# fine; but E's drow moves it back onto the first row
+#
+expected = [
+    (3, "overlap", "warning", "'B' overlaps 'A' (line 2) on the same row"),
+    (5, "negative-duration", "error", "'Neg' ends (2021-02-01) before it starts (2021-02-10)"),
+    (9, "overlap", "warning", "'E' overlaps 'C' (line 4) on the same row"),
+    (10, "duplicate-label", "warning", "Activity 'A' has the same label as 'A' (line 2)"),
+    (10, "unknown-color", "error", "'A' has an unknown color 'notacolour'"),
+    (11, "unknown-color", "error", "Color has an unknown border 'blurple'"),
+]
+
+
+class ValidateTestCase(TimelineTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.fileName = self.write("bad.csv", badTimeline)
+
+    def testChecks(self):
+        findings = validate(self.fileName)
+        self.assertTrue(all(isinstance(f, Finding) for f in findings))
+        self.assertEqual([(f.line, f.check, f.severity, f.message) for f in findings], expected)
+        self.assertEqual(str(findings[0]), f"{self.fileName}:3: warning: {expected[0][3]} [overlap]")
+        self.assertEqual(findings[0].label, "B")
+
+        for check in ["negative-duration", "overlap", "duplicate-label", "unknown-color"]:
+            findings = validate(self.fileName, checks=[check])
+            self.assertEqual([(f.line, f.check, f.severity, f.message) for f in findings],
+                             [e for e in expected if e[1] == check])
+
+        with self.assertRaises(ValueError):
+            validate(self.fileName, checks=["spelling"])
+
+    def testSources(self):
+        """The same problems are found in an ActivityTable, a binary file, and
+        a list of lists (which has no line numbers)
+        """
+        binary = os.path.join(self.tmpdir, "bad.bin")
+        save_activity_table(ActivityTable.from_activities(read_activities(self.fileName)), binary)
+
+        for timeline in [binary, ActivityTable.from_activities(read_activities(self.fileName)),
+                         read_activities(self.fileName)]:
+            findings = validate(timeline)
+            self.assertEqual([(f.check, f.severity) for f in findings], [e[1:3] for e in expected])
+
+        findings = validate(read_activities(self.fileName))
+        self.assertEqual(findings[0].line, 0)
+        self.assertEqual(str(findings[0]),
+                         "<timeline>[2]: warning: 'B' overlaps 'A' (entry 1) on the same row [overlap]")
+
+    def testLayout(self):
+        """With a layout from pack_rows, nothing overlaps"""
+        activities = [[Color("red"), Activity("A", "2021-01-01", 10), Activity("B", "2021-01-05", 3)]]
+        self.assertEqual([f.check for f in validate(activities)], ["overlap"])
+        self.assertEqual(validate(activities, layout=pack_rows(activities)), [])
+
+    def testPlan(self):
+        self.assertEqual(validate(planFile), [])
+
+    def testCommand(self):
+        def run(*args):
+            with contextlib.redirect_stdout(io.StringIO()) as stdout, \
+                 contextlib.redirect_stderr(io.StringIO()) as stderr:
+                status = main(["validate", *args])
+            return status, stdout.getvalue(), stderr.getvalue()
+
+        status, output, summary = run(self.fileName, planFile)
+        self.assertEqual(status, 1)
+        self.assertEqual(output.splitlines(), [f"{self.fileName}:{line}: {severity}: {message} [{check}]"
+                                               for line, check, severity, message in expected])
+        self.assertIn("Checked 2 timelines: 3 errors, 3 warnings", summary)
+
+        self.assertEqual(run(self.fileName, "--ignore", "negative-duration", "unknown-color")[0], 0)
+        self.assertEqual(run(self.fileName, "--checks", "overlap", "--strict")[0], 1)
+        self.assertEqual(run(planFile, "--strict")[0], 0)
+        self.assertEqual(run(os.path.join(self.tmpdir, "missing.csv"))[0], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()